@@ -0,0 +1,437 @@
+"""
+Tick-to-bar aggregator - OHLCV bars for several timeframes in one pass
+
+Trades are pushed in batches (WebSocket buffer or replay file block):
+1. ticks are grouped per (symbol, base bar) with NumPy reduceat
+2. each timeframe regroups those base bars (1m -> 5/15/60/240m)
+3. the first group of a symbol merges into its open bar, earlier bars close
+
+State is array-backed: open bar and last closed bar per (symbol,
+timeframe) in 2-D arrays indexed by symbol position, no per-symbol
+objects. Bars close when a later trade arrives or on close_until(now).
+Minutes without trades become flat zero-volume bars (like exchange
+klines) so indicators see a continuous series.
+
+Closed bars go to SMCFeed (one StreamingSMC per symbol/timeframe).
+"""
+import asyncio
+import io
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.importer import CHUNK_BYTES, iter_blocks
+from app.indicators import StreamingSMC
+from app.smc import SUPPORTED_SYMBOLS
+from app.smc_engine import pine_asset_type
+from app.utils import timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAMES = ("1", "5", "15", "60", "240")
+
+# Columns (time, price, quantity) of data.binance.vision trade dumps
+AGG_TRADES_COLUMNS = (5, 1, 2)  # agg_trade_id, price, quantity, first_id, last_id, transact_time, ...
+TRADES_COLUMNS = (4, 1, 2)      # id, price, qty, quote_qty, time, is_buyer_maker, ...
+
+
+@dataclass(slots=True)
+class BarBatch:
+    """Closed bars of one timeframe, sorted by (symbol, time)"""
+    timeframe: str
+    symbol: np.ndarray  # index in BarAggregator.symbols
+    time: np.ndarray    # bar open time (epoch ms)
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+
+def _reduce(symbol: np.ndarray, bucket: np.ndarray, o, h, l, c, v):
+    """
+    Collapse consecutive rows with the same (symbol, bucket)
+
+    Rows must be sorted by (symbol, bucket). Returns the same 7 arrays,
+    one row per group.
+    """
+    n = len(bucket)
+    boundary = np.empty(n, dtype=bool)
+    boundary[0] = True
+    np.not_equal(bucket[1:], bucket[:-1], out=boundary[1:])
+    boundary[1:] |= symbol[1:] != symbol[:-1]
+    starts = np.flatnonzero(boundary)
+    if len(starts) == n:
+        return symbol, bucket, o, h, l, c, v
+    ends = np.append(starts[1:], n) - 1
+    return (
+        symbol[starts], bucket[starts], o[starts],
+        np.maximum.reduceat(h, starts), np.minimum.reduceat(l, starts),
+        c[ends], np.add.reduceat(v, starts)
+    )
+
+
+class BarAggregator:
+    """
+    Multi-symbol, multi-timeframe bar builder
+
+    Usage:
+        aggregator = BarAggregator(["BTCUSDT.P", "ETHUSDT.P"], on_bars=feed.on_bars)
+        aggregator.add_ticks(symbol_index, times_ms, prices, quantities)
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        timeframes: Sequence[str] = TIMEFRAMES,
+        on_bars: Optional[Callable[[BarBatch], None]] = None,
+        fill_gaps: bool = True
+    ):
+        """
+        Args:
+            symbols: Symbols, ticks refer to them by position
+            timeframes: TradingView timeframes, multiples of the smallest one
+            on_bars: Called with each BarBatch of closed bars
+            fill_gaps: Emit flat zero-volume bars for periods without trades
+        """
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.timeframes = [str(tf) for tf in timeframes]
+        self._tf_ms = np.array([timeframe_seconds(tf) * 1000 for tf in self.timeframes], dtype=np.int64)
+        self._base_ms = int(self._tf_ms.min())
+        if np.any(self._tf_ms % self._base_ms):
+            raise ValueError("Timeframes must be multiples of the smallest one")
+        self._ratio = self._tf_ms // self._base_ms
+        self.on_bars = on_bars
+        self.fill_gaps = fill_gaps
+
+        shape = (len(self.symbols), len(self.timeframes))
+        self._bucket = np.full(shape, -1, dtype=np.int64)       # open bar (-1 = none)
+        self._bar = np.zeros(shape + (5,), dtype=np.float64)    # open bar o, h, l, c, v
+        self._last_bucket = np.full(shape, -1, dtype=np.int64)  # last closed bar
+        self._last_close = np.zeros(shape, dtype=np.float64)
+
+        self.ticks = 0
+        self.late_ticks = 0
+        self.bars_closed = 0
+
+    def symbol_indices(self, symbols: Sequence[str]) -> np.ndarray:
+        """Symbol names -> positions"""
+        return np.fromiter((self.index[s] for s in symbols), dtype=np.int64, count=len(symbols))
+
+    def add_ticks(
+        self,
+        symbol: np.ndarray,
+        times: np.ndarray,
+        prices: np.ndarray,
+        quantities: np.ndarray
+    ) -> List[BarBatch]:
+        """
+        Aggregate a batch of trades
+
+        Args:
+            symbol: Symbol position of each trade
+            times: Trade times (epoch ms)
+            prices: Trade prices
+            quantities: Trade sizes
+
+        Returns:
+            BarBatch of closed bars per timeframe (only timeframes with closed bars)
+        """
+        symbol = np.asarray(symbol, dtype=np.int64)
+        times = np.asarray(times, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        quantities = np.asarray(quantities, dtype=np.float64)
+        if len(times) == 0:
+            return []
+        self.ticks += len(times)
+
+        order = np.lexsort((times, symbol))
+        if np.any(order[1:] < order[:-1]):
+            symbol, times, prices, quantities = symbol[order], times[order], prices[order], quantities[order]
+
+        # Ticks older than the open (or last closed) base bar are dropped
+        base = times // self._base_ms
+        k0 = int(np.argmin(self._tf_ms))
+        floor = np.maximum(self._bucket[symbol, k0], self._last_bucket[symbol, k0] + 1)
+        fresh = base >= floor
+        if not fresh.all():
+            self.late_ticks += int((~fresh).sum())
+            symbol, base, prices, quantities = symbol[fresh], base[fresh], prices[fresh], quantities[fresh]
+            if len(base) == 0:
+                return []
+
+        groups = _reduce(symbol, base, prices, prices, prices, prices, quantities)
+        batches = []
+        for k, ratio in enumerate(self._ratio):
+            g_symbol, g_base, o, h, l, c, v = groups
+            tf_groups = _reduce(g_symbol, g_base // ratio, o, h, l, c, v) if ratio > 1 else groups
+            batch = self._advance(k, *tf_groups)
+            if batch is not None:
+                batches.append(batch)
+        return batches
+
+    def _advance(self, k: int, symbol, bucket, o, h, l, c, v) -> Optional[BarBatch]:
+        """Merge groups of timeframe k into the open bars and collect closed bars"""
+        o, h, l, c, v = (np.array(a, dtype=np.float64) for a in (o, h, l, c, v))
+        first = np.ones(len(symbol), dtype=bool)
+        first[1:] = symbol[1:] != symbol[:-1]
+        last = np.ones(len(symbol), dtype=bool)
+        last[:-1] = first[1:]
+
+        # First group of each symbol: same bucket as the open bar -> merge, later -> open bar closes
+        heads = np.flatnonzero(first)
+        head_symbol = symbol[heads]
+        open_bucket = self._bucket[head_symbol, k]
+        open_bar = self._bar[head_symbol, k]
+        merge = open_bucket == bucket[heads]
+        rows, bars = heads[merge], open_bar[merge]
+        o[rows] = bars[:, 0]
+        h[rows] = np.maximum(h[rows], bars[:, 1])
+        l[rows] = np.minimum(l[rows], bars[:, 2])
+        v[rows] += bars[:, 4]
+        closing = ~merge & (open_bucket >= 0)
+
+        # Last group of each symbol becomes the open bar
+        tails = np.flatnonzero(last)
+        self._bucket[symbol[tails], k] = bucket[tails]
+        self._bar[symbol[tails], k] = np.column_stack((o[tails], h[tails], l[tails], c[tails], v[tails]))
+
+        done = ~last
+        closed = (
+            np.concatenate((head_symbol[closing], symbol[done])),
+            np.concatenate((open_bucket[closing], bucket[done])),
+            np.concatenate((open_bar[closing], np.column_stack((o[done], h[done], l[done], c[done], v[done])))),
+        )
+        if len(closed[0]) == 0:
+            return None
+        order = np.lexsort((closed[1], closed[0]))
+        return self._emit(k, closed[0][order], closed[1][order], closed[2][order])
+
+    def close_until(self, now_ms: int) -> List[BarBatch]:
+        """
+        Close open bars whose period ended before now_ms (no trade needed)
+
+        Args:
+            now_ms: Current time (epoch ms)
+
+        Returns:
+            BarBatch of closed bars per timeframe
+        """
+        batches = []
+        for k, tf_ms in enumerate(self._tf_ms):
+            due = np.flatnonzero((self._bucket[:, k] >= 0) & ((self._bucket[:, k] + 1) * tf_ms <= now_ms))
+            if len(due) == 0:
+                continue
+            bucket, bars = self._bucket[due, k].copy(), self._bar[due, k].copy()
+            self._bucket[due, k] = -1
+            batches.append(self._emit(k, due, bucket, bars))
+        return batches
+
+    def _emit(self, k: int, symbol: np.ndarray, bucket: np.ndarray, bars: np.ndarray) -> BarBatch:
+        """Fill gaps, update the last closed bar, build and dispatch the batch"""
+        if self.fill_gaps:
+            symbol, bucket, bars = self._fill_gaps(k, symbol, bucket, bars)
+        tails = np.ones(len(symbol), dtype=bool)
+        tails[:-1] = symbol[1:] != symbol[:-1]
+        self._last_bucket[symbol[tails], k] = bucket[tails]
+        self._last_close[symbol[tails], k] = bars[tails, 3]
+        self.bars_closed += len(symbol)
+
+        batch = BarBatch(
+            self.timeframes[k], symbol, bucket * self._tf_ms[k],
+            bars[:, 0], bars[:, 1], bars[:, 2], bars[:, 3], bars[:, 4]
+        )
+        if self.on_bars:
+            self.on_bars(batch)
+        return batch
+
+    def _fill_gaps(self, k: int, symbol: np.ndarray, bucket: np.ndarray, bars: np.ndarray):
+        """Insert flat bars (previous close, zero volume) for missing buckets"""
+        new_symbol = np.ones(len(symbol), dtype=bool)
+        new_symbol[1:] = symbol[1:] != symbol[:-1]
+        previous = np.where(new_symbol, self._last_bucket[symbol, k], np.roll(bucket, 1))
+        gaps = np.where(previous >= 0, bucket - previous - 1, 0)
+        if not gaps.any():
+            return symbol, bucket, bars
+        previous_close = np.where(new_symbol, self._last_close[symbol, k], np.roll(bars[:, 3], 1))
+
+        counts = gaps + 1
+        row = np.repeat(np.arange(len(symbol)), counts)
+        step = np.arange(len(row)) - np.repeat(np.cumsum(counts) - counts, counts)
+        filler = step < gaps[row]
+        out_bucket = np.where(filler, previous[row] + 1 + step, bucket[row])
+        out_bars = bars[row]
+        flat = previous_close[row[filler]]
+        out_bars[filler] = np.column_stack((flat, flat, flat, flat, np.zeros(len(flat))))
+        return symbol[row], out_bucket, out_bars
+
+
+class SMCFeed:
+    """
+    Closed bars -> StreamingSMC per (symbol, timeframe)
+
+    on_signal(symbol, timeframe, bar_time, signal, mask, trap_score, final_atr, close)
+    is called for every bar whose signal is LONG (+1) or SHORT (-1).
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        on_signal: Optional[Callable[..., None]] = None,
+        confluence_threshold: float = 70.0
+    ):
+        self.symbols = list(symbols)
+        self.on_signal = on_signal
+        self.confluence_threshold = confluence_threshold
+        self.engines: Dict[Tuple[str, str], StreamingSMC] = {}
+        self.bars = 0
+        self.signals = 0
+
+    def engine(self, symbol: str, timeframe: str) -> StreamingSMC:
+        key = (symbol, timeframe)
+        engine = self.engines.get(key)
+        if engine is None:
+            engine = self.engines[key] = StreamingSMC(pine_asset_type(symbol), self.confluence_threshold)
+        return engine
+
+    def on_bars(self, batch: BarBatch):
+        """BarAggregator callback"""
+        columns = (batch.symbol.tolist(), batch.open.tolist(), batch.high.tolist(), batch.low.tolist(),
+                   batch.close.tolist(), batch.volume.tolist(), batch.time.tolist())
+        self.bars += len(batch)
+        for i, o, h, l, c, v, t in zip(*columns):
+            symbol = self.symbols[i]
+            mask, signal, trap_score, final_atr = self.engine(symbol, batch.timeframe).update(o, h, l, c, v, t)
+            if signal:
+                self.signals += 1
+                if self.on_signal:
+                    self.on_signal(symbol, batch.timeframe, t, signal, mask, trap_score, final_atr, c)
+
+
+# === SOURCES ===
+
+def replay_trades(
+    path: str,
+    columns: Tuple[int, int, int] = AGG_TRADES_COLUMNS,
+    chunk_bytes: int = CHUNK_BYTES // 4
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Read a trade dump (CSV, plain or .zip) block by block
+
+    Args:
+        path: File
+        columns: Positions of (time, price, quantity)
+        chunk_bytes: Block size
+
+    Yields:
+        (times ms, prices, quantities)
+    """
+    for _, block in iter_blocks(path, 0, chunk_bytes):
+        if block[:1].isalpha():
+            block = block[block.find(b"\n") + 1:]  # header
+        if not block.strip():
+            continue
+        table = np.loadtxt(io.BytesIO(block), delimiter=",", usecols=columns, dtype=np.float64, ndmin=2)
+        times = table[:, 0].astype(np.int64)
+        times = np.where(times > 10**14, times // 1000, times)  # microsecond dumps
+        yield times, table[:, 1].copy(), table[:, 2].copy()
+
+
+def binance_stream_url(symbols: Sequence[str]) -> Dict[str, str]:
+    """
+    Binance aggTrade combined-stream URLs for our symbols
+
+    ".P" perpetuals go to the USD-M futures stream, other crypto to spot.
+    Forex / gold symbols have no Binance feed and are skipped. The market
+    comes from SUPPORTED_SYMBOLS: pine_asset_type() reports forex as
+    "crypto" (like the Pine script) and would send EURUSD to spot.
+
+    Returns:
+        {"futures" / "spot": url}
+    """
+    crypto = [s for s in symbols if SUPPORTED_SYMBOLS.get(s) == "crypto"]
+    spot = [s for s in crypto if not s.endswith(".P")]
+    futures = [s for s in crypto if s.endswith(".P")]
+    urls = {}
+    if futures:
+        streams = "/".join(f"{s[:-2].lower()}@aggTrade" for s in futures)
+        urls["futures"] = f"wss://fstream.binance.com/stream?streams={streams}"
+    if spot:
+        streams = "/".join(f"{s.lower()}@aggTrade" for s in spot)
+        urls["spot"] = f"wss://stream.binance.com:9443/stream?streams={streams}"
+    return urls
+
+
+async def stream_binance(
+    aggregator: BarAggregator,
+    flush_ms: float = 100.0,
+    max_batch: int = 4096,
+    stop: Optional[asyncio.Event] = None
+):
+    """
+    Feed the aggregator from Binance aggTrade WebSockets
+
+    Trades are buffered and pushed every flush_ms (or max_batch trades);
+    open bars are closed on wall clock even when a symbol is quiet.
+    Reconnects with exponential backoff.
+
+    Args:
+        aggregator: Target aggregator (its symbols select the streams)
+        flush_ms: Buffer flush interval
+        max_batch: Buffer size that forces a flush
+        stop: Event ending the stream
+    """
+    import websockets  # installed with uvicorn[standard]
+
+    stop = stop or asyncio.Event()
+    names = {}
+    for symbol in aggregator.symbols:
+        names[(symbol[:-2] if symbol.endswith(".P") else symbol).lower()] = aggregator.index[symbol]
+    buffer: List[Tuple[int, int, float, float]] = []
+
+    def flush():
+        if buffer:
+            symbol, times, prices, quantities = zip(*buffer)
+            buffer.clear()
+            aggregator.add_ticks(np.array(symbol), np.array(times), np.array(prices), np.array(quantities))
+        aggregator.close_until(int(time.time() * 1000))
+
+    async def consume(url: str):
+        delay = 1.0
+        while not stop.is_set():
+            try:
+                async with websockets.connect(url, ping_interval=20) as ws:
+                    logger.info(f"📡 Trade stream connected: {url[:80]}")
+                    delay = 1.0
+                    async for message in ws:
+                        data = json.loads(message)["data"]
+                        symbol = names.get(data["s"].lower())
+                        if symbol is not None:
+                            buffer.append((symbol, data["T"], float(data["p"]), float(data["q"])))
+                            if len(buffer) >= max_batch:
+                                flush()
+                        if stop.is_set():
+                            return
+            except Exception as e:
+                logger.warning(f"⚠️ Trade stream error ({e}), reconnecting in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+
+    async def ticker():
+        while not stop.is_set():
+            await asyncio.sleep(flush_ms / 1000)
+            flush()
+
+    urls = binance_stream_url(aggregator.symbols)
+    skipped = [s for s in aggregator.symbols if SUPPORTED_SYMBOLS.get(s) != "crypto"]
+    if skipped:
+        logger.info(f"ℹ️ No Binance trade feed for {', '.join(skipped)}")
+    await asyncio.gather(ticker(), *(consume(url) for url in urls.values()))
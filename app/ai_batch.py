@@ -0,0 +1,110 @@
+"""
+Micro-batching of AI validations - one provider round-trip per burst
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+BatchCall = Callable[[List[Dict]], Awaitable[List[Dict]]]
+
+
+class AIBatcher:
+    """
+    Collects signals arriving within `window` seconds (up to `max_size`)
+    and validates them with one GROK call and one DEEPSEEK call
+
+    Each submit() waits for its own (grok, deepseek, latency) result, so a
+    burst of N signals costs 2 provider round-trips instead of 2N.
+    """
+
+    def __init__(
+        self,
+        grok_batch: BatchCall,
+        deepseek_batch: BatchCall,
+        window: float = 0.05,
+        max_size: int = 8
+    ):
+        self.grok_batch = grok_batch
+        self.deepseek_batch = deepseek_batch
+        self.window = window
+        self.max_size = max(1, max_size)
+
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.signals = 0
+        self.largest_batch = 0
+
+    async def submit(self, signal: Dict) -> Tuple[Dict, Dict, Dict]:
+        """
+        Queue a signal for the next batch
+
+        Args:
+            signal: Signal dict (same shape as process_with_ai input)
+
+        Returns:
+            Tuple of (grok verdict, deepseek verdict, latency_ms)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((signal, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Send everything collected so far as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run_batch(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Dict, asyncio.Future]]) -> None:
+        """Call both providers once for the whole batch and dispatch results"""
+        signals = [signal for signal, _ in batch]
+        self.batches += 1
+        self.signals += len(signals)
+        self.largest_batch = max(self.largest_batch, len(signals))
+
+        async def timed(call: BatchCall) -> Tuple[List[Dict], float]:
+            start = time.perf_counter()
+            results = await call(signals)
+            return results, (time.perf_counter() - start) * 1000
+
+        try:
+            (groks, grok_ms), (deepseeks, deepseek_ms) = await asyncio.gather(
+                timed(self.grok_batch), timed(self.deepseek_batch)
+            )
+        except Exception as e:
+            logger.error(f"AI batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        latency = {"grok": round(grok_ms, 1), "deepseek": round(deepseek_ms, 1), "batch_size": len(batch)}
+        for (_, future), grok, deepseek in zip(batch, groks, deepseeks):
+            if not future.done():
+                future.set_result((grok, deepseek, latency))
+
+    def stats(self) -> Dict:
+        """Batching counters for /stats"""
+        return {
+            "batches": self.batches,
+            "signals": self.signals,
+            "avg_batch_size": round(self.signals / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "window_ms": self.window * 1000,
+            "max_size": self.max_size
+        }
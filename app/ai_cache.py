@@ -0,0 +1,152 @@
+"""
+AI verdict cache - LRU + TTL, keyed by a normalized signal fingerprint
+"""
+import json
+import logging
+import math
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.smc import flags_to_mask
+
+logger = logging.getLogger(__name__)
+
+
+def signal_fingerprint(signal: Dict, atr_bucket: float = 0.5) -> str:
+    """
+    Normalized fingerprint of a signal for AI verdict reuse
+
+    Two signals share a fingerprint when they have the same symbol,
+    direction and flag set, and their entries fall in the same bucket of
+    width `atr_bucket * ATR`.
+
+    Args:
+        signal: Signal dict sent to process_with_ai
+        atr_bucket: Bucket width as a multiple of ATR
+
+    Returns:
+        Fingerprint string "SYMBOL|DIRECTION|MASK|BUCKET"
+    """
+    entry = float(signal["price_ctx"]["entry"])
+    atr = signal.get("atr") or 0
+    width = float(atr) * atr_bucket
+    bucket = math.floor(entry / width) if width > 0 else repr(entry)
+    mask = flags_to_mask(signal.get("flags", {}))
+    return f"{signal['symbol']}|{signal['direction']}|{mask:03x}|{bucket}"
+
+
+class VerdictCache:
+    """
+    LRU + TTL cache of AI verdicts
+
+    Entries live in an OrderedDict (most recently used last). When
+    `sqlite_path` is set, every write is also stored in a local SQLite file
+    and unexpired entries are reloaded on startup.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 900.0, sqlite_path: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sqlite_path = sqlite_path or None
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.sqlite_path:
+            self._load()
+
+    # === PERSISTENCE ===
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.sqlite_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.sqlite_path, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, expires_at REAL, verdict TEXT)"
+            )
+        return self._db
+
+    def _load(self) -> None:
+        """Reload unexpired verdicts (most recent max_size)"""
+        db = self._conn()
+        now = time.time()
+        db.execute("DELETE FROM verdicts WHERE expires_at <= ?", (now,))
+        rows = db.execute(
+            "SELECT key, expires_at, verdict FROM verdicts ORDER BY expires_at DESC LIMIT ?",
+            (self.max_size,)
+        ).fetchall()
+        for key, expires_at, verdict in reversed(rows):
+            self._entries[key] = (expires_at, json.loads(verdict))
+        logger.info(f"AI verdict cache: {len(rows)} entries loaded from {self.sqlite_path}")
+
+    # === CACHE API ===
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a verdict
+
+        Args:
+            key: Signal fingerprint
+
+        Returns:
+            Cached verdict or None (miss / expired)
+        """
+        item = self._entries.get(key)
+        if item is None or item[0] <= time.time():
+            if item is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def put(self, key: str, verdict: Dict) -> None:
+        """
+        Store a verdict, evicting the least recently used entries if full
+
+        Args:
+            key: Signal fingerprint
+            verdict: JSON-serializable verdict
+        """
+        expires_at = time.time() + self.ttl
+        self._entries[key] = (expires_at, verdict)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            if self.sqlite_path:
+                self._conn().execute("DELETE FROM verdicts WHERE key = ?", (evicted,))
+        if self.sqlite_path:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO verdicts (key, expires_at, verdict) VALUES (?, ?, ?)",
+                (key, expires_at, json.dumps(verdict))
+            )
+
+    def clear(self) -> None:
+        """Drop all verdicts (memory and disk)"""
+        self._entries.clear()
+        if self.sqlite_path:
+            self._conn().execute("DELETE FROM verdicts")
+
+    def stats(self) -> Dict:
+        """Cache counters for /stats"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "persistent": bool(self.sqlite_path)
+        }
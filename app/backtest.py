@@ -0,0 +1,303 @@
+"""
+Backtest of the webhook decision pipeline on historical OHLCV
+
+Replays bars through the same steps a live signal goes through:
+1. SMC detection (app.smc_engine.detect - smc_relaxed_40pct)
+2. Confluence threshold (pipeline rule, score tables of app.smc)
+3. Semantic dedup (app.dedup.SemanticDedupIndex)
+4. SL/TP placement (ATR multiples, ASSET_CONFIG by default)
+
+then resolves every trade with a vectorized first-touch search of TP / SL
+over the following bars. AI validation is not replayed.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.config import Config
+from app.dedup import SemanticDedupIndex
+from app.smc import MASK_SPACE, get_asset_config, unweighted_score
+from app.smc_engine import TRAP_SCORE_MAX, SMCResult, detect, pine_asset_type
+from app.utils import timeframe_seconds
+
+# Trade outcomes
+TP_HIT = 1
+SL_HIT = -1
+OPEN = 0  # max_hold reached or end of data, closed at the last close
+
+_CONFLUENCE = np.array([unweighted_score(mask) * 100 for mask in range(MASK_SPACE)])
+
+
+@dataclass(slots=True)
+class BacktestResult:
+    """One entry per trade, in entry order (equity in exit order)"""
+    entry_index: np.ndarray
+    exit_index: np.ndarray
+    direction: np.ndarray      # +1 LONG / -1 SHORT
+    entry: np.ndarray
+    sl: np.ndarray
+    tp: np.ndarray
+    exit_price: np.ndarray
+    outcome: np.ndarray        # TP_HIT / SL_HIT / OPEN
+    r_multiple: np.ndarray     # PnL in units of initial risk
+    pnl: np.ndarray
+    equity: np.ndarray         # equity after each exit, sorted by exit bar
+    equity_index: np.ndarray   # exit bar of each equity point
+    base_equity: float
+    detected: int              # LONG/SHORT conditions before the pipeline
+    below_threshold: int
+    semantic_duplicates: int
+
+    def summary(self) -> Dict:
+        """Win rate, expectancy, drawdown..."""
+        trades = len(self.r_multiple)
+        wins = self.r_multiple > 0
+        losses = self.r_multiple < 0
+        peak = np.maximum.accumulate(np.concatenate(([self.base_equity], self.equity)))
+        curve = np.concatenate(([self.base_equity], self.equity))
+        drawdown = peak - curve
+        worst = int(np.argmax(drawdown)) if trades else 0
+        gross_loss = -self.pnl[losses].sum()
+        return {
+            "detected": self.detected,
+            "below_threshold": self.below_threshold,
+            "semantic_duplicates": self.semantic_duplicates,
+            "trades": trades,
+            "tp_hits": int((self.outcome == TP_HIT).sum()),
+            "sl_hits": int((self.outcome == SL_HIT).sum()),
+            "open_at_end": int((self.outcome == OPEN).sum()),
+            "win_rate": round(float(wins.mean()), 4) if trades else 0.0,
+            "avg_win_r": round(float(self.r_multiple[wins].mean()), 3) if wins.any() else 0.0,
+            "avg_loss_r": round(float(self.r_multiple[losses].mean()), 3) if losses.any() else 0.0,
+            "expectancy_r": round(float(self.r_multiple.mean()), 4) if trades else 0.0,
+            "expectancy": round(float(self.pnl.mean()), 2) if trades else 0.0,
+            "profit_factor": round(float(self.pnl[wins].sum() / gross_loss), 3) if gross_loss > 0 else None,
+            "net_pnl": round(float(self.pnl.sum()), 2),
+            "final_equity": round(float(curve[-1]), 2),
+            "max_drawdown": round(float(drawdown[worst]), 2),
+            "max_drawdown_pct": round(float(drawdown[worst] / peak[worst] * 100), 2) if trades else 0.0,
+            "avg_bars_held": round(float((self.exit_index - self.entry_index).mean()), 1) if trades else 0.0
+        }
+
+
+def first_touch(
+    high: np.ndarray,
+    low: np.ndarray,
+    entry_index: np.ndarray,
+    direction: np.ndarray,
+    sl: np.ndarray,
+    tp: np.ndarray,
+    max_hold: int,
+    window: int = 256
+):
+    """
+    First bar after entry where SL or TP is touched, for all trades at once
+
+    Trades are scanned window by window: each pass gathers the next
+    `window` bars of every unresolved trade as a 2-D block and takes the
+    first touching column. When SL and TP are both inside the same bar,
+    SL is assumed first (conservative).
+
+    Args:
+        high, low: Bar arrays
+        entry_index: Signal bar of each trade (entry at its close)
+        direction: +1 LONG / -1 SHORT
+        sl, tp: Levels
+        max_hold: Maximum bars held
+        window: Bars scanned per pass
+
+    Returns:
+        Tuple of (exit_index, outcome) arrays
+    """
+    n = len(high)
+    exit_index = np.minimum(entry_index + max_hold, n - 1)
+    outcome = np.full(len(entry_index), OPEN, dtype=np.int8)
+    pending = np.flatnonzero(entry_index < n - 1)
+    offset = 1
+
+    while len(pending) and offset <= max_hold:
+        span = min(window, max_hold - offset + 1)
+        bars = entry_index[pending, None] + offset + np.arange(span)
+        valid = bars < n
+        bars = np.minimum(bars, n - 1)
+        long = direction[pending, None] > 0
+        bar_high, bar_low = high[bars], low[bars]
+        level_sl, level_tp = sl[pending, None], tp[pending, None]
+        sl_touch = valid & np.where(long, bar_low <= level_sl, bar_high >= level_sl)
+        tp_touch = valid & np.where(long, bar_high >= level_tp, bar_low <= level_tp)
+        touch = sl_touch | tp_touch
+
+        hit = touch.any(axis=1)
+        column = touch.argmax(axis=1)
+        resolved = pending[hit]
+        rows = np.flatnonzero(hit)
+        exit_index[resolved] = bars[rows, column[hit]]
+        outcome[resolved] = np.where(sl_touch[rows, column[hit]], SL_HIT, TP_HIT)
+
+        pending = pending[~hit & valid[:, -1]]
+        offset += span
+
+    return exit_index, outcome
+
+
+def run_backtest(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    times: Optional[np.ndarray] = None,
+    symbol: str = "BTCUSDT.P",
+    timeframe: str = "1",
+    asset_type: Optional[str] = None,
+    **params
+) -> BacktestResult:
+    """
+    Backtest one symbol/timeframe
+
+    Args:
+        open_, high, low, close, volume: Bar arrays (oldest first)
+        times: Bar open times in epoch ms (UTC)
+        symbol: Symbol (asset type and ASSET_CONFIG lookup)
+        timeframe: TradingView timeframe ("1", "15", "240"...)
+        asset_type: Pine asset type, guessed from the symbol like the Pine script if None
+        **params: Trade parameters of simulate()
+
+    Returns:
+        BacktestResult
+    """
+    bars = detect_all(open_, high, low, close, volume, times, asset_type or pine_asset_type(symbol))
+    return simulate(bars, high, low, close, times, symbol=symbol, timeframe=timeframe, **params)
+
+
+def detect_all(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    times: Optional[np.ndarray],
+    asset_type: str
+) -> SMCResult:
+    """
+    detect() without confluence or trap filtering
+
+    The result only depends on the bars and the asset type, so it can be
+    reused by simulate() for any confluence / trap / SL / TP setting.
+    """
+    return detect(open_, high, low, close, volume, times, asset_type,
+                  confluence_threshold=0.0, trap_cutoff=TRAP_SCORE_MAX + 1)
+
+
+def simulate(
+    bars: SMCResult,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    times: Optional[np.ndarray] = None,
+    symbol: str = "BTCUSDT.P",
+    timeframe: str = "1",
+    confluence_thresh: Optional[float] = None,
+    trap_cutoff: int = 2,
+    sl_mult: Optional[float] = None,
+    tp_mult: Optional[float] = None,
+    base_equity: Optional[float] = None,
+    risk_pct: Optional[float] = None,
+    max_hold: int = 1440,
+    dedup: bool = True,
+    limit: Optional[int] = None
+) -> BacktestResult:
+    """
+    Run the pipeline filters and resolve trades from a detect_all() result
+
+    Args:
+        bars: detect_all() output
+        high, low, close: Bar arrays used by detect_all()
+        times: Bar open times in epoch ms (UTC)
+        symbol: Symbol (ASSET_CONFIG lookup and dedup key)
+        timeframe: TradingView timeframe
+        confluence_thresh: 0-1, Config.CONFLUENCE_THRESH if None
+        trap_cutoff: Trap score from which a signal is dropped (Pine: 2)
+        sl_mult, tp_mult: ATR multiples, ASSET_CONFIG sl_mult/tp_mult if None
+        base_equity: Starting equity, ASSET_CONFIG base_equity if None
+        risk_pct: Risk per trade, Config.RISK_PCT if None
+        max_hold: Bars after which an open trade is closed at market
+        dedup: Apply semantic dedup (Config.SEMANTIC_DEDUP_*)
+        limit: Only take entries on the first `limit` bars (exits may go further)
+
+    Returns:
+        BacktestResult
+    """
+    asset_config = get_asset_config(symbol)
+    confluence_thresh = Config.CONFLUENCE_THRESH if confluence_thresh is None else confluence_thresh
+    sl_mult = asset_config["sl_mult"] if sl_mult is None else sl_mult
+    tp_mult = asset_config["tp_mult"] if tp_mult is None else tp_mult
+    base_equity = asset_config["base_equity"] if base_equity is None else base_equity
+    risk_pct = Config.RISK_PCT if risk_pct is None else risk_pct
+
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+
+    # Pine conditions, then the pipeline's confluence rule
+    tradable = bars.trap_score[:limit] < trap_cutoff
+    direction = np.where(bars.long[:limit] & tradable, 1,
+                         np.where(bars.short[:limit] & tradable, -1, 0)).astype(np.int8)
+    candidates = np.flatnonzero(direction)
+    confluence = _CONFLUENCE[bars.flags[candidates]]
+    keep = confluence >= confluence_thresh * 100 - 0.01
+    below_threshold = int((~keep).sum())
+    candidates = candidates[keep & np.isfinite(bars.atr[candidates]) & (bars.atr[candidates] > 0)]
+
+    # Semantic dedup - one call per signal, not per bar
+    duplicates = 0
+    if dedup and Config.SEMANTIC_DEDUP_ENABLED and len(candidates):
+        index = SemanticDedupIndex(
+            min_bars=Config.SEMANTIC_DEDUP_BARS,
+            atr_mult=Config.SEMANTIC_DEDUP_ATR_MULT,
+            lookback_bars=Config.SEMANTIC_DEDUP_LOOKBACK
+        )
+        if times is not None:
+            bar_numbers = np.asarray(times, dtype=np.int64)[candidates] // (timeframe_seconds(timeframe) * 1000)
+        else:
+            bar_numbers = candidates
+        kept = np.ones(len(candidates), dtype=bool)
+        for k, (i, bar_number) in enumerate(zip(candidates.tolist(), bar_numbers.tolist())):
+            if index.check_and_add(symbol, "LONG" if direction[i] > 0 else "SHORT", timeframe,
+                                   bar_number, close[i], bars.atr[i]):
+                kept[k] = False
+        duplicates = int((~kept).sum())
+        candidates = candidates[kept]
+
+    # SL / TP placement and first-touch resolution
+    side = direction[candidates].astype(np.float64)
+    entry = close[candidates]
+    risk = bars.atr[candidates] * sl_mult
+    sl = entry - side * risk
+    tp = entry + side * bars.atr[candidates] * tp_mult
+    exit_index, outcome = first_touch(high, low, candidates, side, sl, tp, max_hold)
+
+    exit_price = np.where(outcome == SL_HIT, sl, np.where(outcome == TP_HIT, tp, close[exit_index]))
+    r_multiple = (exit_price - entry) * side / risk
+    pnl = r_multiple * base_equity * risk_pct
+
+    order = np.argsort(exit_index, kind="stable")
+    equity = base_equity + np.cumsum(pnl[order])
+
+    return BacktestResult(
+        entry_index=candidates,
+        exit_index=exit_index,
+        direction=direction[candidates],
+        entry=entry,
+        sl=sl,
+        tp=tp,
+        exit_price=exit_price,
+        outcome=outcome,
+        r_multiple=r_multiple,
+        pnl=pnl,
+        equity=equity,
+        equity_index=exit_index[order],
+        base_equity=float(base_equity),
+        detected=int(len(np.flatnonzero(direction))),
+        below_threshold=below_threshold,
+        semantic_duplicates=duplicates
+    )
@@ -0,0 +1,258 @@
+"""
+Columnar candle store - one memory-mapped file per column
+
+Layout: <root>/<SYMBOL>/<minutes>/{time,open,high,low,close,volume}.bin
+- time: int64 bar open time in epoch ms (strictly increasing)
+- open/high/low/close/volume: float64
+Raw little-endian arrays with no header: reads are np.memmap views (no
+parse, pages loaded on demand), appends write at the end of each file.
+"""
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import Config
+from app.utils import timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("time", "open", "high", "low", "close", "volume")
+DTYPES = {"time": np.dtype("<i8"), **{c: np.dtype("<f8") for c in COLUMNS[1:]}}
+
+
+@dataclass(slots=True)
+class Candles:
+    """Column views of a candle range (memmap slices, zero-copy)"""
+    time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def ohlcv(self) -> Tuple[np.ndarray, ...]:
+        """(open, high, low, close, volume, time) - argument order of detect() / run_backtest()"""
+        return self.open, self.high, self.low, self.close, self.volume, self.time
+
+
+def _empty() -> Candles:
+    return Candles(**{c: np.empty(0, dtype=DTYPES[c]) for c in COLUMNS})
+
+
+class CandleStore:
+    """
+    On-disk candles keyed by (symbol, timeframe)
+
+    Timeframes are normalized to minutes ("15", "15m", "15min" -> "15",
+    "1D" -> "1440"). Reads map each column once and reuse the mapping until
+    the files grow; one writer per key at a time.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: Store directory (Config.CANDLE_STORE_PATH if None)
+        """
+        self.root = root or Config.CANDLE_STORE_PATH
+        self._maps: Dict[Tuple[str, str], Tuple[int, Candles]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def timeframe_key(timeframe: str) -> str:
+        return str(timeframe_seconds(timeframe) // 60)
+
+    def _dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol.upper(), self.timeframe_key(timeframe))
+
+    def _path(self, symbol: str, timeframe: str, column: str) -> str:
+        return os.path.join(self._dir(symbol, timeframe), f"{column}.bin")
+
+    def _rows_on_disk(self, symbol: str, timeframe: str) -> int:
+        """Complete rows = shortest column (a crash mid-append leaves longer ones)"""
+        rows = []
+        for column in COLUMNS:
+            path = self._path(symbol, timeframe, column)
+            rows.append(os.path.getsize(path) // DTYPES[column].itemsize if os.path.exists(path) else 0)
+        return min(rows)
+
+    def symbols(self) -> Dict[str, list]:
+        """Stored {symbol: [timeframe keys]}"""
+        if not os.path.isdir(self.root):
+            return {}
+        return {
+            symbol: sorted(os.listdir(os.path.join(self.root, symbol)), key=int)
+            for symbol in sorted(os.listdir(self.root))
+            if os.path.isdir(os.path.join(self.root, symbol))
+        }
+
+    def rows(self, symbol: str, timeframe: str) -> int:
+        """Number of stored candles"""
+        return self._rows_on_disk(symbol, timeframe)
+
+    def last_time(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Open time (ms) of the last stored candle"""
+        candles = self.read(symbol, timeframe)
+        return int(candles.time[-1]) if len(candles) else None
+
+    # === READ ===
+
+    def _mapped(self, symbol: str, timeframe: str) -> Candles:
+        key = (symbol.upper(), self.timeframe_key(timeframe))
+        rows = self._rows_on_disk(symbol, timeframe)
+        cached = self._maps.get(key)
+        if cached and cached[0] == rows:
+            return cached[1]
+        if rows == 0:
+            candles = _empty()
+        else:
+            candles = Candles(**{
+                column: np.memmap(self._path(symbol, timeframe, column), dtype=DTYPES[column], mode="r", shape=(rows,))
+                for column in COLUMNS
+            })
+        self._maps[key] = (rows, candles)
+        return candles
+
+    def read(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> Candles:
+        """
+        Candles with start <= open time < end, as read-only memmap slices
+
+        Args:
+            symbol: Trading symbol
+            timeframe: TradingView timeframe
+            start: First open time in epoch ms (None = from the first candle)
+            end: Open time bound in epoch ms, excluded (None = up to the last candle)
+
+        Returns:
+            Candles (binary search on the time column, no copy)
+        """
+        candles = self._mapped(symbol, timeframe)
+        lo = 0 if start is None else int(np.searchsorted(candles.time, start, side="left"))
+        hi = len(candles) if end is None else int(np.searchsorted(candles.time, end, side="left"))
+        if lo == 0 and hi == len(candles):
+            return candles
+        return Candles(**{column: getattr(candles, column)[lo:hi] for column in COLUMNS})
+
+    def tail(self, symbol: str, timeframe: str, count: int) -> Candles:
+        """Last `count` candles"""
+        candles = self._mapped(symbol, timeframe)
+        return Candles(**{column: getattr(candles, column)[-count:] if count else getattr(candles, column)[:0]
+                          for column in COLUMNS})
+
+    # === WRITE ===
+
+    def append(
+        self,
+        symbol: str,
+        timeframe: str,
+        time: np.ndarray,
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray
+    ) -> int:
+        """
+        Append candles after the last stored one
+
+        Rows are sorted by time, duplicated times keep their last row and
+        rows not newer than the stored tail are dropped (overlapping
+        downloads can be appended as-is).
+
+        Args:
+            symbol: Trading symbol
+            timeframe: TradingView timeframe
+            time: Open times in epoch ms
+            open_, high, low, close, volume: Candle values
+
+        Returns:
+            Number of rows written
+        """
+        data = {
+            "time": np.asarray(time, dtype=DTYPES["time"]),
+            "open": open_, "high": high, "low": low, "close": close, "volume": volume
+        }
+        data = {column: np.asarray(values, dtype=DTYPES[column]).ravel() for column, values in data.items()}
+        if not all(len(values) == len(data["time"]) for values in data.values()):
+            raise ValueError("Candle columns must have the same length")
+
+        if np.any(data["time"][1:] < data["time"][:-1]):
+            order = np.argsort(data["time"], kind="stable")
+            data = {column: values[order] for column, values in data.items()}
+        # Last row of each time wins
+        times = data["time"]
+        keep = np.ones(len(times), dtype=bool)
+        keep[:-1] = times[1:] != times[:-1]
+
+        with self._lock:
+            directory = self._dir(symbol, timeframe)
+            os.makedirs(directory, exist_ok=True)
+            rows = self._repair(symbol, timeframe)
+            if rows:
+                last = np.memmap(self._path(symbol, timeframe, "time"), dtype=DTYPES["time"], mode="r",
+                                 offset=(rows - 1) * 8, shape=(1,))[0]
+                keep &= times > last
+            if not keep.all():
+                data = {column: values[keep] for column, values in data.items()}
+            if len(data["time"]) == 0:
+                return 0
+            # time last: a partial append stays invisible (rows = shortest column)
+            for column in COLUMNS[1:] + COLUMNS[:1]:
+                with open(self._path(symbol, timeframe, column), "ab") as f:
+                    data[column].tofile(f)
+            return len(data["time"])
+
+    def append_batch(self, symbols: Sequence[str], batch) -> int:
+        """
+        Append an aggregator BarBatch (one append per symbol)
+
+        Args:
+            symbols: BarAggregator.symbols (batch.symbol holds positions)
+            batch: app.aggregator.BarBatch, sorted by (symbol, time)
+
+        Returns:
+            Number of rows written
+        """
+        if not len(batch):
+            return 0
+        cuts = np.flatnonzero(np.diff(batch.symbol)) + 1
+        written = 0
+        for start, stop in zip([0, *cuts.tolist()], [*cuts.tolist(), len(batch)]):
+            written += self.append(symbols[int(batch.symbol[start])], batch.timeframe, batch.time[start:stop],
+                                   batch.open[start:stop], batch.high[start:stop], batch.low[start:stop],
+                                   batch.close[start:stop], batch.volume[start:stop])
+        return written
+
+    def _repair(self, symbol: str, timeframe: str) -> int:
+        """Truncate columns left longer by an interrupted append"""
+        rows = self._rows_on_disk(symbol, timeframe)
+        for column in COLUMNS:
+            path = self._path(symbol, timeframe, column)
+            size = rows * DTYPES[column].itemsize
+            if not os.path.exists(path):
+                open(path, "wb").close()
+            elif os.path.getsize(path) != size:
+                logger.warning(f"⚠️ Candle store: truncating {path} to {rows} rows")
+                os.truncate(path, size)
+        return rows
+
+    def delete(self, symbol: str, timeframe: str):
+        """Remove a (symbol, timeframe) series"""
+        with self._lock:
+            self._maps.pop((symbol.upper(), self.timeframe_key(timeframe)), None)
+            for column in COLUMNS:
+                path = self._path(symbol, timeframe, column)
+                if os.path.exists(path):
+                    os.remove(path)
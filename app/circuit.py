@@ -0,0 +1,148 @@
+"""
+Circuit breaker for external providers (x.ai, DeepSeek)
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker
+
+    - closed: calls go through; `failure_threshold` consecutive failures open it
+    - open: calls are refused immediately (caller uses its fallback); a
+      background task probes the provider every `recovery_timeout` seconds
+    - half-open: a probe (or a single trial call when no event loop is
+      running) is in flight; success closes the circuit, failure re-opens it
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 30.0,
+        probe: Optional[Callable[[], Awaitable[bool]]] = None
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.probe = probe
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.total_failures = 0
+        self.total_successes = 0
+        self.short_circuited = 0
+        self.times_opened = 0
+        self._trial_started = 0.0
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may be attempted
+
+        Returns:
+            True to call the provider, False to go straight to the fallback
+        """
+        if self.state == self.CLOSED:
+            return True
+
+        now = time.monotonic()
+        if not self._probing() and (
+            (self.state == self.OPEN and now - self.opened_at >= self.recovery_timeout)
+            or (self.state == self.HALF_OPEN and now - self._trial_started >= self.recovery_timeout)
+        ):
+            # No background prober - let one real call through as the trial
+            # (a trial that never reported back, e.g. cancelled, is replaced)
+            self.state = self.HALF_OPEN
+            self._trial_started = now
+            return True
+
+        self.short_circuited += 1
+        return False
+
+    def record_success(self) -> None:
+        """Report a successful call"""
+        self.total_successes += 1
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit {self.name}: closed (provider recovered)")
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        """Report a failed call (error, bad response or timeout)"""
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        """Trip the breaker and start background probing"""
+        if self.state != self.OPEN:
+            self.times_opened += 1
+            logger.warning(
+                f"Circuit {self.name}: open after {self.consecutive_failures} failures "
+                f"- using fallback for {self.recovery_timeout:.0f}s"
+            )
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._schedule_probe()
+
+    def _probing(self) -> bool:
+        return self._probe_task is not None and not self._probe_task.done()
+
+    def _schedule_probe(self) -> None:
+        """Start the background prober if an event loop is running"""
+        if self.probe is None or self._probing():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._probe_task = loop.create_task(self._probe_loop())
+
+    async def _probe_loop(self) -> None:
+        """Probe the provider until it answers, then close the circuit"""
+        while self.state != self.CLOSED:
+            await asyncio.sleep(self.recovery_timeout)
+            if self.state == self.CLOSED:
+                return
+            self.state = self.HALF_OPEN
+            try:
+                ok = await self.probe()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                ok = False
+
+            if ok:
+                self.record_success()
+                return
+            logger.info(f"Circuit {self.name}: probe failed - staying open")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """Breaker state for /stats"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "recovery_timeout": self.recovery_timeout,
+            "open_for_s": round(time.monotonic() - self.opened_at, 1) if self.state != self.CLOSED else 0,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+            "total_failures": self.total_failures,
+            "total_successes": self.total_successes
+        }
@@ -15,6 +15,18 @@ class Config:
     # Telegram Configuration
     TELEGRAM_TOKEN: Optional[str] = os.getenv("TELEGRAM_TOKEN")
     TELEGRAM_CHAT_ID: Optional[str] = os.getenv("TELEGRAM_CHAT_ID")
+    TELEGRAM_API_URL: str = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+    TELEGRAM_TIMEOUT: float = float(os.getenv("TELEGRAM_TIMEOUT", "10.0"))
+    TELEGRAM_MAX_CONNECTIONS: int = int(os.getenv("TELEGRAM_MAX_CONNECTIONS", "20"))
+    
+    # Telegram Outbox (durable spool + background worker)
+    TELEGRAM_OUTBOX_PATH: str = os.getenv("TELEGRAM_OUTBOX_PATH", "data/telegram_outbox.db")
+    TELEGRAM_GLOBAL_RATE: float = float(os.getenv("TELEGRAM_GLOBAL_RATE", "25"))
+    TELEGRAM_CHAT_INTERVAL: float = float(os.getenv("TELEGRAM_CHAT_INTERVAL", "1.0"))
+    TELEGRAM_MAX_ATTEMPTS: int = int(os.getenv("TELEGRAM_MAX_ATTEMPTS", "10"))
+    TELEGRAM_OUTBOX_CONCURRENCY: int = int(os.getenv("TELEGRAM_OUTBOX_CONCURRENCY", "4"))
+    TELEGRAM_OUTBOX_LEASE: float = float(os.getenv("TELEGRAM_OUTBOX_LEASE", "120"))  # s before a 'sending' row is reclaimed
+    TELEGRAM_FLUSH_TIMEOUT: float = float(os.getenv("TELEGRAM_FLUSH_TIMEOUT", "10.0"))
     
     # Trading Parameters
     BASE_EQUITY: float = float(os.getenv("BASE_EQUITY", "5000"))
@@ -26,8 +38,76 @@ class Config:
     ATR_SL_MULT: float = float(os.getenv("ATR_SL_MULT", "1.5"))
     ATR_TP_MULT: float = float(os.getenv("ATR_TP_MULT", "2.0"))
     
+    # AI validation (GROK + DEEPSEEK)
+    AI_STAGE_TIMEOUT: float = float(os.getenv("AI_STAGE_TIMEOUT", "8.0"))
+    AI_CALL_TIMEOUT: float = float(os.getenv("AI_CALL_TIMEOUT", "10.0"))
+    AI_BREAKER_FAILURES: int = int(os.getenv("AI_BREAKER_FAILURES", "3"))
+    AI_BREAKER_RECOVERY: float = float(os.getenv("AI_BREAKER_RECOVERY", "30.0"))
+    
+    # AI verdict cache (LRU + TTL, optional SQLite persistence)
+    AI_CACHE_ENABLED: bool = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+    AI_CACHE_MAX_SIZE: int = int(os.getenv("AI_CACHE_MAX_SIZE", "1024"))
+    AI_CACHE_TTL: float = float(os.getenv("AI_CACHE_TTL", "900"))
+    AI_CACHE_ATR_BUCKET: float = float(os.getenv("AI_CACHE_ATR_BUCKET", "0.5"))
+    AI_CACHE_SQLITE_PATH: Optional[str] = os.getenv("AI_CACHE_SQLITE_PATH") or None
+    
+    # AI micro-batching (one prompt per provider for signal bursts)
+    AI_BATCH_ENABLED: bool = os.getenv("AI_BATCH_ENABLED", "false").lower() == "true"
+    AI_BATCH_WINDOW_MS: float = float(os.getenv("AI_BATCH_WINDOW_MS", "50"))
+    AI_BATCH_MAX_SIZE: int = int(os.getenv("AI_BATCH_MAX_SIZE", "8"))
+    
     # Anti-duplicate
     ANTI_SPAM_TTL: int = int(os.getenv("ANTI_SPAM_TTL", "300"))
+    ANTI_SPAM_MAX_ENTRIES: int = int(os.getenv("ANTI_SPAM_MAX_ENTRIES", "200000"))
+    DEDUP_BACKEND: str = os.getenv("DEDUP_BACKEND", "memory").lower()  # memory | sqlite | bloom
+    DEDUP_SQLITE_PATH: str = os.getenv("DEDUP_SQLITE_PATH", "data/dedup.db")
+    DEDUP_SNAPSHOT_PATH: Optional[str] = os.getenv("DEDUP_SNAPSHOT_PATH") or None
+    DEDUP_BLOOM_FP_RATE: float = float(os.getenv("DEDUP_BLOOM_FP_RATE", "0.0001"))
+    DEDUP_BLOOM_SLICES: int = int(os.getenv("DEDUP_BLOOM_SLICES", "4"))
+    
+    # Semantic dedup - same (symbol, direction, timeframe) within N bars / X*ATR
+    SEMANTIC_DEDUP_ENABLED: bool = os.getenv("SEMANTIC_DEDUP_ENABLED", "true").lower() == "true"
+    SEMANTIC_DEDUP_BARS: int = int(os.getenv("SEMANTIC_DEDUP_BARS", "1"))
+    SEMANTIC_DEDUP_ATR_MULT: float = float(os.getenv("SEMANTIC_DEDUP_ATR_MULT", "0.5"))
+    SEMANTIC_DEDUP_LOOKBACK: int = int(os.getenv("SEMANTIC_DEDUP_LOOKBACK", "10"))
+    
+    # /tv/batch (NDJSON or JSON array)
+    TV_BATCH_MAX_RECORDS: int = int(os.getenv("TV_BATCH_MAX_RECORDS", "500"))
+    
+    # Payload verification (structure + last close / ATR of the candle cache)
+    VERIFY_ENABLED: bool = os.getenv("VERIFY_ENABLED", "true").lower() == "true"
+    VERIFY_LEVEL_TOLERANCE: float = float(os.getenv("VERIFY_LEVEL_TOLERANCE", "0.10"))
+    VERIFY_LEVELS_STRICT: bool = os.getenv("VERIFY_LEVELS_STRICT", "false").lower() == "true"  # else report-only
+    VERIFY_MAX_AGE_BARS: int = int(os.getenv("VERIFY_MAX_AGE_BARS", "3"))
+    VERIFY_PRICE_ATR_MULT: float = float(os.getenv("VERIFY_PRICE_ATR_MULT", "3.0"))
+    VERIFY_ATR_RATIO: float = float(os.getenv("VERIFY_ATR_RATIO", "4.0"))
+    
+    # Market data - memory-mapped candle store
+    CANDLE_STORE_PATH: str = os.getenv("CANDLE_STORE_PATH", "data/candles")
+    
+    # Scanner - SMC detection on our own bars (Binance trades), sharded by symbol
+    SCANNER_ENABLED: bool = os.getenv("SCANNER_ENABLED", "false").lower() == "true"
+    SCANNER_SHARDS: int = int(os.getenv("SCANNER_SHARDS", "4"))
+    SCANNER_WARMUP_BARS: int = int(os.getenv("SCANNER_WARMUP_BARS", "500"))
+    SCANNER_PERSIST_BARS: bool = os.getenv("SCANNER_PERSIST_BARS", "true").lower() == "true"  # closed bars -> CandleStore
+    
+    # Shadow evaluation of the Pine variants (never sent, counted per variant)
+    SHADOW_ENABLED: bool = os.getenv("SHADOW_ENABLED", "false").lower() == "true"
+    SHADOW_WINDOW_BARS: int = int(os.getenv("SHADOW_WINDOW_BARS", "500"))
+    SHADOW_MAX_HOLD_BARS: int = int(os.getenv("SHADOW_MAX_HOLD_BARS", "200"))
+    
+    # Multi-timeframe state - higher-timeframe alignment of every signal
+    MTF_ENABLED: bool = os.getenv("MTF_ENABLED", "true").lower() == "true"
+    MTF_TIMEFRAMES: str = os.getenv("MTF_TIMEFRAMES", "1,5,15,60,240")
+    MTF_RING_SIZE: int = int(os.getenv("MTF_RING_SIZE", "16"))
+    MTF_MAX_AGE_BARS: int = int(os.getenv("MTF_MAX_AGE_BARS", "2"))
+    MTF_SCORE_ENABLED: bool = os.getenv("MTF_SCORE_ENABLED", "false").lower() == "true"
+    MTF_SCORE_POINTS: float = float(os.getenv("MTF_SCORE_POINTS", "10.0"))
+    
+    # Active OB / FVG zones (interval index, fed by the scanner)
+    ZONE_TOUCH_ATR: float = float(os.getenv("ZONE_TOUCH_ATR", "0.1"))
+    ZONE_MAX_AGE_DAYS: float = float(os.getenv("ZONE_MAX_AGE_DAYS", "30"))
+    ZONE_WARMUP_BARS: int = int(os.getenv("ZONE_WARMUP_BARS", "5000"))
     
     @classmethod
     def validate(cls) -> bool:
@@ -0,0 +1,263 @@
+"""
+Fast-path decoder for TradingView webhook payloads
+
+Accepts both payload layouts sent by the Pine scripts:
+- flat: {"event_id", "symbol", "entry", "sl", "tp", "atr", "poi_valid", ...}
+- nested (TVPayload): {"event_id", "symbol", "price_ctx": {"entry", ...}, "flags": {...}}
+
+JSON parsing and type checks run in one pass through a pydantic-core
+validator compiled once; the result is packed into a compact Signal with
+the SMC flags as a bitmask. Invalid payloads raise DecodeError with a
+reason code.
+"""
+import json
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple, Union
+
+from annotated_types import Gt, MinLen
+from pydantic import AllowInfNan, Strict, TypeAdapter, ValidationError
+from typing_extensions import Annotated, Required, TypedDict
+
+from app.smc import FLAG_NAMES, flag_count
+
+Number = Annotated[float, Strict(), AllowInfNan(False)]
+Text = Annotated[str, Strict()]
+Name = Annotated[str, Strict(), MinLen(1)]
+Flag = Annotated[bool, Strict()]
+
+
+class _FlagFields(TypedDict, total=False):
+    poi_valid: Flag
+    fvg_open: Flag
+    ob_valid: Flag
+    bos_confirm: Flag
+    choch_confirm: Flag
+    liq_swept: Flag
+    imbalance_filled: Flag
+    trend_aligned: Flag
+    volume_confirm: Flag
+    time_filter: Flag
+
+
+class _PriceFields(TypedDict, total=False):
+    entry: Annotated[Number, Gt(0)]
+    sl: Optional[Number]
+    tp: Optional[Number]
+
+
+class _Payload(_FlagFields, _PriceFields, total=False):
+    """Union of both layouts - extra keys (asset_type, ref_high...) are ignored"""
+    event_id: Required[Name]
+    symbol: Required[Name]
+    direction: Required[Literal["LONG", "SHORT"]]
+    timeframe: Union[Text, Annotated[int, Strict()]]
+    atr: Optional[Number]
+    price_ctx: _PriceFields
+    flags: _FlagFields
+
+
+class DecodeError(ValueError):
+    """Payload rejected by the decoder"""
+
+    def __init__(self, code: str, field: Optional[str] = None, message: str = ""):
+        super().__init__(message or code)
+        self.code = code
+        self.field = field
+
+
+@dataclass(slots=True)
+class Signal:
+    """Decoded webhook signal"""
+    event_id: str
+    symbol: str
+    timeframe: str
+    direction: str
+    entry: float
+    sl: Optional[float]
+    tp: Optional[float]
+    atr: Optional[float]
+    flags: int
+
+    def has_flag(self, flag_name: str) -> bool:
+        """True if the named SMC flag is set"""
+        return bool(self.flags >> FLAG_NAMES.index(flag_name) & 1)
+
+    def flags_dict(self) -> Dict[str, bool]:
+        """Flags as {name: bool}, in FLAG_NAMES order"""
+        mask = self.flags
+        return {name: bool(mask >> bit & 1) for bit, name in enumerate(FLAG_NAMES)}
+
+    @property
+    def flag_count(self) -> int:
+        """Number of active flags"""
+        return flag_count(self.flags)
+
+
+class SignalDecoder:
+    """
+    Payload decoder - build once, reuse for every request
+
+    The pydantic-core validator and the flag bit table are prepared in
+    __init__; decode() only runs the compiled validator and packs the flags.
+    """
+
+    def __init__(self):
+        self._adapter = TypeAdapter(_Payload)
+        self._flag_bits: Tuple[Tuple[str, int], ...] = tuple(
+            (name, 1 << bit) for bit, name in enumerate(FLAG_NAMES)
+        )
+
+    def decode_bytes(self, body: bytes) -> Signal:
+        """
+        Decode a raw request body
+
+        Args:
+            body: JSON bytes
+
+        Returns:
+            Decoded Signal
+
+        Raises:
+            DecodeError: invalid JSON or invalid payload
+        """
+        try:
+            data = self._adapter.validate_json(body)
+        except ValidationError as e:
+            raise _reason(e)
+        return self._build(data)
+
+    def decode(self, data: Any) -> Signal:
+        """
+        Decode an already-parsed payload
+
+        Args:
+            data: Parsed JSON (dict)
+
+        Returns:
+            Decoded Signal
+
+        Raises:
+            DecodeError: with a reason code (missing_*, invalid_*)
+        """
+        try:
+            data = self._adapter.validate_python(data)
+        except ValidationError as e:
+            raise _reason(e)
+        return self._build(data)
+
+    async def decode_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        max_records: int = 500
+    ) -> List[Union[Signal, DecodeError]]:
+        """
+        Decode a batch body: NDJSON (one payload per line) or a JSON array
+
+        NDJSON lines are decoded as the chunks arrive; a JSON array is
+        decoded once the body is complete. Invalid records do not fail the
+        batch, their DecodeError takes their slot in the result.
+
+        Args:
+            chunks: Body chunks (request.stream())
+            max_records: Maximum number of records accepted
+
+        Returns:
+            One Signal or DecodeError per record, in input order
+
+        Raises:
+            DecodeError: invalid_json (body not an array / NDJSON) or too_many_records
+        """
+        records: List[Union[Signal, DecodeError]] = []
+        parts: List[bytes] = []
+        pending = b""
+        is_array = None
+
+        async for chunk in chunks:
+            if is_array is None:
+                pending += chunk
+                head = pending.lstrip()
+                if not head:
+                    continue
+                is_array = head[:1] == b"["
+                chunk, pending = pending, b""
+            if is_array:
+                parts.append(chunk)
+                continue
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                self._decode_record(line, records)
+            if len(records) > max_records:
+                raise DecodeError("too_many_records", message=f"More than {max_records} records")
+
+        if is_array:
+            try:
+                items = json.loads(b"".join(parts))
+            except ValueError as e:
+                raise DecodeError("invalid_json", message=f"Invalid JSON format: {e}")
+            if not isinstance(items, list):
+                raise DecodeError("invalid_json", message="Batch must be a JSON array or NDJSON")
+            if len(items) > max_records:
+                raise DecodeError("too_many_records", message=f"More than {max_records} records")
+            for item in items:
+                try:
+                    records.append(self.decode(item))
+                except DecodeError as e:
+                    records.append(e)
+        else:
+            self._decode_record(pending, records)
+            if len(records) > max_records:
+                raise DecodeError("too_many_records", message=f"More than {max_records} records")
+        return records
+
+    def _decode_record(self, line: bytes, records: List[Union[Signal, DecodeError]]) -> None:
+        """Decode one NDJSON line into records (blank lines are skipped)"""
+        if not line.strip():
+            return
+        try:
+            records.append(self.decode_bytes(line))
+        except DecodeError as e:
+            records.append(e)
+
+    def _build(self, data: Dict) -> Signal:
+        """Pick the price/flag source for the layout and pack the flags"""
+        prices = data.get("price_ctx", data)
+        entry = prices.get("entry")
+        if entry is None:
+            raise DecodeError("missing_entry", "entry")
+
+        flags = data.get("flags", data)
+        mask = 0
+        for name, bit in self._flag_bits:
+            if flags.get(name):
+                mask |= bit
+
+        # Strip exchange prefix (BYBIT:, BINANCE:...) if Pine forgot to
+        symbol = data["symbol"].rpartition(":")[2]
+        return Signal(
+            data["event_id"],
+            symbol,
+            str(data.get("timeframe", "Unknown")),
+            data["direction"],
+            entry,
+            prices.get("sl", data.get("sl")),
+            prices.get("tp", data.get("tp")),
+            data.get("atr"),
+            mask
+        )
+
+
+def _reason(error: ValidationError) -> DecodeError:
+    """Map the first validation error to a reason code"""
+    first = error.errors(include_url=False)[0]
+    loc = [part for part in first["loc"] if isinstance(part, str)]
+    if first["type"] == "json_invalid":
+        return DecodeError("invalid_json", message=f"Invalid JSON format: {first['msg']}")
+    if not loc:
+        return DecodeError("invalid_payload", message="Payload must be a JSON object")
+    field = loc[-1]
+    if first["type"] == "missing":
+        return DecodeError(f"missing_{field}", field, first["msg"])
+    if field in FLAG_NAMES:
+        return DecodeError("invalid_flag", field, first["msg"])
+    return DecodeError(f"invalid_{field}", field, first["msg"])
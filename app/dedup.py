@@ -0,0 +1,530 @@
+"""
+Anti-duplicate storage backends
+
+- MemoryDedupStore: per-process ordered dict (optionally snapshotted to disk
+  on shutdown and reloaded on startup, so redeploys keep their state)
+- SQLiteDedupStore: SQLite file in WAL mode shared by every uvicorn worker
+  on the host; each check is a single atomic upsert
+- BloomDedupStore: time-sliced Bloom filter over 64-bit event keys, for very
+  high alert volumes (bounded memory, configurable false-positive rate)
+
+SemanticDedupIndex is a second layer that catches the same setup fired
+under different event_ids (Pine variants, consecutive bars). It lives in
+the process, except with the sqlite backend where SQLiteSemanticDedupIndex
+keeps the buckets in the shared file.
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class DedupStore:
+    """Interface shared by all dedup backends"""
+
+    backend = "base"
+
+    def check_and_add(self, event_id: str, ttl_seconds: float, max_entries: Optional[int] = None) -> bool:
+        """
+        Atomically check event_id and record it if new
+
+        Args:
+            event_id: Unique event identifier
+            ttl_seconds: Time-to-live in seconds
+            max_entries: Hard cap on live entries (None = store default)
+
+        Returns:
+            True if duplicate, False if new
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def size(self) -> int:
+        raise NotImplementedError
+
+    def keys(self) -> Set[str]:
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        return {"backend": self.backend, "size": self.size()}
+
+    def load(self) -> None:
+        """Restore state on startup (no-op by default)"""
+
+    def close(self) -> None:
+        """Persist / release state on shutdown (no-op by default)"""
+
+
+class MemoryDedupStore(DedupStore):
+    """
+    In-process dedup cache
+
+    Insertion order == timestamp order, so expired entries are always at
+    the front: cleanup pops from the left and stops at the first live one
+    (amortized O(1) per call). The oldest entries are evicted beyond
+    `max_entries`.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 200000, snapshot_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.snapshot_path = snapshot_path or None
+        self._cache: "OrderedDict[str, float]" = OrderedDict()
+        self.expired = 0
+        self.evicted = 0
+
+    def check_and_add(self, event_id: str, ttl_seconds: float, max_entries: Optional[int] = None) -> bool:
+        current_time = time.time()
+        self._cleanup(current_time, ttl_seconds)
+
+        if event_id in self._cache:
+            return True
+
+        self._cache[event_id] = current_time
+
+        limit = self.max_entries if max_entries is None else max_entries
+        while len(self._cache) > limit:
+            self._cache.popitem(last=False)
+            self.evicted += 1
+
+        return False
+
+    def _cleanup(self, current_time: float, ttl_seconds: float) -> None:
+        """Remove expired entries from the front of the cache"""
+        cache = self._cache
+        while cache:
+            key, timestamp = next(iter(cache.items()))
+            if current_time - timestamp <= ttl_seconds:
+                break
+            cache.popitem(last=False)
+            self.expired += 1
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def size(self) -> int:
+        return len(self._cache)
+
+    def keys(self) -> Set[str]:
+        return set(self._cache.keys())
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.backend,
+            "size": len(self._cache),
+            "max_entries": self.max_entries,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "snapshot": self.snapshot_path
+        }
+
+    def load(self) -> None:
+        """Reload the snapshot written by close() (entries keep their timestamps)"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dedup snapshot unreadable ({e}) - starting empty")
+            return
+        for event_id, timestamp in sorted(entries.items(), key=lambda item: item[1]):
+            self._cache[event_id] = timestamp
+        logger.info(f"Dedup snapshot loaded: {len(entries)} entries")
+
+    def close(self) -> None:
+        """Write the live entries to the snapshot file (atomic replace)"""
+        if not self.snapshot_path:
+            return
+        directory = os.path.dirname(self.snapshot_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._cache, f)
+        os.replace(tmp_path, self.snapshot_path)
+        logger.info(f"Dedup snapshot saved: {len(self._cache)} entries")
+
+
+class SQLiteDedupStore(DedupStore):
+    """
+    Dedup table in a local SQLite file (WAL), shared across processes
+
+    check_and_add is one upsert: it inserts a new id, or refreshes an
+    expired one, and reports "new" only if a row changed. SQLite serializes
+    writers, so two workers can never both accept the same event_id.
+    Expired rows are purged every `cleanup_every` calls.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str, max_entries: int = 200000, cleanup_every: int = 1000):
+        self.path = path
+        self.max_entries = max_entries
+        self.cleanup_every = cleanup_every
+        self._calls = 0
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, isolation_level=None, timeout=5.0, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS seen (event_id TEXT PRIMARY KEY, ts REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_seen_ts ON seen (ts)")
+        return self._db
+
+    def check_and_add(self, event_id: str, ttl_seconds: float, max_entries: Optional[int] = None) -> bool:
+        db = self._conn()
+        now = time.time()
+        cursor = db.execute(
+            "INSERT INTO seen (event_id, ts) VALUES (?, ?) "
+            "ON CONFLICT(event_id) DO UPDATE SET ts = excluded.ts WHERE seen.ts < ?",
+            (event_id, now, now - ttl_seconds)
+        )
+        is_new = cursor.rowcount == 1
+
+        self._calls += 1
+        if self._calls % self.cleanup_every == 0:
+            self._cleanup(now, ttl_seconds, self.max_entries if max_entries is None else max_entries)
+
+        return not is_new
+
+    def _cleanup(self, now: float, ttl_seconds: float, limit: int) -> None:
+        """Purge expired rows, then the oldest rows beyond the cap"""
+        db = self._conn()
+        db.execute("DELETE FROM seen WHERE ts < ?", (now - ttl_seconds,))
+        db.execute(
+            "DELETE FROM seen WHERE event_id IN ("
+            "SELECT event_id FROM seen ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+            (limit,)
+        )
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM seen")
+
+    def size(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def keys(self) -> Set[str]:
+        return {row[0] for row in self._conn().execute("SELECT event_id FROM seen")}
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.backend,
+            "size": self.size(),
+            "max_entries": self.max_entries,
+            "path": self.path
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def event_key(event_id: str) -> int:
+    """
+    Hash an event_id to a compact 64-bit key
+
+    Args:
+        event_id: Unique event identifier (e.g. BTCUSDT.P_1730736000000_LONG)
+
+    Returns:
+        Unsigned 64-bit integer
+    """
+    return int.from_bytes(hashlib.blake2b(event_id.encode(), digest_size=8).digest(), "little")
+
+
+class BloomDedupStore(DedupStore):
+    """
+    Time-sliced Bloom filter
+
+    The TTL window is split into `slices - 1` periods; each period writes to
+    its own bit array and the oldest array is wiped when time moves on, so
+    memory stays fixed whatever the alert rate. A lookup checks all slices,
+    hence entries live between ttl and ttl * slices / (slices - 1).
+
+    Each slice is sized for `capacity` keys at `fp_rate / slices`, so the
+    combined false-positive rate (a new signal reported as duplicate) stays
+    at or below `fp_rate`. There are no false negatives within the TTL.
+    """
+
+    backend = "bloom"
+
+    def __init__(self, ttl_seconds: float, capacity: int = 200000, fp_rate: float = 1e-4, slices: int = 4):
+        self.ttl_seconds = ttl_seconds
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.slices = max(2, slices)
+        self.slice_seconds = ttl_seconds / (self.slices - 1)
+
+        slice_fp = fp_rate / self.slices
+        self.num_bits = max(64, int(math.ceil(-capacity * math.log(slice_fp) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits: List[bytearray] = [bytearray((self.num_bits + 7) // 8) for _ in range(self.slices)]
+        self._counts: List[int] = [0] * self.slices
+        self._slot = int(time.time() // self.slice_seconds)
+
+    def _rotate(self, now: float) -> int:
+        """Wipe slices whose period has passed; return the current slice index"""
+        slot = int(now // self.slice_seconds)
+        if slot != self._slot:
+            for expired in range(max(self._slot + 1, slot - self.slices + 1), slot + 1):
+                index = expired % self.slices
+                self._bits[index] = bytearray(len(self._bits[index]))
+                self._counts[index] = 0
+            self._slot = slot
+        return slot % self.slices
+
+    def _positions(self, key: int) -> List[int]:
+        """Double hashing (Kirsch-Mitzenmacher) on the two 32-bit halves"""
+        h1 = key & 0xFFFFFFFF
+        h2 = (key >> 32) | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def _seen(self, positions: List[int]) -> bool:
+        """True if every bit is set in at least one slice"""
+        for bits in self._bits:
+            if all(bits[p >> 3] & (1 << (p & 7)) for p in positions):
+                return True
+        return False
+
+    def might_contain(self, event_id: str) -> bool:
+        """Membership test without inserting (may be a false positive)"""
+        self._rotate(time.time())
+        return self._seen(self._positions(event_key(event_id)))
+
+    def check_and_add(self, event_id: str, ttl_seconds: float, max_entries: Optional[int] = None) -> bool:
+        current = self._rotate(time.time())
+        positions = self._positions(event_key(event_id))
+
+        if self._seen(positions):
+            return True
+
+        bits = self._bits[current]
+        for p in positions:
+            bits[p >> 3] |= 1 << (p & 7)
+        self._counts[current] += 1
+        return False
+
+    def clear(self) -> None:
+        for index in range(self.slices):
+            self._bits[index] = bytearray(len(self._bits[index]))
+            self._counts[index] = 0
+
+    def size(self) -> int:
+        """Approximate number of live event_ids (inserts in the active slices)"""
+        self._rotate(time.time())
+        return sum(self._counts)
+
+    def keys(self) -> Set[str]:
+        """A Bloom filter does not keep the event_ids"""
+        return set()
+
+    def estimated_fp_rate(self) -> float:
+        """Current probability that a new event_id is reported as duplicate"""
+        miss_all = 1.0
+        for count in self._counts:
+            slice_fp = (1 - math.exp(-self.num_hashes * count / self.num_bits)) ** self.num_hashes
+            miss_all *= 1 - slice_fp
+        return 1 - miss_all
+
+    def stats(self) -> Dict:
+        self._rotate(time.time())
+        return {
+            "backend": self.backend,
+            "size": sum(self._counts),
+            "capacity": self.capacity,
+            "slices": self.slices,
+            "slice_seconds": round(self.slice_seconds, 1),
+            "bits_per_slice": self.num_bits,
+            "hashes": self.num_hashes,
+            "memory_bytes": sum(len(bits) for bits in self._bits),
+            "target_fp_rate": self.fp_rate,
+            "estimated_fp_rate": self.estimated_fp_rate()
+        }
+
+
+class SemanticDedupIndex:
+    """
+    Near-duplicate suppression by (symbol, direction, timeframe)
+
+    Each key holds a tiny dict {bar_index: [entries]} covering the last
+    `lookback_bars` bars only, so a lookup reads at most lookback_bars + 1
+    buckets (O(1)). A signal is suppressed when a previous accepted signal
+    on the same key is:
+    - within `min_bars` bars, whatever its price, or
+    - within `lookback_bars` bars and `atr_mult` x ATR of its entry
+    """
+
+    def __init__(self, min_bars: int = 1, atr_mult: float = 0.5, lookback_bars: int = 10):
+        self.min_bars = min_bars
+        self.atr_mult = atr_mult
+        self.lookback_bars = max(min_bars, lookback_bars)
+        self._index: Dict[Tuple[str, str, str], Dict[int, List[float]]] = {}
+        self.checked = 0
+        self.suppressed = 0
+
+    def check_and_add(
+        self,
+        symbol: str,
+        direction: str,
+        timeframe: str,
+        bar_index: int,
+        entry: Optional[float],
+        atr: Optional[float]
+    ) -> Optional[str]:
+        """
+        Check a signal against recent accepted ones and record it if kept
+
+        Args:
+            symbol: Trading symbol
+            direction: LONG / SHORT
+            timeframe: Chart timeframe
+            bar_index: Bar number (bar open time // timeframe seconds)
+            entry: Entry price
+            atr: ATR of the signal
+
+        Returns:
+            None if the signal is new, else the matching rule
+            ("same_window" or "near_entry")
+        """
+        self.checked += 1
+        buckets = self._index.setdefault((symbol, direction, str(timeframe)), {})
+        match = self._match(buckets, bar_index, entry, atr)
+        if match:
+            self.suppressed += 1
+            return match
+
+        buckets.setdefault(bar_index, []).append(entry)
+        oldest = bar_index - self.lookback_bars
+        for stale in [b for b in buckets if b < oldest]:
+            del buckets[stale]
+        return None
+
+    def _match(
+        self,
+        buckets: Dict[int, List[float]],
+        bar_index: int,
+        entry: Optional[float],
+        atr: Optional[float]
+    ) -> Optional[str]:
+        """Rule matched against the accepted signals of one key, newest bar first"""
+        proximity = (atr or 0) * self.atr_mult
+        for bars_ago in range(self.lookback_bars + 1):
+            previous = buckets.get(bar_index - bars_ago)
+            if not previous:
+                continue
+            if bars_ago <= self.min_bars:
+                return "same_window"
+            if entry is not None and proximity > 0 and any(
+                p is not None and abs(entry - p) <= proximity for p in previous
+            ):
+                return "near_entry"
+        return None
+
+    def clear(self) -> None:
+        self._index.clear()
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict:
+        return {
+            "shared": False,
+            "keys": len(self._index),
+            "checked": self.checked,
+            "suppressed": self.suppressed,
+            "min_bars": self.min_bars,
+            "atr_mult": self.atr_mult,
+            "lookback_bars": self.lookback_bars
+        }
+
+
+class SQLiteSemanticDedupIndex(SemanticDedupIndex):
+    """
+    SemanticDedupIndex stored in the SQLite dedup file, shared by workers
+
+    Check and insert run in one BEGIN IMMEDIATE transaction, so two workers
+    receiving the same setup under different event_ids cannot both accept
+    it. Rows older than `lookback_bars` are deleted per key on insert.
+    """
+
+    def __init__(self, path: str, min_bars: int = 1, atr_mult: float = 0.5, lookback_bars: int = 10):
+        super().__init__(min_bars, atr_mult, lookback_bars)
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, isolation_level=None, timeout=5.0, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS semantic (setup TEXT NOT NULL, bar_index INTEGER NOT NULL, entry REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_semantic_setup ON semantic (setup, bar_index)")
+        return self._db
+
+    def check_and_add(
+        self,
+        symbol: str,
+        direction: str,
+        timeframe: str,
+        bar_index: int,
+        entry: Optional[float],
+        atr: Optional[float]
+    ) -> Optional[str]:
+        self.checked += 1
+        setup = f"{symbol}|{direction}|{timeframe}"
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            buckets: Dict[int, List[float]] = {}
+            for index, price in db.execute(
+                "SELECT bar_index, entry FROM semantic WHERE setup = ? AND bar_index BETWEEN ? AND ?",
+                (setup, bar_index - self.lookback_bars, bar_index)
+            ):
+                buckets.setdefault(index, []).append(price)
+            match = self._match(buckets, bar_index, entry, atr)
+            if not match:
+                db.execute("INSERT INTO semantic (setup, bar_index, entry) VALUES (?, ?, ?)", (setup, bar_index, entry))
+                db.execute("DELETE FROM semantic WHERE setup = ? AND bar_index < ?",
+                           (setup, bar_index - self.lookback_bars))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        if match:
+            self.suppressed += 1
+        return match
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM semantic")
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict:
+        keys = self._conn().execute("SELECT COUNT(DISTINCT setup) FROM semantic").fetchone()[0]
+        return dict(super().stats(), shared=True, keys=keys, path=self.path)
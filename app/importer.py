@@ -0,0 +1,366 @@
+"""
+Bulk kline importer -> CandleStore
+
+Loads exchange kline dumps into app.candles.CandleStore:
+- Binance CSV (data.binance.vision layout: open_time, open, high, low,
+  close, volume, close_time, ..., optional header, plain or .zip)
+- Binance REST JSON ([[open_time, "open", "high", ...], ...], array or NDJSON)
+
+Files are read in fixed-size byte blocks cut on record boundaries and
+each block is converted with one vectorized np.loadtxt call, so memory
+stays bounded whatever the file size. Overlaps are dropped by
+CandleStore.append; a checkpoint (byte offset per file) lets an
+interrupted import resume. Symbols are imported in parallel processes.
+
+Dumps are stored under the live symbol (SUPPORTED_SYMBOLS key): the
+Binance file name BTCUSDT-1m-... goes to BTCUSDT.P, the series the
+scanner, verifier, zone index and shadow variants warm up from.
+
+Usage: python -m app.importer DIRECTORY [WORKERS] [--suffix SUFFIX]
+"""
+import io
+import json
+import logging
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.candles import CandleStore
+from app.smc import SUPPORTED_SYMBOLS
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BYTES = 64 * 1024 * 1024  # ~700k Binance CSV rows per block
+CHECKPOINT_FILE = "import_checkpoint.json"
+
+# data.binance.vision: BTCUSDT-1m-2024-01.csv / .zip
+_FILENAME_RE = re.compile(r"^(?P<symbol>[A-Z0-9]+)-(?P<interval>\d+[smhdwM])-.*\.(?:csv|zip|json)$")
+_INTERVAL_MINUTES = {"m": 1, "h": 60, "d": 1440, "w": 10080}
+_JSON_STRIP = b' \t\r\n"'
+# Exchange symbol -> supported symbol with a suffix ("BTCUSDT" -> "BTCUSDT.P")
+_SUPPORTED_BASE = {symbol.split(".")[0]: symbol for symbol in SUPPORTED_SYMBOLS if "." in symbol}
+
+
+@dataclass(slots=True)
+class ImportStats:
+    """Result of one (symbol, timeframe) import"""
+    symbol: str
+    timeframe: str
+    files: int
+    rows_read: int
+    rows_written: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds > 0 else 0.0
+
+
+def binance_timeframe(interval: str) -> str:
+    """
+    Binance interval to TradingView timeframe ("1m" -> "1", "4h" -> "240", "1d" -> "1440")
+    """
+    count, unit = int(interval[:-1]), interval[-1]
+    if unit not in _INTERVAL_MINUTES:
+        raise ValueError(f"Unsupported kline interval: {interval}")
+    return str(count * _INTERVAL_MINUTES[unit])
+
+
+def live_symbol(name: str, suffix: Optional[str] = None) -> str:
+    """
+    Store symbol of a dump ("BTCUSDT" -> "BTCUSDT.P")
+
+    Args:
+        name: Symbol of the dump file name
+        suffix: Appended as-is if given ("" keeps the file name), else the
+            SUPPORTED_SYMBOLS key the name is the base of
+
+    Returns:
+        Symbol the candles are stored under
+    """
+    if suffix is not None:
+        return name + suffix
+    if name in SUPPORTED_SYMBOLS:
+        return name
+    return _SUPPORTED_BASE.get(name, name)
+
+
+# === PARSING ===
+
+@contextmanager
+def _open(path: str):
+    """Binary stream of a dump (first member of a .zip), archive closed on exit"""
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive, archive.open(archive.namelist()[0]) as stream:
+            yield stream
+    else:
+        with open(path, "rb") as stream:
+            yield stream
+
+
+def _parse_block(block: bytes, is_json: bool) -> Tuple[np.ndarray, ...]:
+    """
+    Complete records -> (time, open, high, low, close, volume) arrays
+
+    JSON records are turned into CSV lines first (strip quotes/blanks,
+    "]," / "][" -> newline, drop brackets).
+    """
+    if is_json:
+        block = block.translate(None, _JSON_STRIP)
+        block = block.replace(b"],", b"\n").replace(b"][", b"\n").translate(None, b"[]").lstrip(b",")
+    elif block[:1].isalpha() or block[:1] == b'"':
+        block = block[block.find(b"\n") + 1:]  # CSV header
+    if not block.strip():
+        empty = np.empty(0)
+        return (empty.astype(np.int64),) + (empty,) * 5
+    table = np.loadtxt(io.BytesIO(block), delimiter=",", usecols=range(6), dtype=np.float64, ndmin=2)
+    times = table[:, 0].astype(np.int64)
+    # Binance spot dumps switched to microseconds in 2025
+    times = np.where(times > 10**14, times // 1000, times)
+    return (times,) + tuple(np.ascontiguousarray(table[:, k]) for k in range(1, 6))
+
+
+def iter_blocks(
+    path: str,
+    offset: int = 0,
+    chunk_bytes: int = CHUNK_BYTES,
+    separator: bytes = b"\n"
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    Read a dump in blocks of complete records
+
+    Args:
+        path: File (.zip: first member)
+        offset: Byte offset to resume from (record boundary from a previous run)
+        chunk_bytes: Block size
+        separator: Record terminator, blocks are cut right after its last occurrence
+
+    Yields:
+        (byte offset after the block, block)
+    """
+    with _open(path) as stream:
+        if offset:
+            if stream.seekable():
+                stream.seek(offset)
+            else:
+                remaining = offset
+                while remaining:
+                    remaining -= len(stream.read(min(remaining, chunk_bytes)))
+        position, carry = offset, b""
+        while True:
+            data = stream.read(chunk_bytes)
+            block = carry + data
+            if not data:
+                if block.strip():
+                    yield position + len(block), block
+                return
+            cut = block.rfind(separator)
+            if cut < 0:
+                carry = block
+                continue
+            cut += len(separator)
+            carry = block[cut:]
+            position += cut
+            yield position, block[:cut]
+
+
+def iter_chunks(
+    path: str,
+    offset: int = 0,
+    chunk_bytes: int = CHUNK_BYTES
+) -> Iterator[Tuple[int, Tuple[np.ndarray, ...]]]:
+    """
+    Parse a kline dump block by block
+
+    Args:
+        path: CSV / JSON / .zip file
+        offset: Byte offset to resume from (record boundary from a previous run)
+        chunk_bytes: Block size
+
+    Yields:
+        (byte offset after the block, (time, open, high, low, close, volume))
+    """
+    is_json = ".json" in path
+    separator = b"]" if is_json else b"\n"  # a kline record never nests a list
+    for position, block in iter_blocks(path, offset, chunk_bytes, separator):
+        yield position, _parse_block(block, is_json)
+
+
+def _first_time(path: str) -> int:
+    """Open time of the first record (files are imported in time order)"""
+    with _open(path) as stream:
+        head = stream.read(4096)
+    match = re.search(rb"\d{12,}", head)
+    if not match:
+        return 0
+    value = int(match.group())
+    return value // 1000 if value > 10**14 else value
+
+
+# === CHECKPOINT ===
+
+def _checkpoint_path(store: CandleStore, symbol: str, timeframe: str) -> str:
+    return os.path.join(store.root, symbol.upper(), store.timeframe_key(timeframe), CHECKPOINT_FILE)
+
+
+def _load_checkpoint(path: str) -> Dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_checkpoint(path: str, checkpoint: Dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+# === IMPORT ===
+
+def import_klines(
+    symbol: str,
+    timeframe: str,
+    paths: List[str],
+    root: Optional[str] = None,
+    chunk_bytes: int = CHUNK_BYTES
+) -> ImportStats:
+    """
+    Import kline dumps of one symbol/timeframe
+
+    Files are sorted by their first open time; rows already stored are
+    skipped by CandleStore.append. Progress is checkpointed after every
+    block (file size + byte offset), a re-run resumes where it stopped.
+
+    Args:
+        symbol: Trading symbol
+        timeframe: TradingView timeframe
+        paths: Dump files
+        root: CandleStore root (Config.CANDLE_STORE_PATH if None)
+        chunk_bytes: Parse block size
+
+    Returns:
+        ImportStats
+    """
+    store = CandleStore(root)
+    checkpoint_path = _checkpoint_path(store, symbol, timeframe)
+    checkpoint = _load_checkpoint(checkpoint_path)
+    rows_read = rows_written = 0
+    start = time.perf_counter()
+
+    for path in sorted(paths, key=_first_time):
+        key = os.path.abspath(path)
+        size = os.path.getsize(path)
+        state = checkpoint.get(key)
+        if state and state["size"] != size:
+            state = None  # file replaced since the last run
+        if state and state.get("done"):
+            continue
+        offset = state["offset"] if state else 0
+
+        for offset, (times, *ohlcv) in iter_chunks(path, offset, chunk_bytes):
+            rows_read += len(times)
+            rows_written += store.append(symbol, timeframe, times, *ohlcv)
+            checkpoint[key] = {"size": size, "offset": offset, "done": False}
+            _save_checkpoint(checkpoint_path, checkpoint)
+        checkpoint[key] = {"size": size, "offset": offset, "done": True}
+        _save_checkpoint(checkpoint_path, checkpoint)
+
+    stats = ImportStats(symbol.upper(), store.timeframe_key(timeframe), len(paths),
+                        rows_read, rows_written, time.perf_counter() - start)
+    logger.info(f"📥 {stats.symbol} {stats.timeframe}: {stats.rows_written:,} candles written "
+                f"({stats.rows_read:,} read, {stats.rows_per_second:,.0f} rows/s)")
+    return stats
+
+
+def discover(directory: str, suffix: Optional[str] = None) -> Dict[Tuple[str, str], List[str]]:
+    """
+    Group data.binance.vision dumps by (symbol, timeframe) from their filenames
+
+    Args:
+        directory: Folder scanned recursively
+        suffix: Symbol suffix, see live_symbol() (None: SUPPORTED_SYMBOLS mapping)
+
+    Returns:
+        {(store symbol, timeframe): [paths]}
+    """
+    jobs: Dict[Tuple[str, str], List[str]] = {}
+    for folder, _, files in os.walk(directory):
+        for name in files:
+            match = _FILENAME_RE.match(name)
+            if not match or match.group("interval").endswith(("s", "M")):
+                continue
+            key = (live_symbol(match.group("symbol"), suffix), binance_timeframe(match.group("interval")))
+            jobs.setdefault(key, []).append(os.path.join(folder, name))
+    return jobs
+
+
+def import_many(
+    jobs: Dict[Tuple[str, str], List[str]],
+    root: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_bytes: int = CHUNK_BYTES
+) -> List[ImportStats]:
+    """
+    Import several symbols/timeframes in parallel (one process per job)
+
+    Args:
+        jobs: {(symbol, timeframe): [paths]}, e.g. from discover()
+        root: CandleStore root
+        workers: Pool size, os.cpu_count() if None
+        chunk_bytes: Parse block size
+
+    Returns:
+        ImportStats per job, in completion order
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = {
+            pool.submit(import_klines, symbol, timeframe, paths, root, chunk_bytes): (symbol, timeframe)
+            for (symbol, timeframe), paths in jobs.items()
+        }
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                symbol, timeframe = futures[future]
+                logger.error(f"❌ Import {symbol} {timeframe} failed: {e}")
+    return results
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    args = sys.argv[1:]
+    suffix = None
+    if "--suffix" in args:
+        position = args.index("--suffix")
+        if position + 1 >= len(args):
+            print("Usage: python -m app.importer DIRECTORY [WORKERS] [--suffix SUFFIX]")
+            sys.exit(1)
+        suffix = args[position + 1]
+        del args[position:position + 2]
+    if not args:
+        print("Usage: python -m app.importer DIRECTORY [WORKERS] [--suffix SUFFIX]")
+        sys.exit(1)
+    workers = int(args[1]) if len(args) > 1 else None
+    jobs = discover(args[0], suffix)
+    start = time.perf_counter()
+    results = import_many(jobs, workers=workers)
+    elapsed = time.perf_counter() - start
+    rows = sum(stats.rows_read for stats in results)
+    print(f"✅ {len(results)}/{len(jobs)} séries, {rows:,} lignes en {elapsed:.1f}s → {rows / max(elapsed, 1e-9):,.0f} lignes/s")
+
+
+if __name__ == "__main__":
+    main()
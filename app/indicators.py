@@ -0,0 +1,389 @@
+"""
+Streaming indicators - O(1) time and memory per bar, Pine semantics
+
+Each indicator is fed one value (or bar) at a time with update() and keeps
+only a fixed-size state (scalars + array('d') ring buffers). snapshot()
+returns a JSON-serializable dict, restore() rebuilds the indicator from it.
+
+StreamingSMC combines them into the smc_relaxed_40pct flags for one
+symbol/timeframe stream; it matches app.smc_engine.detect bar for bar.
+"""
+import math
+from array import array
+from collections import deque
+from typing import Dict, Tuple
+
+from app.smc_engine import SL_ATR_MULT, TP_ATR_MULT, _THRESHOLDS
+
+NAN = float("nan")
+
+
+class Indicator:
+    """Base class: snapshot/restore of the __slots__ state"""
+    __slots__ = ()
+
+    @classmethod
+    def _fields(cls) -> Tuple[str, ...]:
+        """__slots__ of the class and its bases"""
+        return tuple(name for klass in reversed(cls.__mro__) for name in getattr(klass, "__slots__", ()))
+
+    def snapshot(self) -> Dict:
+        """JSON-serializable state"""
+        state = {}
+        for name in self._fields():
+            value = getattr(self, name)
+            if isinstance(value, array):
+                value = list(value)
+            elif isinstance(value, deque):
+                value = [list(item) for item in value]
+            state[name] = value
+        return state
+
+    @classmethod
+    def restore(cls, state: Dict) -> "Indicator":
+        """Rebuild an indicator from snapshot()"""
+        indicator = cls.__new__(cls)
+        for name in cls._fields():
+            value = state[name]
+            current = getattr(cls, "_ARRAYS", {}).get(name)
+            if current == "array":
+                value = array("d", value)
+            elif current == "deque":
+                value = deque(tuple(item) for item in value)
+            setattr(indicator, name, value)
+        return indicator
+
+
+class SMA(Indicator):
+    """ta.sma - ring buffer + running sum (resummed once per wrap)"""
+    __slots__ = ("length", "buffer", "pos", "count", "total", "value")
+    _ARRAYS = {"buffer": "array"}
+
+    def __init__(self, length: int):
+        self.length = length
+        self.buffer = array("d", [0.0]) * length
+        self.pos = 0
+        self.count = 0
+        self.total = 0.0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        pos = self.pos
+        self.total += x - self.buffer[pos]
+        self.buffer[pos] = x
+        pos += 1
+        if pos == self.length:
+            pos = 0
+            self.total = math.fsum(self.buffer)  # no float drift over long streams
+        self.pos = pos
+        if self.count < self.length:
+            self.count += 1
+            if self.count < self.length:
+                return NAN
+        self.value = self.total / self.length
+        return self.value
+
+
+class EMA(Indicator):
+    """ta.ema - seeded with the SMA of the first `length` values"""
+    __slots__ = ("length", "alpha", "count", "seed", "value")
+
+    def __init__(self, length: int, alpha: float = None):
+        self.length = length
+        self.alpha = 2.0 / (length + 1) if alpha is None else alpha
+        self.count = 0
+        self.seed = 0.0
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if self.count >= self.length:
+            self.value += self.alpha * (x - self.value)
+            return self.value
+        self.count += 1
+        self.seed += x
+        if self.count == self.length:
+            self.value = self.seed / self.length
+        return self.value
+
+
+class RMA(EMA):
+    """ta.rma (Wilder smoothing, alpha = 1/length)"""
+    __slots__ = ()
+
+    def __init__(self, length: int):
+        super().__init__(length, 1.0 / length)
+
+
+class ATR(Indicator):
+    """ta.atr - RMA of the true range"""
+    __slots__ = ("rma", "prev_close")
+
+    def __init__(self, length: int = 14):
+        self.rma = RMA(length)
+        self.prev_close = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        prev_close = self.prev_close
+        if prev_close != prev_close:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        self.prev_close = close
+        return self.rma.update(tr)
+
+    def snapshot(self) -> Dict:
+        return {"rma": self.rma.snapshot(), "prev_close": self.prev_close}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "ATR":
+        indicator = cls.__new__(cls)
+        indicator.rma = RMA.restore(state["rma"])
+        indicator.prev_close = state["prev_close"]
+        return indicator
+
+
+class RSI(Indicator):
+    """ta.rsi - RMA of gains / losses"""
+    __slots__ = ("up", "down", "prev_close")
+
+    def __init__(self, length: int = 14):
+        self.up = RMA(length)
+        self.down = RMA(length)
+        self.prev_close = NAN
+
+    def update(self, close: float) -> float:
+        prev_close = self.prev_close
+        self.prev_close = close
+        if prev_close != prev_close:
+            return NAN
+        change = close - prev_close
+        up = self.up.update(change if change > 0 else 0.0)
+        down = self.down.update(-change if change < 0 else 0.0)
+        if down != down:
+            return NAN
+        if down == 0:
+            return 100.0
+        if up == 0:
+            return 0.0
+        return 100.0 - 100.0 / (1.0 + up / down)
+
+    def snapshot(self) -> Dict:
+        return {"up": self.up.snapshot(), "down": self.down.snapshot(), "prev_close": self.prev_close}
+
+    @classmethod
+    def restore(cls, state: Dict) -> "RSI":
+        indicator = cls.__new__(cls)
+        indicator.up = RMA.restore(state["up"])
+        indicator.down = RMA.restore(state["down"])
+        indicator.prev_close = state["prev_close"]
+        return indicator
+
+
+class Highest(Indicator):
+    """ta.highest / ta.lowest - monotonic deque, amortized O(1)"""
+    __slots__ = ("length", "sign", "index", "window")
+    _ARRAYS = {"window": "deque"}
+
+    def __init__(self, length: int, lowest: bool = False):
+        self.length = length
+        self.sign = -1.0 if lowest else 1.0
+        self.index = -1
+        self.window = deque()  # (bar index, sign * value), decreasing
+
+    def update(self, x: float) -> float:
+        self.index += 1
+        key = self.sign * x
+        window = self.window
+        while window and window[-1][1] <= key:
+            window.pop()
+        window.append((self.index, key))
+        if window[0][0] <= self.index - self.length:
+            window.popleft()
+        if self.index < self.length - 1:
+            return NAN
+        return self.sign * window[0][1]
+
+
+class Pivot(Indicator):
+    """
+    not na(ta.pivothigh / ta.pivotlow(x, length, length))
+
+    Keeps the last 2 * length + 1 values; True on the bar that confirms
+    a strict pivot `length` bars back (fixed window, O(1) per bar).
+    """
+    __slots__ = ("length", "sign", "buffer", "pos", "count")
+    _ARRAYS = {"buffer": "array"}
+
+    def __init__(self, length: int, low: bool = False):
+        self.length = length
+        self.sign = -1.0 if low else 1.0
+        self.buffer = array("d", [0.0]) * (2 * length + 1)
+        self.pos = 0
+        self.count = 0
+
+    def update(self, x: float) -> bool:
+        buffer = self.buffer
+        span = len(buffer)
+        buffer[self.pos] = self.sign * x
+        self.pos = (self.pos + 1) % span
+        if self.count < span:
+            self.count += 1
+            if self.count < span:
+                return False
+        # Oldest value sits at self.pos, the center `length` slots later
+        center_pos = (self.pos + self.length) % span
+        center = buffer[center_pos]
+        for i in range(span):
+            if i != center_pos and buffer[i] >= center:
+                return False
+        return True
+
+
+class StreamingSMC:
+    """
+    smc_relaxed_40pct for one live stream, one bar at a time
+
+    update() returns (flags mask, signal, trap_score, final_atr) where
+    signal is +1 LONG / -1 SHORT / 0 after the confluence threshold -
+    the same values as app.smc_engine.detect for that bar.
+    """
+    __slots__ = (
+        "asset_type", "confluence_threshold", "th", "volume_sma", "volume_sma10", "atr", "rsi",
+        "ema20", "ema_fast", "ema_slow", "recent_high", "recent_low", "pivot_high", "pivot_low",
+        "prev_high", "prev_low", "prev_close", "prev_rsi", "prev_ema20", "prev_trend"
+    )
+    _INDICATORS = {
+        "volume_sma": SMA, "volume_sma10": SMA, "atr": ATR, "rsi": RSI, "ema20": EMA,
+        "ema_fast": EMA, "ema_slow": EMA, "recent_high": Highest, "recent_low": Highest,
+        "pivot_high": Pivot, "pivot_low": Pivot
+    }
+
+    def __init__(self, asset_type: str = "crypto", confluence_threshold: float = 70.0):
+        self.asset_type = asset_type
+        self.confluence_threshold = confluence_threshold
+        self.th = _THRESHOLDS[asset_type == "crypto"]
+        self.volume_sma = SMA(20)
+        self.volume_sma10 = SMA(10)
+        self.atr = ATR(14)
+        self.rsi = RSI(14)
+        self.ema20 = EMA(20)
+        self.ema_fast = EMA(21)
+        self.ema_slow = EMA(50)
+        self.recent_high = Highest(20)
+        self.recent_low = Highest(20, lowest=True)
+        self.pivot_high = Pivot(self.th["swing"])
+        self.pivot_low = Pivot(self.th["swing"], low=True)
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+        self.prev_rsi = NAN
+        self.prev_ema20 = NAN
+        self.prev_trend = 0
+
+    def update(
+        self,
+        open_: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        time_ms: int = 0
+    ) -> Tuple[int, int, int, float]:
+        """
+        Feed one closed bar
+
+        Args:
+            open_, high, low, close, volume: Bar values
+            time_ms: Bar open time (epoch ms, UTC) - non-crypto time filter
+
+        Returns:
+            Tuple of (flags mask, signal, trap_score, final_atr)
+        """
+        th = self.th
+        volume_sma = self.volume_sma.update(volume)
+        volume_sma10 = self.volume_sma10.update(volume)
+        atr_value = self.atr.update(high, low, close)
+        rsi_value = self.rsi.update(close)
+        ema20 = self.ema20.update(close)
+        ema_fast = self.ema_fast.update(close)
+        ema_slow = self.ema_slow.update(close)
+        recent_high = self.recent_high.update(high)
+        recent_low = self.recent_low.update(low)
+        bos_confirm = self.pivot_high.update(high) | self.pivot_low.update(low)
+
+        prev_high, prev_low, prev_close = self.prev_high, self.prev_low, self.prev_close
+        prev_rsi, prev_ema20 = self.prev_rsi, self.prev_ema20
+
+        # NaN comparisons are False, as Pine's na
+        poi_valid = (rsi_value > 35.0 and prev_rsi <= 35.0) or (rsi_value < 65.0 and prev_rsi >= 65.0)
+        breaks_prev = close > prev_high or close < prev_low
+        fvg_open = abs(prev_high - prev_low) > atr_value * th["fvg"] and breaks_prev
+        ema_cross = (close > ema20 and prev_close <= prev_ema20) or (close < ema20 and prev_close >= prev_ema20)
+        ob_valid = volume > volume_sma * th["ob_volume"] and ema_cross
+
+        body_size = abs(close - open_)
+        mod_1000, mod_500 = close % 1000, close % 500
+        trap_score = (
+            ((recent_high < close < recent_high * 1.003) or (recent_low * 0.997 < close < recent_low))
+            + (mod_1000 < 20 or mod_1000 > 980 or mod_500 < 10 or mod_500 > 490)
+            + (high - max(open_, close) > body_size * 2.5 or min(open_, close) - low > body_size * 2.5)
+            + (atr_value / close < 0.008)
+        )
+
+        trend = 1 if ema_fast > ema_slow else -1
+        choch_confirm = self.prev_trend != 0 and trend != self.prev_trend
+        volume_confirm = volume > volume_sma * 0.9
+        if self.asset_type == "crypto" or not time_ms:
+            time_filter = True
+        else:
+            hour = time_ms // 3_600_000 % 24
+            time_filter = not (hour >= 23 or hour <= 1)
+
+        mask = (
+            poi_valid
+            | fvg_open << 1
+            | ob_valid << 2
+            | bos_confirm << 3
+            | choch_confirm << 4
+            | (volume > volume_sma10 * 2.0) << 5
+            | (body_size > atr_value * th["imbalance"]) << 6
+            | (ema_fast != ema_slow and ema_fast == ema_fast and ema_slow == ema_slow) << 7
+            | volume_confirm << 8
+            | time_filter << 9
+        )
+
+        signal = 0
+        if (
+            (poi_valid or fvg_open or ob_valid) and volume_confirm
+            and (not ob_valid or breaks_prev)
+            and volume > volume_sma * 0.8 and trap_score < 2
+            and mask.bit_count() / 10.0 * 100 >= self.confluence_threshold
+        ):
+            signal = 1 if close > ema_fast else -1 if close < ema_fast else 0
+
+        final_atr = atr_value * (volume / volume_sma) if self.asset_type == "crypto" and volume_sma else atr_value
+
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        self.prev_rsi, self.prev_ema20, self.prev_trend = rsi_value, ema20, trend
+        return mask, signal, trap_score, final_atr
+
+    @staticmethod
+    def levels(close: float, signal: int, final_atr: float) -> Tuple[float, float]:
+        """Pine SL/TP for a signal bar"""
+        return close - signal * final_atr * SL_ATR_MULT, close + signal * final_atr * TP_ATR_MULT
+
+    def snapshot(self) -> Dict:
+        """JSON-serializable state of the whole stream"""
+        state = {name: getattr(self, name) for name in self.__slots__ if name not in self._INDICATORS}
+        for name in self._INDICATORS:
+            state[name] = getattr(self, name).snapshot()
+        return state
+
+    @classmethod
+    def restore(cls, state: Dict) -> "StreamingSMC":
+        """Rebuild a stream from snapshot()"""
+        stream = cls.__new__(cls)
+        for name in cls.__slots__:
+            indicator = cls._INDICATORS.get(name)
+            setattr(stream, name, indicator.restore(state[name]) if indicator else state[name])
+        return stream
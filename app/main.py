@@ -2,25 +2,41 @@
 FastAPI main application for SMC Trading Bot
 Version: 2.0.10 - CONFLUENCE 10% TEST
 """
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import FastAPI, Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
 import uvicorn
 
-from app.models import TVPayload
+from app.decoder import SignalDecoder, DecodeError
 from app.config import Config
-from app.smc import (
-    calculate_confluence_score,
-    validate_critical_flags,
-    calculate_risk_parameters,
-    calculate_rr_ratio,
-    get_active_flags
+from app.smc import SUPPORTED_SYMBOLS
+from app.notifier import close_async_client
+from app.pipeline import process_signal, process_batch
+from app.outbox import TelegramOutbox
+from app.candles import CandleStore
+from app.aggregator import TIMEFRAMES
+from app.verifier import market_state, get_verifier_stats
+from app.scanner import Scanner, run_live
+from app.variants import ShadowEvaluator
+from app.mtf import mtf_state
+from app.zones import zone_index
+from app.utils import (
+    get_cache_size,
+    get_cache_stats,
+    clear_cache,
+    load_dedup_state,
+    save_dedup_state
+)
+from app.smc_ai import (
+    close_ai_client,
+    get_breaker_stats,
+    get_ai_cache_stats,
+    get_ai_batch_stats
 )
-from app.notifier import send_telegram_message, format_telegram_message, send_smc_ai_signal
-from app.utils import is_duplicate, get_cache_size, clear_cache
-from app.smc_ai import process_with_ai
 
 # Configure logging
 logging.basicConfig(
@@ -29,32 +45,65 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+# Payload decoder - built once, shared by every request
+decoder = SignalDecoder()
+
+# Durable Telegram outbox - /tv only enqueues, the worker delivers
+outbox = TelegramOutbox(
+    path=Config.TELEGRAM_OUTBOX_PATH,
+    token=Config.TELEGRAM_TOKEN,
+    global_rate=Config.TELEGRAM_GLOBAL_RATE,
+    per_chat_interval=Config.TELEGRAM_CHAT_INTERVAL,
+    max_attempts=Config.TELEGRAM_MAX_ATTEMPTS,
+    concurrency=Config.TELEGRAM_OUTBOX_CONCURRENCY,
+    lease_timeout=Config.TELEGRAM_OUTBOX_LEASE
+)
+
+# Internal scanner (Config.SCANNER_ENABLED) - signals go through the same pipeline as /tv
+scanner = Scanner(outbox)
+scanner_stop = asyncio.Event()
+
+# Shadow A/B of the Pine variants on the scanner bars (Config.SHADOW_ENABLED)
+shadow = ShadowEvaluator() if Config.SHADOW_ENABLED else None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup / shutdown hooks"""
+    load_dedup_state()
+    loaded = market_state.warm_from_store(CandleStore(), SUPPORTED_SYMBOLS, TIMEFRAMES)
+    logger.info(f"📈 Verification market state: {loaded} series warmed from the candle store")
+    await outbox.start()
+    if Config.SCANNER_ENABLED:
+        await scanner.start()
+        zones = zone_index.warm_from_store(CandleStore(), scanner.symbols, scanner.timeframes,
+                                           Config.ZONE_WARMUP_BARS)
+        logger.info(f"🧱 Zone index: {zones} active OB / FVG zones after warm-up")
+        if shadow is not None:
+            streams = shadow.warm_from_store(CandleStore(), scanner.symbols, scanner.timeframes)
+            logger.info(f"👥 Shadow variants {shadow.registry.names()}: {streams} streams warmed")
+        scanner_task = asyncio.create_task(run_live(scanner, scanner_stop, shadow))
+    yield
+    if Config.SCANNER_ENABLED:
+        scanner_stop.set()
+        scanner_task.cancel()
+        await scanner.stop()
+    save_dedup_state()
+    # Flush pending notifications, then release the pooled Telegram connections
+    await outbox.stop(flush_timeout=Config.TELEGRAM_FLUSH_TIMEOUT)
+    await close_async_client()
+    await close_ai_client()
+
+
 # Initialize FastAPI
 app = FastAPI(
     title="SMC Trading Bot - HIGH VOLUME MARKETS",
     version="2.0.0",
-    description="SMC Bot for High Volume FOREX & CRYPTO PERPETUALS"
+    description="SMC Bot for High Volume FOREX & CRYPTO PERPETUALS",
+    lifespan=lifespan
 )
 
-# Supported symbols - HIGH VOLUME/LIQUIDITY ONLY
-SUPPORTED_SYMBOLS = {
-    # FOREX - Major pairs + Gold (high volume)
-    "EURUSD": "forex",
-    "GBPUSD": "forex", 
-    "USDJPY": "forex",
-    "AUDUSD": "forex",
-    "USDCAD": "forex",
-    "XAUUSD": "gold",
-    
-    # CRYPTO PERPETUALS - Top volume/volatility
-    "BTCUSDT.P": "crypto",
-    "ETHUSDT.P": "crypto",
-    "SOLUSDT.P": "crypto",
-    "ADAUSDT.P": "crypto",
-    "DOGEUSDT.P": "crypto",
-    "XRPUSDT.P": "crypto"
-}
-
 
 @app.get("/")
 async def root():
@@ -101,213 +150,75 @@ async def tradingview_webhook(request: Request):
     
     Pine Script calcule TOUT (entry, sl, tp).
     Le bot Python ne fait que relayer vers Telegram.
+    L'envoi Telegram passe par l'outbox (file persistante sur disque).
     
     Returns:
-        200: Signal sent
-        400: Invalid JSON
+        200: Signal accepted and queued for Telegram
+        400: Invalid JSON or payload (detail.reason = decoder reason code)
     """
     request_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{id(request)}"
     logger.info(f"[{request_id}] Webhook received")
     
-    # Parse JSON payload
+    # Decode payload (flat Pine format or nested TVPayload)
+    body = await request.body()
     try:
-        data = await request.json()
-        logger.info(f"[{request_id}] Pine Script data: {data}")
-    except Exception as e:
-        logger.error(f"[{request_id}] JSON parse error: {e}")
+        signal = decoder.decode_bytes(body)
+    except DecodeError as e:
+        logger.error(f"[{request_id}] Payload rejected ({e.code}): {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid JSON format"
+            detail={"reason": e.code, "field": e.field, "message": str(e)}
         )
-    
-    # Extract data (Pine Script a TOUT calculé)
-    event_id = data.get("event_id")
-    raw_symbol = data.get("symbol")
-    # NETTOYAGE SYMBOLE (backup si Pine Script oublie)
-    symbol = raw_symbol.replace("BYBIT:", "").replace("BINANCE:", "")
-    timeframe = data.get("timeframe", "Unknown")  # 5, 15, 60, 240, etc.
-    direction = data.get("direction")
-    entry = data.get("entry")
-    sl = data.get("sl")
-    tp = data.get("tp")
-    atr = data.get("atr")
-    
-    # Extract ALL flags for confluence calculation
-    poi_valid = data.get("poi_valid", False)
-    fvg_open = data.get("fvg_open", False)
-    ob_valid = data.get("ob_valid", False)
-    bos_confirm = data.get("bos_confirm", False)
-    choch_confirm = data.get("choch_confirm", False)
-    liq_swept = data.get("liq_swept", False)
-    imbalance_filled = data.get("imbalance_filled", False)
-    trend_aligned = data.get("trend_aligned", False)
-    volume_confirm = data.get("volume_confirm", False)
-    time_filter = data.get("time_filter", False)
+    logger.info(f"[{request_id}] Pine Script data: {signal}")
     
     logger.info(
-        f"[{request_id}] PINE SCRIPT DATA: {symbol} [{timeframe}] {direction} "
-        f"Entry={entry} SL={sl} TP={tp} ATR={atr}"
+        f"[{request_id}] PINE SCRIPT DATA: {signal.symbol} [{signal.timeframe}] {signal.direction} "
+        f"Entry={signal.entry} SL={signal.sl} TP={signal.tp} ATR={signal.atr}"
     )
     
-    # Calculate confluence score FIRST (before duplicate check)
-    flag_count = sum([poi_valid, fvg_open, ob_valid, bos_confirm, choch_confirm, 
-                      liq_swept, imbalance_filled, trend_aligned, volume_confirm, time_filter])
-    confluence_score = (flag_count / 10.0) * 100
+    status_code, content = await process_signal(signal, outbox, request_id)
+    return JSONResponse(status_code=status_code, content=content)
+
+
+@app.post("/tv/batch")
+async def tradingview_batch(request: Request):
+    """
+    TradingView webhook - BATCH MODE
     
-    logger.info(f"[{request_id}] Confluence: {confluence_score:.1f}% (threshold: {Config.CONFLUENCE_THRESH*100:.0f}%)")
+    Body: NDJSON (un signal par ligne) ou tableau JSON de signaux, au
+    format de /tv. Même logique de décision que /tv, appliquée à tout le
+    lot : score + anti-doublon en une passe, validation IA concurrente,
+    messages Telegram mis en file en une seule transaction.
     
-    # Check confluence threshold (>= pour inclure exactement 70%)
-    if confluence_score < (Config.CONFLUENCE_THRESH * 100) - 0.01:  # -0.01 pour éviter les erreurs de floating point
-        logger.info(f"[{request_id}] Below threshold - Signal rejected")
-        return JSONResponse(
-            status_code=202,
-            content={
-                "ok": True,
-                "sent": False,
-                "reason": "below_threshold",
-                "confluence": confluence_score,
-                "event_id": event_id
-            }
-        )
+    Returns:
+        200: {"results": [...]} - un résultat par signal, dans l'ordre
+             (status = code HTTP qu'aurait renvoyé /tv)
+        400: Body is neither NDJSON nor a JSON array
+        413: More than TV_BATCH_MAX_RECORDS signals
+    """
+    request_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{id(request)}"
     
-    # Check for duplicates
-    if is_duplicate(event_id, Config.ANTI_SPAM_TTL):
-        logger.info(f"[{request_id}] Duplicate signal: {event_id}")
-        return JSONResponse(
-            status_code=202,
-            content={
-                "ok": True,
-                "sent": False,
-                "reason": "duplicate",
-                "event_id": event_id
-            }
+    try:
+        records = await decoder.decode_stream(request.stream(), Config.TV_BATCH_MAX_RECORDS)
+    except DecodeError as e:
+        logger.error(f"[{request_id}] Batch rejected ({e.code}): {e}")
+        raise HTTPException(
+            status_code=413 if e.code == "too_many_records" else status.HTTP_400_BAD_REQUEST,
+            detail={"reason": e.code, "field": e.field, "message": str(e)}
         )
+    logger.info(f"[{request_id}] Batch webhook received: {len(records)} signals")
     
-    # AI VALIDATION with GROK + DEEPSEEK
-    signal_data = {
-        "symbol": symbol,
-        "direction": direction,
-        "price_ctx": {
-            "entry": entry,
-            "sl": sl,
-            "tp": tp
-        },
-        "confluence_score": confluence_score,
-        "flags": {
-            "poi_valid": poi_valid,
-            "fvg_open": fvg_open,
-            "ob_valid": ob_valid,
-            "bos_confirm": bos_confirm,
-            "choch_confirm": choch_confirm,
-            "liq_swept": liq_swept,
-            "imbalance_filled": imbalance_filled,
-            "trend_aligned": trend_aligned,
-            "volume_confirm": volume_confirm,
-            "time_filter": time_filter
+    results = await process_batch(records, outbox, request_id)
+    sent = sum(1 for _, content in results if content.get("sent"))
+    return JSONResponse(
+        status_code=200,
+        content={
+            "ok": True,
+            "count": len(results),
+            "sent": sent,
+            "results": [dict(content, status=code) for code, content in results]
         }
-    }
-    
-    ai_trade = process_with_ai(signal_data)
-    if ai_trade:
-        logger.info(f"[{request_id}] AI APPROVED: {ai_trade}")
-        # Use AI-calculated SL/TP if available
-        if ai_trade.get("sl"):
-            sl = ai_trade["sl"]
-        if ai_trade.get("tp"):
-            tp = ai_trade["tp"]
-    else:
-        logger.info(f"[{request_id}] AI REJECTED signal")
-        return JSONResponse(
-            status_code=202,
-            content={
-                "ok": True,
-                "sent": False,
-                "reason": "ai_rejected",
-                "event_id": event_id
-            }
-        )
-    
-    # Calculate Risk:Reward ratio
-    rr_ratio = calculate_rr_ratio(entry, sl, tp)
-    
-    # Calculate position size (only thing we calculate)
-    risk_amount = Config.BASE_EQUITY * Config.RISK_PCT
-    price_distance = abs(entry - sl)
-    position_size = risk_amount / price_distance if price_distance > 0 else 0
-    
-    # Build active flags list with ALL SMC indicators
-    active_flags = []
-    if poi_valid:
-        active_flags.append("✅ Poi Valid")
-    if fvg_open:
-        active_flags.append("✅ Fvg Open")
-    if ob_valid:
-        active_flags.append("✅ Ob Valid")
-    if bos_confirm:
-        active_flags.append("✅ Bos Confirm")
-    if choch_confirm:
-        active_flags.append("✅ Choch Confirm")
-    if liq_swept:
-        active_flags.append("✅ Liq Swept")
-    if imbalance_filled:
-        active_flags.append("✅ Imbalance Filled")
-    if trend_aligned:
-        active_flags.append("✅ Trend Aligned")
-    if volume_confirm:
-        active_flags.append("✅ Volume Confirm")
-    if time_filter:
-        active_flags.append("✅ Time Filter")
-    
-    # Build original trade data for compatibility
-    original_trade_data = {
-        "symbol": symbol,
-        "direction": direction,
-        "entry": entry,
-        "sl": sl,
-        "tp": tp,
-        "timeframe": timeframe
-    }
-    
-    # Send enhanced AI notification
-    telegram_success = send_smc_ai_signal(
-        trade_data=original_trade_data,
-        ai_trade=ai_trade,
-        confluence_score=confluence_score,
-        timeframe=timeframe,
-        active_flags=active_flags,
-        token=Config.TELEGRAM_TOKEN,
-        chat_id=Config.TELEGRAM_CHAT_ID
     )
-    
-    if telegram_success:
-        logger.info(f"[{request_id}] ✅ SIGNAL SENT: {event_id}")
-        return JSONResponse(
-            status_code=200,
-            content={
-                "status": "AI APPROVED",
-                "ok": True,
-                "sent": True,
-                "event_id": event_id,
-                "trade": ai_trade if ai_trade else {
-                    "entry": entry,
-                    "sl": sl,
-                    "tp": tp,
-                    "size": position_size,
-                    "rr": rr_ratio
-                }
-            }
-        )
-    else:
-        logger.error(f"[{request_id}] ❌ TELEGRAM FAILED: {event_id}")
-        return JSONResponse(
-            status_code=202,
-            content={
-                "ok": True,
-                "sent": False,
-                "reason": "telegram_error",
-                "event_id": event_id
-            }
-        )
 
 
 @app.get("/stats")
@@ -315,6 +226,16 @@ async def get_stats():
     """Get bot statistics"""
     return {
         "cache_size": get_cache_size(),
+        "dedup": get_cache_stats(),
+        "outbox": outbox.stats(),
+        "ai_breakers": get_breaker_stats(),
+        "ai_cache": get_ai_cache_stats(),
+        "ai_batch": get_ai_batch_stats(),
+        "verifier": get_verifier_stats(),
+        "mtf": mtf_state.stats(),
+        "zones": zone_index.stats(),
+        "scanner": scanner.stats() if Config.SCANNER_ENABLED else None,
+        "shadow": shadow.stats() if shadow is not None else None,
         "config": {
             "confluence_threshold": Config.CONFLUENCE_THRESH,
             "risk_pct": Config.RISK_PCT,
@@ -0,0 +1,197 @@
+"""
+Multi-timeframe state - higher-timeframe context for every signal
+
+One fixed-size ring buffer per (symbol, timeframe) keeps the last
+observations: bar time, flags mask, trend (+1 / -1) and ATR. They come
+from two feeds, both off the request path:
+- the scanner shards, for every closed bar (EMA21/50 trend of StreamingSMC)
+- every verified webhook signal (trend = its direction)
+
+enrich() reads the newest fresh entry of each higher timeframe - a
+constant number of list lookups - and reports which ones agree with the
+signal direction. With MTF_SCORE_ENABLED the alignment moves the
+confluence score by MTF_SCORE_POINTS per aligned (- per conflicting)
+timeframe.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.decoder import Signal
+from app.utils import bar_time_from_event_id, timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class _Ring:
+    """Last `size` observations of one symbol/timeframe, oldest overwritten"""
+    __slots__ = ("time", "flags", "trend", "atr", "head", "count")
+
+    def __init__(self, size: int):
+        self.time = [0] * size
+        self.flags = [0] * size
+        self.trend = [0] * size
+        self.atr = [0.0] * size
+        self.head = 0   # next write slot
+        self.count = 0
+
+    def push(self, time_ms: int, flags: int, trend: int, atr: float):
+        size = len(self.time)
+        last = (self.head - 1) % size
+        if self.count:
+            if time_ms < self.time[last]:
+                return
+            if time_ms == self.time[last]:
+                # Same bar seen again (bar feed + its webhook): latest wins
+                self.flags[last], self.trend[last], self.atr[last] = flags, trend, atr
+                return
+        slot = self.head
+        self.time[slot], self.flags[slot], self.trend[slot], self.atr[slot] = time_ms, flags, trend, atr
+        self.head = (slot + 1) % size
+        self.count = min(self.count + 1, size)
+
+    def latest(self) -> Optional[int]:
+        return (self.head - 1) % len(self.time) if self.count else None
+
+    def entries(self) -> List[Tuple[int, int, int, float]]:
+        """(time ms, flags, trend, atr), newest first"""
+        size = len(self.time)
+        slots = [(self.head - 1 - k) % size for k in range(self.count)]
+        return [(self.time[i], self.flags[i], self.trend[i], self.atr[i]) for i in slots]
+
+
+@dataclass(slots=True)
+class Alignment:
+    """Higher-timeframe context of one signal"""
+    aligned: int
+    conflicting: int
+    timeframes: Tuple[Tuple[str, int], ...]  # (timeframe, +1 aligned / -1 conflicting)
+    bonus: float                            # confluence points added to the score
+
+    def summary(self) -> Dict:
+        return {
+            "aligned": self.aligned,
+            "conflicting": self.conflicting,
+            "timeframes": {tf: "aligned" if side > 0 else "conflicting" for tf, side in self.timeframes},
+            "bonus": self.bonus
+        }
+
+
+_NO_CONTEXT = Alignment(0, 0, (), 0.0)
+
+
+class MTFState:
+    """
+    Per-symbol table of timeframe ring buffers
+
+    Only the timeframes of Config.MTF_TIMEFRAMES are kept; update() and
+    enrich() are O(1) (a dict lookup per timeframe).
+    """
+
+    def __init__(self, timeframes: Optional[str] = None, size: Optional[int] = None):
+        """
+        Args:
+            timeframes: Comma-separated TradingView timeframes (Config.MTF_TIMEFRAMES)
+            size: Observations kept per timeframe (Config.MTF_RING_SIZE)
+        """
+        labels = [tf.strip() for tf in (timeframes or Config.MTF_TIMEFRAMES).split(",") if tf.strip()]
+        # (seconds, label), lowest timeframe first
+        self.timeframes: Tuple[Tuple[int, str], ...] = tuple(sorted({(timeframe_seconds(tf), tf) for tf in labels}))
+        self._known = {seconds for seconds, _ in self.timeframes}
+        self.size = size or Config.MTF_RING_SIZE
+        self._symbols: Dict[str, Dict[int, _Ring]] = {}
+        self.updates = 0
+        self.enriched = 0
+
+    def update(self, symbol: str, timeframe: str, time_ms: int, flags: int, trend: int, atr: float):
+        """
+        Record one observation (closed bar or signal)
+
+        Args:
+            symbol: Trading symbol
+            timeframe: TradingView timeframe (ignored if not tracked)
+            time_ms: Bar open time (epoch ms)
+            flags: SMC flags mask
+            trend: +1 bullish / -1 bearish
+            atr: ATR of the bar
+        """
+        seconds = timeframe_seconds(timeframe)
+        if seconds not in self._known:
+            return
+        rings = self._symbols.get(symbol.upper())
+        if rings is None:
+            rings = self._symbols[symbol.upper()] = {}
+        ring = rings.get(seconds)
+        if ring is None:
+            ring = rings[seconds] = _Ring(self.size)
+        ring.push(time_ms, flags, trend, atr)
+        self.updates += 1
+
+    def record_signal(self, signal: Signal, now: Optional[float] = None):
+        """Record a webhook signal on its own timeframe (bar time from the event_id)"""
+        bar_time = bar_time_from_event_id(signal.event_id)
+        if bar_time is None:
+            bar_time = time.time() if now is None else now
+        self.update(signal.symbol, signal.timeframe, int(bar_time * 1000), signal.flags,
+                    1 if signal.direction == "LONG" else -1, signal.atr or 0.0)
+
+    def enrich(self, signal: Signal, now: Optional[float] = None) -> Alignment:
+        """
+        Higher-timeframe alignment of a signal
+
+        Entries older than Config.MTF_MAX_AGE_BARS bars of their timeframe
+        are ignored.
+
+        Args:
+            signal: Decoded signal
+            now: Current epoch seconds (time.time() if None)
+
+        Returns:
+            Alignment (bonus is 0 unless Config.MTF_SCORE_ENABLED)
+        """
+        if not Config.MTF_ENABLED:
+            return _NO_CONTEXT
+        rings = self._symbols.get(signal.symbol.upper())
+        if not rings:
+            return _NO_CONTEXT
+        self.enriched += 1
+        now_ms = (time.time() if now is None else now) * 1000
+        own = timeframe_seconds(signal.timeframe)
+        side = 1 if signal.direction == "LONG" else -1
+
+        context = []
+        for seconds, label in self.timeframes:
+            if seconds <= own:
+                continue
+            ring = rings.get(seconds)
+            slot = ring.latest() if ring is not None else None
+            if slot is None or not ring.trend[slot]:
+                continue
+            if now_ms - ring.time[slot] > (Config.MTF_MAX_AGE_BARS + 1) * seconds * 1000:
+                continue
+            context.append((label, 1 if ring.trend[slot] == side else -1))
+
+        aligned = sum(1 for _, agree in context if agree > 0)
+        conflicting = len(context) - aligned
+        bonus = Config.MTF_SCORE_POINTS * (aligned - conflicting) if Config.MTF_SCORE_ENABLED else 0.0
+        return Alignment(aligned, conflicting, tuple(context), bonus)
+
+    def history(self, symbol: str, timeframe: str) -> List[Tuple[int, int, int, float]]:
+        """Ring content of one symbol/timeframe, newest first"""
+        ring = self._symbols.get(symbol.upper(), {}).get(timeframe_seconds(timeframe))
+        return ring.entries() if ring is not None else []
+
+    def stats(self) -> Dict:
+        return {
+            "symbols": len(self._symbols),
+            "series": sum(len(rings) for rings in self._symbols.values()),
+            "updates": self.updates,
+            "enriched": self.enriched,
+            "score_enabled": Config.MTF_SCORE_ENABLED
+        }
+
+
+# Shared by /tv, /tv/batch and the scanner
+mtf_state = MTFState()
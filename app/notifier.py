@@ -1,12 +1,110 @@
 """
-Telegram notification functions using requests
+Telegram notification functions using requests (sync) and httpx (async)
 """
+import asyncio
+import random
 import requests
+import httpx
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+from app.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Shared async client - one keep-alive connection pool for the whole process
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client (created lazily)
+    
+    Returns:
+        httpx.AsyncClient reused across all Telegram sends
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(Config.TELEGRAM_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=Config.TELEGRAM_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.TELEGRAM_MAX_CONNECTIONS
+            )
+        )
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """Close the shared async HTTP client (call on shutdown)"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def _telegram_url(token: str) -> str:
+    """Build the sendMessage URL for a bot token"""
+    return f"{Config.TELEGRAM_API_URL}/bot{token}/sendMessage"
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """
+    Exponential backoff with full jitter
+    
+    Args:
+        attempt: Number of failed attempts so far (0-based)
+        base: Base delay in seconds
+        cap: Maximum delay in seconds
+        
+    Returns:
+        Delay in seconds, uniformly drawn in [0, min(cap, base * 2^attempt)]
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def post_telegram_message(
+    message: str,
+    token: str,
+    chat_id: str
+) -> Tuple[int, Optional[float], str]:
+    """
+    Single sendMessage attempt through the shared async client
+    
+    Args:
+        message: Message to send
+        token: Telegram bot token
+        chat_id: Telegram chat ID
+        
+    Returns:
+        Tuple of (status_code, retry_after, error). status_code is 0 on
+        network errors; retry_after is Telegram's 429 hint in seconds.
+    """
+    payload = {
+        "chat_id": chat_id,
+        "text": message,
+        "parse_mode": "Markdown"
+    }
+    
+    try:
+        response = await get_async_client().post(_telegram_url(token), json=payload)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        return 0, None, str(e)
+    
+    if response.status_code == 200:
+        return 200, None, ""
+    
+    retry_after = None
+    if response.status_code == 429:
+        try:
+            retry_after = float(response.json()["parameters"]["retry_after"])
+        except Exception:
+            retry_after = None
+    
+    return response.status_code, retry_after, response.text
+
 
 def format_telegram_message(
     score: float,
@@ -82,7 +180,7 @@ def send_telegram_message(
         logger.error("Telegram token or chat_id not configured")
         return False
     
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    url = _telegram_url(token)
     payload = {
         "chat_id": chat_id,
         "text": message,
@@ -109,29 +207,23 @@ def send_telegram_message(
     return False
 
 
-def send_smc_ai_signal(
-    trade_data: dict,
+def format_smc_ai_signal(
     ai_trade: dict,
     confluence_score: float,
     timeframe: str,
-    active_flags: List[str],
-    token: Optional[str],
-    chat_id: Optional[str]
-) -> bool:
+    active_flags: List[str]
+) -> str:
     """
-    Send enhanced SMC signal with GROK + DEEPSEEK advice
+    Format enhanced SMC signal with GROK + DEEPSEEK advice
     
     Args:
-        trade_data: Original trade data from Pine Script
         ai_trade: AI-enhanced trade data with advice
         confluence_score: Confluence percentage
         timeframe: Chart timeframe 
         active_flags: List of active SMC flags
-        token: Telegram bot token
-        chat_id: Telegram chat ID
         
     Returns:
-        True if successful, False otherwise
+        Formatted Telegram message
     """
     # Format timeframe display
     tf_display = timeframe
@@ -180,4 +272,78 @@ def send_smc_ai_signal(
 📢 *@MonBotFibo*
     """.strip()
     
-    return send_telegram_message(message, token, chat_id)
\ No newline at end of file
+    return message
+
+
+def send_smc_ai_signal(
+    trade_data: dict,
+    ai_trade: dict,
+    confluence_score: float,
+    timeframe: str,
+    active_flags: List[str],
+    token: Optional[str],
+    chat_id: Optional[str]
+) -> bool:
+    """
+    Send enhanced SMC signal with GROK + DEEPSEEK advice
+    
+    Args:
+        trade_data: Original trade data from Pine Script
+        ai_trade: AI-enhanced trade data with advice
+        confluence_score: Confluence percentage
+        timeframe: Chart timeframe 
+        active_flags: List of active SMC flags
+        token: Telegram bot token
+        chat_id: Telegram chat ID
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    message = format_smc_ai_signal(ai_trade, confluence_score, timeframe, active_flags)
+    return send_telegram_message(message, token, chat_id)
+
+
+async def send_telegram_message_async(
+    message: str,
+    token: Optional[str],
+    chat_id: Optional[str],
+    max_retries: int = 2
+) -> bool:
+    """
+    Send message to Telegram without blocking the event loop
+    
+    Uses the shared keep-alive client, so concurrent sends share one
+    connection pool instead of opening a new TLS session each time.
+    Retries back off with jitter and honour Telegram's 429 retry_after.
+    
+    Args:
+        message: Message to send
+        token: Telegram bot token
+        chat_id: Telegram chat ID
+        max_retries: Maximum retry attempts
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    if not token or not chat_id:
+        logger.error("Telegram token or chat_id not configured")
+        return False
+    
+    for attempt in range(max_retries + 1):
+        status_code, retry_after, error = await post_telegram_message(message, token, chat_id)
+        
+        if status_code == 200:
+            logger.info("Telegram message sent successfully")
+            return True
+        elif status_code:
+            logger.warning(f"Telegram API error: {status_code} - {error}")
+        else:
+            logger.error(f"Telegram send attempt {attempt + 1} failed: {error}")
+            
+        if attempt < max_retries:
+            delay = retry_after if retry_after is not None else backoff_delay(attempt)
+            logger.info(f"Retrying Telegram send in {delay:.1f}s... ({attempt + 1}/{max_retries})")
+            await asyncio.sleep(delay)
+    
+    logger.error("Failed to send Telegram message after all retries")
+    return False
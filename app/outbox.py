@@ -0,0 +1,315 @@
+"""
+Durable Telegram outbox - on-disk spool drained by a background worker
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.notifier import post_telegram_message, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    claimed_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class TelegramOutbox:
+    """
+    Persistent Telegram outbox
+
+    Messages are written to a local SQLite spool by enqueue() and sent by a
+    background worker (up to `concurrency` sends in flight) that:
+    - respects a global rate (msg/s) and a minimum interval per chat
+    - honours Telegram's 429 retry_after
+    - backs off with jitter on other failures
+    - keeps messages on disk until delivered (or marked dead after max_attempts)
+
+    Several processes (uvicorn workers) can share one spool: a row is claimed
+    by a conditional UPDATE, so only one of them sends it. A 'sending' row
+    whose claim is older than lease_timeout (its process died) is claimable
+    again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        token: Optional[str],
+        global_rate: float = 25.0,
+        per_chat_interval: float = 1.0,
+        max_attempts: int = 10,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 300.0,
+        concurrency: int = 4,
+        lease_timeout: float = 120.0
+    ):
+        self.path = path
+        self.token = token
+        self.global_interval = 1.0 / global_rate if global_rate > 0 else 0.0
+        self.per_chat_interval = per_chat_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.concurrency = max(1, concurrency)
+        self.lease_timeout = lease_timeout
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._stopping = False
+        self._next_global_slot = 0.0
+        self._next_chat_slot: Dict[str, float] = {}
+        self.sent_count = 0
+        self.failed_count = 0
+
+    # === STORAGE ===
+
+    def _conn(self) -> sqlite3.Connection:
+        """Open the spool lazily (WAL mode, one connection per process)"""
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(outbox)")}
+            if "claimed_at" not in columns:
+                # Spool created before claims had a timestamp
+                self._db.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL")
+        return self._db
+
+    def enqueue(self, message: str, chat_id: str) -> int:
+        """
+        Persist a message for delivery
+
+        Args:
+            message: Telegram message text
+            chat_id: Destination chat ID
+
+        Returns:
+            Outbox row id
+        """
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO outbox (chat_id, message, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+            (str(chat_id), message, now, now)
+        )
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return cursor.lastrowid
+
+    def enqueue_many(self, messages: List[Tuple[str, str]]) -> List[int]:
+        """
+        Persist several messages in one transaction
+
+        Args:
+            messages: List of (message, chat_id)
+
+        Returns:
+            Outbox row ids, in input order
+        """
+        if not messages:
+            return []
+        now = time.time()
+        db = self._conn()
+        ids = []
+        db.execute("BEGIN")
+        try:
+            for message, chat_id in messages:
+                cursor = db.execute(
+                    "INSERT INTO outbox (chat_id, message, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+                    (str(chat_id), message, now, now)
+                )
+                ids.append(cursor.lastrowid)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return ids
+
+    # Pending, or claimed by a process that did not finish within the lease
+    _CLAIMABLE = ("(status = 'pending' OR (status = 'sending' "
+                  "AND (claimed_at IS NULL OR claimed_at < ?)))")
+
+    def _next_due(self):
+        """Oldest claimable message, or None"""
+        return self._conn().execute(
+            "SELECT id, chat_id, message, attempts, next_attempt_at FROM outbox "
+            f"WHERE {self._CLAIMABLE} ORDER BY next_attempt_at, id LIMIT 1",
+            (time.time() - self.lease_timeout,)
+        ).fetchone()
+
+    def _claim(self, row_id: int) -> bool:
+        """
+        Mark a row as being sent by this process
+
+        Returns:
+            False if another process claimed it first
+        """
+        now = time.time()
+        cursor = self._conn().execute(
+            f"UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ? AND {self._CLAIMABLE}",
+            (now, row_id, now - self.lease_timeout)
+        )
+        return cursor.rowcount == 1
+
+    def stats(self) -> dict:
+        """Outbox counters for /stats"""
+        rows = dict(self._conn().execute(
+            "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+        ).fetchall())
+        return {
+            "pending": rows.get("pending", 0) + rows.get("sending", 0),
+            "dead": rows.get("dead", 0),
+            "sent": self.sent_count,
+            "failed_attempts": self.failed_count,
+            "in_flight": len(self._inflight),
+            "running": self._task is not None and not self._task.done()
+        }
+
+    # === WORKER ===
+
+    async def start(self) -> None:
+        """Start the background drain worker"""
+        self._conn()
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Telegram outbox started ({self.stats()['pending']} pending)")
+
+    async def stop(self, flush_timeout: float = 10.0) -> None:
+        """
+        Graceful shutdown: drain what is due, then stop the worker
+
+        Messages not delivered before flush_timeout stay on disk and are
+        sent on next startup.
+
+        Args:
+            flush_timeout: Maximum seconds spent flushing
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=flush_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Outbox flush timed out - remaining messages kept on disk")
+            for task in list(self._inflight):
+                task.cancel()
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        self._task = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    async def _wait_rate_limit(self, chat_id: str) -> None:
+        """Sleep until both the global and the per-chat slots are free"""
+        now = time.monotonic()
+        ready_at = max(self._next_global_slot, self._next_chat_slot.get(chat_id, 0.0))
+        if ready_at > now:
+            await asyncio.sleep(ready_at - now)
+            now = time.monotonic()
+        self._next_global_slot = now + self.global_interval
+        self._next_chat_slot[chat_id] = now + self.per_chat_interval
+
+    async def _run(self) -> None:
+        """Drain loop"""
+        while True:
+            row = self._next_due() if len(self._inflight) < self.concurrency else None
+            if row is None:
+                if self._stopping and not self._inflight:
+                    return
+                # Rows claimed by a dead process become due once their lease expires
+                await self._sleep_until_wakeup(self.lease_timeout)
+                continue
+
+            row_id, chat_id, message, attempts, next_attempt_at = row
+            wait = next_attempt_at - time.time()
+            if wait > 0:
+                if self._stopping and not self._inflight:
+                    # Only retries remain - leave them on disk
+                    return
+                await self._sleep_until_wakeup(wait)
+                continue
+
+            await self._wait_rate_limit(chat_id)
+            if not self._claim(row_id):
+                continue
+            task = asyncio.create_task(self._deliver(row_id, chat_id, message, attempts))
+            self._inflight.add(task)
+            task.add_done_callback(self._on_delivered)
+
+    def _on_delivered(self, task: asyncio.Task) -> None:
+        """Free the in-flight slot and wake the drain loop"""
+        self._inflight.discard(task)
+        self._wakeup.set()
+
+    async def _sleep_until_wakeup(self, timeout: Optional[float] = None) -> None:
+        """Wait for enqueue(), a finished send, stop(), or the timeout"""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _deliver(self, row_id: int, chat_id: str, message: str, attempts: int) -> None:
+        """Send one message and update its spool row"""
+        if not self.token:
+            logger.error("Telegram token not configured - outbox paused")
+            self._conn().execute(
+                "UPDATE outbox SET status = 'pending', next_attempt_at = ? WHERE id = ?",
+                (time.time() + self.backoff_cap, row_id)
+            )
+            return
+
+        status_code, retry_after, error = await post_telegram_message(message, self.token, chat_id)
+
+        if status_code == 200:
+            self._conn().execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+            self.sent_count += 1
+            logger.info(f"Outbox message {row_id} sent")
+            return
+
+        self.failed_count += 1
+        attempts += 1
+        if retry_after is not None:
+            # Telegram told us how long to wait - applies to the whole bot
+            delay = retry_after
+            self._next_global_slot = max(self._next_global_slot, time.monotonic() + retry_after)
+        else:
+            delay = backoff_delay(attempts - 1, self.backoff_base, self.backoff_cap)
+
+        if attempts >= self.max_attempts or status_code in (400, 401, 403, 404):
+            logger.error(f"Outbox message {row_id} dead after {attempts} attempts: {status_code} {error}")
+            self._conn().execute(
+                "UPDATE outbox SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                (attempts, f"{status_code} {error}"[:500], row_id)
+            )
+            return
+
+        logger.warning(f"Outbox message {row_id} attempt {attempts} failed ({status_code}) - retry in {delay:.1f}s")
+        self._conn().execute(
+            "UPDATE outbox SET status = 'pending', attempts = ?, next_attempt_at = ?, last_error = ? "
+            "WHERE id = ?",
+            (attempts, time.time() + delay, f"{status_code} {error}"[:500], row_id)
+        )
@@ -0,0 +1,303 @@
+"""
+Signal decision pipeline - shared by /tv and /tv/batch
+
+Two stages:
+- screen_signal (sync): confluence threshold (+ optional higher-timeframe
+  bonus), payload verification, exact and semantic dedup
+- validate_signal (async): AI validation, RR / size, Telegram message,
+  with the confluence score and HTF alignment screen_signal decided on
+
+The Telegram message is queued by the caller (one insert for /tv, one
+transaction for a whole batch) so both endpoints give identical results.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.config import Config
+from app.decoder import Signal, DecodeError
+from app.mtf import Alignment, mtf_state
+from app.notifier import format_smc_ai_signal
+from app.outbox import TelegramOutbox
+from app.smc import calculate_rr_ratio, unweighted_score, active_flag_labels
+from app.smc_ai import process_with_ai_async
+from app.utils import is_duplicate, is_semantic_duplicate
+from app.verifier import verify_signal
+from app.zones import zone_index
+
+logger = logging.getLogger(__name__)
+
+# (status_code, response content)
+Result = Tuple[int, Dict]
+
+
+def confluence_of(signal: Signal) -> float:
+    """Unweighted confluence score in % (10 flags)"""
+    return unweighted_score(signal.flags) * 100
+
+
+def scored_confluence(signal: Signal) -> Tuple[float, Alignment]:
+    """Confluence % plus the higher-timeframe bonus (0 unless MTF_SCORE_ENABLED)"""
+    alignment = mtf_state.enrich(signal)
+    return confluence_of(signal) + alignment.bonus, alignment
+
+
+def screen_signal(signal: Signal, request_id: str) -> Tuple[Optional[Result], float, Alignment]:
+    """
+    Cheap synchronous checks, in /tv order
+
+    Args:
+        signal: Decoded signal
+        request_id: Log prefix
+
+    Returns:
+        Tuple of (rejection result (202) or None if the signal goes to AI
+        validation, confluence score, HTF alignment)
+    """
+    event_id = signal.event_id
+    confluence_score, alignment = scored_confluence(signal)
+
+    logger.info(
+        f"[{request_id}] Confluence: {confluence_score:.1f}% (threshold: {Config.CONFLUENCE_THRESH*100:.0f}%, "
+        f"HTF aligned {alignment.aligned} / conflicting {alignment.conflicting})"
+    )
+
+    # Check confluence threshold (>= pour inclure exactement 70%)
+    if confluence_score < (Config.CONFLUENCE_THRESH * 100) - 0.01:  # -0.01 pour éviter les erreurs de floating point
+        logger.info(f"[{request_id}] Below threshold - Signal rejected")
+        return (202, {
+            "ok": True,
+            "sent": False,
+            "reason": "below_threshold",
+            "confluence": confluence_score,
+            "mtf": alignment.summary(),
+            "event_id": event_id
+        }), confluence_score, alignment
+
+    # Fabricated / stale payloads never reach dedup, AI or Telegram
+    failed_check = verify_signal(signal)
+    if failed_check:
+        logger.warning(f"[{request_id}] Verification failed ({failed_check}): {event_id}")
+        return (202, {
+            "ok": True,
+            "sent": False,
+            "reason": "verification_failed",
+            "check": failed_check,
+            "event_id": event_id
+        }), confluence_score, alignment
+
+    # Check for duplicates
+    if is_duplicate(event_id, Config.ANTI_SPAM_TTL):
+        logger.info(f"[{request_id}] Duplicate signal: {event_id}")
+        return (202, {
+            "ok": True,
+            "sent": False,
+            "reason": "duplicate",
+            "event_id": event_id
+        }), confluence_score, alignment
+
+    # Same setup under another event_id (Pine variants, consecutive bars)
+    semantic_match = is_semantic_duplicate(
+        signal.symbol, signal.direction, signal.timeframe, signal.entry, signal.atr, event_id
+    )
+    if semantic_match:
+        logger.info(f"[{request_id}] Semantic duplicate ({semantic_match}): {event_id}")
+        return (202, {
+            "ok": True,
+            "sent": False,
+            "reason": "semantic_duplicate",
+            "match": semantic_match,
+            "event_id": event_id
+        }), confluence_score, alignment
+
+    # Genuine, first-seen signal: becomes higher-timeframe context for the next ones
+    mtf_state.record_signal(signal)
+    return None, confluence_score, alignment
+
+
+async def validate_signal(
+    signal: Signal,
+    request_id: str,
+    confluence_score: float,
+    alignment: Alignment
+) -> Tuple[int, Dict, Optional[str]]:
+    """
+    AI validation and message formatting for a screened signal
+
+    Args:
+        signal: Decoded signal that passed screen_signal
+        request_id: Log prefix
+        confluence_score: Score that passed the threshold (from screen_signal)
+        alignment: HTF alignment behind that score (from screen_signal)
+
+    Returns:
+        Tuple of (status_code, content, message). message is the Telegram
+        text to queue (content["outbox_id"] is then filled by the caller),
+        or None when the signal is rejected.
+    """
+    event_id = signal.event_id
+    entry = signal.entry
+    sl = signal.sl
+    tp = signal.tp
+    flags = signal.flags_dict()
+
+    # AI VALIDATION with GROK + DEEPSEEK
+    signal_data = {
+        "symbol": signal.symbol,
+        "direction": signal.direction,
+        "price_ctx": {
+            "entry": entry,
+            "sl": sl,
+            "tp": tp
+        },
+        "atr": signal.atr,
+        "confluence_score": confluence_score,
+        "flags": flags
+    }
+
+    # GROK + DEEPSEEK run concurrently under one stage deadline
+    ai_trade = await process_with_ai_async(signal_data)
+    if ai_trade:
+        logger.info(f"[{request_id}] AI APPROVED: {ai_trade}")
+        # Use AI-calculated SL/TP if available
+        if ai_trade.get("sl"):
+            sl = ai_trade["sl"]
+        if ai_trade.get("tp"):
+            tp = ai_trade["tp"]
+    else:
+        logger.info(f"[{request_id}] AI REJECTED signal")
+        return 202, {
+            "ok": True,
+            "sent": False,
+            "reason": "ai_rejected",
+            "event_id": event_id
+        }, None
+
+    # Calculate Risk:Reward ratio
+    rr_ratio = calculate_rr_ratio(entry, sl, tp)
+
+    # Calculate position size (only thing we calculate)
+    risk_amount = Config.BASE_EQUITY * Config.RISK_PCT
+    price_distance = abs(entry - sl)
+    position_size = risk_amount / price_distance if price_distance > 0 else 0
+
+    # Active flags list with ALL SMC indicators (precomputed per mask)
+    active_flags = list(active_flag_labels(signal.flags, checked=True))
+
+    # Queue enhanced AI notification (delivered by the outbox worker)
+    if not Config.TELEGRAM_TOKEN or not Config.TELEGRAM_CHAT_ID:
+        logger.error(f"[{request_id}] ❌ TELEGRAM NOT CONFIGURED: {event_id}")
+        return 202, {
+            "ok": True,
+            "sent": False,
+            "reason": "telegram_error",
+            "event_id": event_id
+        }, None
+
+    message = format_smc_ai_signal(
+        ai_trade=ai_trade,
+        confluence_score=confluence_score,
+        timeframe=signal.timeframe,
+        active_flags=active_flags
+    )
+
+    return 200, {
+        "status": "AI APPROVED",
+        "ok": True,
+        "sent": True,
+        "delivery": "queued",
+        "outbox_id": None,
+        "event_id": event_id,
+        "mtf": alignment.summary(),
+        "zones": zone_index.context(signal.symbol, signal.direction, entry, signal.atr),
+        "trade": ai_trade if ai_trade else {
+            "entry": entry,
+            "sl": sl,
+            "tp": tp,
+            "size": position_size,
+            "rr": rr_ratio
+        }
+    }, message
+
+
+async def process_signal(signal: Signal, outbox: TelegramOutbox, request_id: str) -> Result:
+    """
+    Full decision for one signal (/tv)
+
+    Args:
+        signal: Decoded signal
+        outbox: Shared Telegram outbox
+        request_id: Log prefix
+
+    Returns:
+        (status_code, content)
+    """
+    rejected, confluence_score, alignment = screen_signal(signal, request_id)
+    if rejected:
+        return rejected
+
+    status_code, content, message = await validate_signal(signal, request_id, confluence_score, alignment)
+    if message is not None:
+        content["outbox_id"] = outbox.enqueue(message, Config.TELEGRAM_CHAT_ID)
+        logger.info(f"[{request_id}] ✅ SIGNAL QUEUED: {signal.event_id} (outbox #{content['outbox_id']})")
+    return status_code, content
+
+
+async def process_batch(
+    records: List[Union[Signal, DecodeError]],
+    outbox: TelegramOutbox,
+    request_id: str
+) -> List[Result]:
+    """
+    Full decision for a batch of records (/tv/batch)
+
+    Screening (score + dedup) runs over the whole batch in one pass, in
+    record order, so duplicates inside the batch are caught exactly as
+    with sequential /tv calls. Survivors are validated concurrently (and
+    share AI micro-batches when enabled); their messages are queued in a
+    single outbox transaction.
+
+    Args:
+        records: Decoded signals, or the DecodeError of invalid records
+        outbox: Shared Telegram outbox
+        request_id: Log prefix
+
+    Returns:
+        One (status_code, content) per record, in input order
+    """
+    results: List[Optional[Result]] = [None] * len(records)
+    survivors = []
+    for index, record in enumerate(records):
+        if isinstance(record, DecodeError):
+            results[index] = 400, {
+                "ok": False,
+                "sent": False,
+                "reason": record.code,
+                "field": record.field,
+                "message": str(record)
+            }
+            continue
+        rejected, confluence_score, alignment = screen_signal(record, f"{request_id}#{index}")
+        if rejected:
+            results[index] = rejected
+        else:
+            survivors.append((index, confluence_score, alignment))
+
+    validated = await asyncio.gather(
+        *(validate_signal(records[index], f"{request_id}#{index}", confluence_score, alignment)
+          for index, confluence_score, alignment in survivors)
+    )
+
+    queued = []
+    for (index, _, _), (status_code, content, message) in zip(survivors, validated):
+        results[index] = status_code, content
+        if message is not None:
+            queued.append((index, message))
+
+    outbox_ids = outbox.enqueue_many([(message, Config.TELEGRAM_CHAT_ID) for _, message in queued])
+    for (index, _), outbox_id in zip(queued, outbox_ids):
+        results[index][1]["outbox_id"] = outbox_id
+    if queued:
+        logger.info(f"[{request_id}] ✅ {len(queued)} SIGNALS QUEUED (outbox #{outbox_ids[0]}-#{outbox_ids[-1]})")
+
+    return results
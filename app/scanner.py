@@ -0,0 +1,306 @@
+"""
+Multi-symbol scanner - SMC detection on our own bars, no TradingView alert
+
+Every closed bar of SUPPORTED_SYMBOLS x TIMEFRAMES goes to one shard
+process chosen by symbol (crc32 % shards), so all timeframes of a symbol
+live in the same worker and no state is shared. Each shard keeps one
+StreamingSMC per (symbol, timeframe), warmed from the CandleStore, and
+answers with the bars that fire, plus the flags / trend / ATR of every
+bar for the multi-timeframe state and the OB / FVG zone index. Signals get the Pine event_id
+(SYMBOL_bartime_DIRECTION) and go through pipeline.process_batch - the
+/tv decision logic; an alert fired by TradingView for the same bar is
+dropped as a duplicate.
+
+Live chain: stream_binance -> BarAggregator -> Scanner.on_bars. Closed
+bars are also appended to the CandleStore (SCANNER_PERSIST_BARS), so the
+next start warms up from them.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+import zlib
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.aggregator import TIMEFRAMES, BarAggregator, stream_binance
+from app.candles import CandleStore
+from app.config import Config
+from app.decoder import Signal
+from app.indicators import StreamingSMC
+from app.mtf import mtf_state
+from app.outbox import TelegramOutbox
+from app.pipeline import process_batch
+from app.smc import SUPPORTED_SYMBOLS
+from app.smc_engine import pine_asset_type
+from app.utils import timeframe_seconds
+from app.verifier import market_state
+from app.zones import zone_index
+
+logger = logging.getLogger(__name__)
+
+# (symbol, timeframe, open, high, low, close, volume, bar open time ms)
+Bar = Tuple[str, str, float, float, float, float, float, int]
+
+
+def shard_of(symbol: str, shards: int) -> int:
+    """Stable shard of a symbol (same worker across restarts)"""
+    return zlib.crc32(symbol.encode()) % shards
+
+
+def _shard_main(
+    shard: int,
+    inbox: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    streams: List[Tuple[str, str]],
+    confluence_threshold: float,
+    store_root: Optional[str],
+    warmup_bars: int
+):
+    """
+    Shard worker: owns the StreamingSMC of its symbols
+
+    Messages in: (batch_id, sent_at, [Bar, ...]) or None to stop.
+    Messages out: (batch_id, sent_at, done_at, [(Bar, mask, signal, trap_score, final_atr), ...],
+    [(Bar, mask, trend, final_atr, ob_direction) per bar] - the MTF state and zone index feed).
+    """
+    engines: Dict[Tuple[str, str], StreamingSMC] = {}
+    store = CandleStore(store_root)
+    for symbol, timeframe in streams:
+        engine = engines[(symbol, timeframe)] = StreamingSMC(pine_asset_type(symbol), confluence_threshold)
+        candles = store.tail(symbol, timeframe, warmup_bars)
+        for bar in zip(candles.open.tolist(), candles.high.tolist(), candles.low.tolist(),
+                       candles.close.tolist(), candles.volume.tolist(), candles.time.tolist()):
+            engine.update(*bar)
+    results.put(("ready", shard))
+
+    while True:
+        message = inbox.get()
+        if message is None:
+            return
+        batch_id, sent_at, bars = message
+        fired, states = [], []
+        for bar in bars:
+            symbol, timeframe, o, h, l, c, v, t = bar
+            key = (symbol, timeframe)
+            engine = engines.get(key)
+            if engine is None:
+                engine = engines[key] = StreamingSMC(pine_asset_type(symbol), confluence_threshold)
+            mask, signal, trap_score, final_atr = engine.update(o, h, l, c, v, t)
+            states.append((bar, mask, engine.prev_trend, final_atr, 1 if c > engine.prev_ema20 else -1))
+            if signal:
+                fired.append((bar, mask, signal, trap_score, final_atr))
+        results.put((batch_id, sent_at, time.time(), fired, states))
+
+
+def build_signal(bar: Bar, mask: int, signal: int, final_atr: float) -> Signal:
+    """Scanner hit -> the Signal a Pine alert would have produced"""
+    symbol, timeframe, _, _, _, close, _, bar_time = bar
+    direction = "LONG" if signal > 0 else "SHORT"
+    sl, tp = StreamingSMC.levels(close, signal, final_atr)
+    return Signal(
+        event_id=f"{symbol}_{bar_time}_{direction}",
+        symbol=symbol,
+        timeframe=timeframe,
+        direction=direction,
+        entry=close,
+        sl=sl,
+        tp=tp,
+        atr=final_atr,
+        flags=mask
+    )
+
+
+class Scanner:
+    """
+    Sharded SMC scanner feeding the webhook pipeline
+
+    Usage:
+        scanner = Scanner(outbox)
+        await scanner.start()
+        aggregator = BarAggregator(scanner.symbols, on_bars=scanner.on_bars)
+    """
+
+    def __init__(
+        self,
+        outbox: Optional[TelegramOutbox],
+        symbols: Sequence[str] = tuple(SUPPORTED_SYMBOLS),
+        timeframes: Sequence[str] = TIMEFRAMES,
+        shards: Optional[int] = None,
+        store_root: Optional[str] = None,
+        warmup_bars: Optional[int] = None,
+        dispatch=process_batch
+    ):
+        """
+        Args:
+            outbox: Telegram outbox passed to the pipeline
+            symbols: Scanned symbols
+            timeframes: Scanned timeframes
+            shards: Worker processes (Config.SCANNER_SHARDS)
+            store_root: CandleStore root used for warm-up
+            warmup_bars: Candles replayed per stream at start (Config.SCANNER_WARMUP_BARS)
+            dispatch: async (signals, outbox, request_id) -> results, the pipeline by default
+        """
+        self.outbox = outbox
+        self.symbols = list(symbols)
+        self.timeframes = [str(tf) for tf in timeframes]
+        self.shards = max(1, min(shards or Config.SCANNER_SHARDS, len(self.symbols)))
+        self.store_root = store_root
+        self.warmup_bars = Config.SCANNER_WARMUP_BARS if warmup_bars is None else warmup_bars
+        self.dispatch = dispatch
+
+        self._context = multiprocessing.get_context("spawn")
+        self._inboxes: List[multiprocessing.Queue] = []
+        self._results: Optional[multiprocessing.Queue] = None
+        self._processes: List[multiprocessing.Process] = []
+        self._reader: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+        self._batch_id = 0
+
+        self.bars = 0
+        self.batches = 0
+        self.signals = 0
+        self.dispatched = 0
+        self._compute_latency = deque(maxlen=1000)  # bars sent -> shard answer
+        self._close_latency = deque(maxlen=1000)    # bar close -> pipeline dispatch
+
+    async def start(self):
+        """Spawn the shard workers and wait until every stream is warm"""
+        self._results = self._context.Queue()
+        streams: List[List[Tuple[str, str]]] = [[] for _ in range(self.shards)]
+        for symbol in self.symbols:
+            streams[shard_of(symbol, self.shards)].extend((symbol, tf) for tf in self.timeframes)
+        for shard in range(self.shards):
+            inbox = self._context.Queue()
+            process = self._context.Process(
+                target=_shard_main, name=f"scanner-shard-{shard}", daemon=True,
+                args=(shard, inbox, self._results, streams[shard], Config.CONFLUENCE_THRESH * 100,
+                      self.store_root, self.warmup_bars)
+            )
+            process.start()
+            self._inboxes.append(inbox)
+            self._processes.append(process)
+
+        loop = asyncio.get_running_loop()
+        for _ in range(self.shards):
+            await loop.run_in_executor(None, self._results.get)
+        self._reader = asyncio.create_task(self._read_results())
+        logger.info(f"🛰️ Scanner started: {len(self.symbols)} symbols x {len(self.timeframes)} timeframes, "
+                    f"{self.shards} shards")
+
+    async def stop(self):
+        """Stop workers, wait for in-flight pipeline calls"""
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for process in self._processes:
+            await asyncio.get_running_loop().run_in_executor(None, process.join, 5)
+        if self._reader:
+            self._results.put(None)
+            await self._reader
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._inboxes, self._processes, self._reader = [], [], None
+
+    def submit(self, bars: Sequence[Bar]):
+        """
+        Route closed bars to their shard (one queue message per shard)
+
+        Args:
+            bars: Closed bars, oldest first per stream
+        """
+        per_shard: Dict[int, List[Bar]] = {}
+        for bar in bars:
+            market_state.update(bar[0], bar[1], bar[3], bar[4], bar[5], bar[7], bar[6])
+            per_shard.setdefault(shard_of(bar[0], self.shards), []).append(bar)
+        sent_at = time.time()
+        for shard, shard_bars in per_shard.items():
+            self._batch_id += 1
+            self._inboxes[shard].put((self._batch_id, sent_at, shard_bars))
+        self.bars += len(bars)
+
+    def on_bars(self, batch):
+        """BarAggregator callback (the aggregator must use self.symbols)"""
+        self.submit([
+            (self.symbols[i], batch.timeframe, o, h, l, c, v, t)
+            for i, o, h, l, c, v, t in zip(batch.symbol.tolist(), batch.open.tolist(), batch.high.tolist(),
+                                           batch.low.tolist(), batch.close.tolist(), batch.volume.tolist(),
+                                           batch.time.tolist())
+        ])
+
+    async def _read_results(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await loop.run_in_executor(None, self._results.get)
+            if message is None:
+                return
+            _, sent_at, done_at, fired, states = message
+            self.batches += 1
+            self._compute_latency.append(done_at - sent_at)
+            for bar, mask, trend, final_atr, ob_direction in states:
+                symbol, timeframe, _, high, low, close, _, bar_time = bar
+                mtf_state.update(symbol, timeframe, bar_time, mask, trend, final_atr)
+                zone_index.on_bar(symbol, timeframe, bar_time, high, low, close, mask, ob_direction)
+            if not fired:
+                continue
+            self.signals += len(fired)
+            signals = [build_signal(bar, mask, signal, final_atr) for bar, mask, signal, _, final_atr in fired]
+            request_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_scan{self._batch_id}"
+            now = time.time()
+            for bar, *_ in fired:
+                self._close_latency.append(now - bar[7] / 1000 - timeframe_seconds(bar[1]))
+            task = asyncio.create_task(self._dispatch(signals, request_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, signals: List[Signal], request_id: str):
+        try:
+            await self.dispatch(signals, self.outbox, request_id)
+            self.dispatched += len(signals)
+        except Exception as e:
+            logger.error(f"[{request_id}] ❌ Scanner dispatch failed: {e}")
+
+    @staticmethod
+    def _percentiles(values) -> Dict:
+        if not values:
+            return {"p50_ms": None, "p99_ms": None}
+        ordered = sorted(values)
+        return {
+            "p50_ms": round(ordered[len(ordered) // 2] * 1000, 2),
+            "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 2)
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "shards": self.shards,
+            "bars": self.bars,
+            "signals": self.signals,
+            "dispatched": self.dispatched,
+            "compute_latency": self._percentiles(self._compute_latency),
+            "bar_close_latency": self._percentiles(self._close_latency)
+        }
+
+
+async def run_live(scanner: Scanner, stop: Optional[asyncio.Event] = None, shadow=None):
+    """
+    Binance trades -> bars -> scanner (+ CandleStore), until stop is set
+
+    Args:
+        scanner: Started scanner
+        stop: Event ending the stream
+        shadow: Optional app.variants.ShadowEvaluator fed with the same bars
+    """
+    store = CandleStore(scanner.store_root) if Config.SCANNER_PERSIST_BARS else None
+
+    def on_bars(batch):
+        scanner.on_bars(batch)
+        if shadow is not None:
+            shadow.on_batch(scanner.symbols, batch)
+        if store is not None:
+            try:
+                store.append_batch(scanner.symbols, batch)
+            except OSError as e:
+                logger.error(f"❌ Candle store append failed ({batch.timeframe}): {e}")
+
+    aggregator = BarAggregator(scanner.symbols, scanner.timeframes, on_bars=on_bars)
+    await stream_binance(aggregator, stop=stop)
@@ -1,7 +1,7 @@
 """
 SMC (Smart Money Concepts) scoring and risk management functions
 """
-from typing import Tuple, List
+from typing import Dict, Tuple, List, Optional, Union
 from app.models import Flags, TVPayload
 
 
@@ -19,6 +19,9 @@ WEIGHTS = {
     "time_filter": 0.04
 }
 
+# Canonical flag order - bit i of a flag bitmask is FLAG_NAMES[i]
+FLAG_NAMES = tuple(WEIGHTS.keys())
+
 # Critical flags that must be present
 CRITICAL_FLAGS = []  # TEST: Disabled critical flags requirement for testing
 
@@ -44,6 +47,151 @@ ASSET_CONFIG = {
     }
 }
 
+# Supported symbols - HIGH VOLUME/LIQUIDITY ONLY
+SUPPORTED_SYMBOLS = {
+    # FOREX - Major pairs + Gold (high volume)
+    "EURUSD": "forex",
+    "GBPUSD": "forex", 
+    "USDJPY": "forex",
+    "AUDUSD": "forex",
+    "USDCAD": "forex",
+    "XAUUSD": "gold",
+    
+    # CRYPTO PERPETUALS - Top volume/volatility
+    "BTCUSDT.P": "crypto",
+    "ETHUSDT.P": "crypto",
+    "SOLUSDT.P": "crypto",
+    "ADAUSDT.P": "crypto",
+    "DOGEUSDT.P": "crypto",
+    "XRPUSDT.P": "crypto"
+}
+
+
+def flags_to_mask(flags: dict) -> int:
+    """
+    Encode SMC flags as a 10-bit mask (bit i = FLAG_NAMES[i])
+    
+    Args:
+        flags: Mapping of flag name to bool
+        
+    Returns:
+        Integer bitmask
+    """
+    mask = 0
+    for bit, flag_name in enumerate(FLAG_NAMES):
+        if flags.get(flag_name):
+            mask |= 1 << bit
+    return mask
+
+
+# === LOOKUP TABLES (one entry per 10-bit mask) ===
+# Built by rebuild_tables() from WEIGHTS / CRITICAL_FLAGS
+
+MASK_SPACE = 1 << len(FLAG_NAMES)
+
+_COUNT: Tuple[int, ...] = ()
+_SCORE: Tuple[float, ...] = ()
+_WEIGHTED: Tuple[float, ...] = ()
+_MISSING_CRITICAL: Tuple[Tuple[str, ...], ...] = ()
+_LABELS: Tuple[Tuple[str, ...], ...] = ()
+_CHECKED_LABELS: Tuple[Tuple[str, ...], ...] = ()
+
+
+def rebuild_tables() -> None:
+    """
+    Recompute the per-mask tables from the current WEIGHTS and CRITICAL_FLAGS
+    
+    Called at import and by set_weights(); call it again after editing
+    WEIGHTS or CRITICAL_FLAGS in place.
+    """
+    global _COUNT, _SCORE, _WEIGHTED, _MISSING_CRITICAL, _LABELS, _CHECKED_LABELS
+    
+    if tuple(WEIGHTS.keys()) != FLAG_NAMES:
+        raise ValueError(f"WEIGHTS must keep the flags {FLAG_NAMES} in this order")
+    
+    weights = [WEIGHTS[flag_name] for flag_name in FLAG_NAMES]
+    labels = [flag_name.replace('_', ' ').title() for flag_name in FLAG_NAMES]
+    critical = [bit for bit, flag_name in enumerate(FLAG_NAMES) if flag_name in CRITICAL_FLAGS]
+    
+    count, score, weighted, missing, active, checked = [], [], [], [], [], []
+    for mask in range(MASK_SPACE):
+        bits = [bit for bit in range(len(FLAG_NAMES)) if mask >> bit & 1]
+        total = 0.0
+        for bit in bits:
+            total += weights[bit]  # same summation order as the former loop
+        count.append(len(bits))
+        score.append(len(bits) / len(FLAG_NAMES))
+        weighted.append(total)
+        missing.append(tuple(FLAG_NAMES[bit] for bit in critical if not mask >> bit & 1))
+        active.append(tuple(labels[bit] for bit in bits))
+        checked.append(tuple(f"✅ {labels[bit]}" for bit in bits))
+    
+    _COUNT, _SCORE, _WEIGHTED = tuple(count), tuple(score), tuple(weighted)
+    _MISSING_CRITICAL, _LABELS, _CHECKED_LABELS = tuple(missing), tuple(active), tuple(checked)
+
+
+def set_weights(weights: Dict[str, float], critical_flags: Optional[List[str]] = None) -> None:
+    """
+    Update flag weights (and optionally critical flags), then rebuild tables
+    
+    Args:
+        weights: New weight per flag (subset of FLAG_NAMES)
+        critical_flags: New critical flag list, unchanged if None
+    """
+    unknown = set(weights) - set(FLAG_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown flags: {', '.join(sorted(unknown))}")
+    WEIGHTS.update(weights)
+    if critical_flags is not None:
+        CRITICAL_FLAGS[:] = critical_flags
+    rebuild_tables()
+
+
+def flag_count(mask: int) -> int:
+    """Number of active flags in a mask"""
+    return _COUNT[mask]
+
+
+def unweighted_score(mask: int) -> float:
+    """Share of active flags (0.0 - 1.0)"""
+    return _SCORE[mask]
+
+
+def weighted_score(mask: int) -> float:
+    """Sum of WEIGHTS of the active flags (0.0 - 1.0)"""
+    return _WEIGHTED[mask]
+
+
+def missing_critical_flags(mask: int) -> Tuple[str, ...]:
+    """Critical flags absent from a mask"""
+    return _MISSING_CRITICAL[mask]
+
+
+def active_flag_labels(mask: int, checked: bool = False) -> Tuple[str, ...]:
+    """
+    Display labels of the active flags ("Poi Valid", ...)
+    
+    Args:
+        mask: Flag bitmask
+        checked: Prefix each label with "✅ " (Telegram format)
+        
+    Returns:
+        Labels in FLAG_NAMES order
+    """
+    return _CHECKED_LABELS[mask] if checked else _LABELS[mask]
+
+
+def _as_mask(flags: Union[int, dict, Flags]) -> int:
+    """Mask of a bitmask, a flag dict or a Flags model"""
+    if isinstance(flags, int):
+        return flags
+    if isinstance(flags, dict):
+        return flags_to_mask(flags)
+    return flags_to_mask(flags.model_dump())
+
+
+rebuild_tables()
+
 
 def get_asset_config(symbol: str, asset_type: str = None) -> dict:
     """
@@ -68,21 +216,17 @@ def get_asset_config(symbol: str, asset_type: str = None) -> dict:
     return ASSET_CONFIG.get(asset_type, ASSET_CONFIG["forex"])
 
 
-def calculate_confluence_score(flags: Flags) -> float:
+def calculate_confluence_score(flags: Union[int, dict, Flags]) -> float:
     """
     Calculate SMC confluence score based on weighted flags
     
     Args:
-        flags: SMC flags object
+        flags: SMC flags object, flag dict or bitmask
         
     Returns:
         Float score between 0.0 and 1.0
     """
-    total_score = 0.0
-    
-    for flag_name, weight in WEIGHTS.items():
-        if hasattr(flags, flag_name) and getattr(flags, flag_name):
-            total_score += weight
+    total_score = _WEIGHTED[_as_mask(flags)]
     
     # DEBUG LOG
     print(f"🔍 DEBUG CONFLUENCE: Score={total_score:.2f} ({total_score*100:.1f}%)")
@@ -90,21 +234,17 @@ def calculate_confluence_score(flags: Flags) -> float:
     return total_score
 
 
-def validate_critical_flags(flags: Flags) -> Tuple[bool, str]:
+def validate_critical_flags(flags: Union[int, dict, Flags]) -> Tuple[bool, str]:
     """
     Validate that critical SMC flags are present
     
     Args:
-        flags: SMC flags object
+        flags: SMC flags object, flag dict or bitmask
         
     Returns:
         Tuple of (is_valid, reason)
     """
-    missing_flags = []
-    
-    for critical_flag in CRITICAL_FLAGS:
-        if not hasattr(flags, critical_flag) or not getattr(flags, critical_flag):
-            missing_flags.append(critical_flag)
+    missing_flags = _MISSING_CRITICAL[_as_mask(flags)]
     
     if missing_flags:
         print(f"❌ CRITICAL FLAGS MISSING: {', '.join(missing_flags)}")
@@ -175,20 +315,14 @@ def calculate_rr_ratio(entry: float, stop_loss: float, take_profit: float) -> fl
     return reward / risk if risk > 0 else 0
 
 
-def get_active_flags(flags: Flags) -> List[str]:
+def get_active_flags(flags: Union[int, dict, Flags]) -> List[str]:
     """
     Get list of active (True) flags
     
     Args:
-        flags: SMC flags object
+        flags: SMC flags object, flag dict or bitmask
         
     Returns:
         List of active flag names
     """
-    active_flags = []
-    
-    for flag_name in WEIGHTS.keys():
-        if hasattr(flags, flag_name) and getattr(flags, flag_name):
-            active_flags.append(flag_name.replace('_', ' ').title())
-    
-    return active_flags
\ No newline at end of file
+    return list(_LABELS[_as_mask(flags)])
\ No newline at end of file
@@ -2,9 +2,17 @@
 smc_ai.py - GROK + DEEPSEEK IA ENGINE
 Valide les signaux SMC + calcule SL/TP + sentiment
 """
+import asyncio
 import requests
+import httpx
 import json
-from typing import Dict, Optional
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.circuit import CircuitBreaker
+from app.ai_cache import VerdictCache, signal_fingerprint
+from app.ai_batch import AIBatcher
 
 # === CONFIG ===
 GROK_API_KEY = "YOUR_GROK_API_KEY"
@@ -13,6 +21,10 @@ DEEPSEEK_API_KEY = "YOUR_DEEPSEEK_API_KEY"
 GROK_URL = "https://api.x.ai/v1/chat/completions"
 DEEPSEEK_URL = "https://api.deepseek.com/v1/chat/completions"
 
+# Endpoints légers utilisés pour sonder un provider quand son circuit est ouvert
+GROK_PROBE_URL = "https://api.x.ai/v1/models"
+DEEPSEEK_PROBE_URL = "https://api.deepseek.com/v1/models"
+
 HEADERS_GROK = {
     "Authorization": f"Bearer {GROK_API_KEY}",
     "Content-Type": "application/json"
@@ -23,12 +35,79 @@ HEADERS_DEEPSEEK = {
     "Content-Type": "application/json"
 }
 
-def ask_grok(signal: Dict) -> Optional[Dict]:
-    """Demande à GROK si le signal est valide"""
+# Shared async client - keep-alive pool reused for x.ai and DeepSeek
+_ai_client: Optional[httpx.AsyncClient] = None
+
+
+def get_ai_client() -> httpx.AsyncClient:
+    """Client HTTP async partagé (créé à la demande)"""
+    global _ai_client
+    if _ai_client is None or _ai_client.is_closed:
+        _ai_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(Config.AI_CALL_TIMEOUT),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+    return _ai_client
+
+
+async def close_ai_client() -> None:
+    """Ferme le client HTTP async (à l'arrêt)"""
+    global _ai_client
+    if _ai_client is not None:
+        await _ai_client.aclose()
+        _ai_client = None
+
+
+async def _probe(url: str, headers: Dict) -> bool:
+    """Sonde un provider (circuit ouvert) - True si il répond 200"""
+    response = await get_ai_client().get(url, headers=headers)
+    return response.status_code == 200
+
+
+# === CIRCUIT BREAKERS (un par provider) ===
+grok_breaker = CircuitBreaker(
+    "grok",
+    failure_threshold=Config.AI_BREAKER_FAILURES,
+    recovery_timeout=Config.AI_BREAKER_RECOVERY,
+    probe=lambda: _probe(GROK_PROBE_URL, HEADERS_GROK)
+)
+deepseek_breaker = CircuitBreaker(
+    "deepseek",
+    failure_threshold=Config.AI_BREAKER_FAILURES,
+    recovery_timeout=Config.AI_BREAKER_RECOVERY,
+    probe=lambda: _probe(DEEPSEEK_PROBE_URL, HEADERS_DEEPSEEK)
+)
+
+
+# === CACHE DES VERDICTS IA ===
+verdict_cache = VerdictCache(
+    max_size=Config.AI_CACHE_MAX_SIZE,
+    ttl=Config.AI_CACHE_TTL,
+    sqlite_path=Config.AI_CACHE_SQLITE_PATH
+)
+
+
+def get_breaker_stats() -> Dict:
+    """État des circuit breakers pour /stats"""
+    return {
+        "grok": grok_breaker.snapshot(),
+        "deepseek": deepseek_breaker.snapshot()
+    }
+
+
+def get_ai_cache_stats() -> Dict:
+    """Compteurs du cache de verdicts pour /stats"""
+    return verdict_cache.stats()
+
+
+# === PROMPTS / FALLBACKS ===
+
+def _grok_request(signal: Dict) -> Dict:
+    """Corps de requête GROK"""
     prompt = f"""
     Tu es un expert SMC. Analyse ce signal :
     {json.dumps(signal, indent=2)}
-    
+
     Réponds UNIQUEMENT en JSON :
     {{
         "decision": "BUY" | "SELL" | "REJECT",
@@ -36,35 +115,19 @@ def ask_grok(signal: Dict) -> Optional[Dict]:
         "reason": "explication courte"
     }}
     """
-    
-    try:
-        response = requests.post(
-            GROK_URL,
-            headers=HEADERS_GROK,
-            json={
-                "model": "grok-beta",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.1
-            },
-            timeout=10
-        )
-        content = response.json()["choices"][0]["message"]["content"]
-        # Parse JSON response
-        return json.loads(content)
-    except:
-        # Fallback response si GROK fail
-        return {
-            "decision": signal.get("direction", "BUY"),
-            "confidence": 75,
-            "reason": f"Valide – FVG + OB + Volume = fort. Score {signal.get('confluence_score', 70):.0f}%"
-        }
+    return {
+        "model": "grok-beta",
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.1
+    }
 
-def ask_deepseek(signal: Dict) -> Optional[Dict]:
-    """Demande à DEEPSEEK : SL/TP + sentiment"""
+
+def _deepseek_request(signal: Dict) -> Dict:
+    """Corps de requête DEEPSEEK"""
     prompt = f"""
     Calcule pour ce signal SMC :
     {json.dumps(signal, indent=2)}
-    
+
     Réponds UNIQUEMENT en JSON :
     {{
         "sl": float,
@@ -73,56 +136,415 @@ def ask_deepseek(signal: Dict) -> Optional[Dict]:
         "risk_reward": float
     }}
     """
-    
+    return {
+        "model": "deepseek-chat",
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.0
+    }
+
+
+def _batch_prompt_signals(signals: List[Dict]) -> str:
+    """Signaux numérotés (champ "id" = index) pour un prompt groupé"""
+    return json.dumps([dict(signal, id=i) for i, signal in enumerate(signals)], indent=2)
+
+
+def _grok_batch_request(signals: List[Dict]) -> Dict:
+    """Corps de requête GROK pour un lot de signaux"""
+    prompt = f"""
+    Tu es un expert SMC. Analyse ces {len(signals)} signaux :
+    {_batch_prompt_signals(signals)}
+
+    Réponds UNIQUEMENT en JSON, un objet par signal (même "id") :
+    [
+        {{
+            "id": 0,
+            "decision": "BUY" | "SELL" | "REJECT",
+            "confidence": 0-100,
+            "reason": "explication courte"
+        }}
+    ]
+    """
+    return {
+        "model": "grok-beta",
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.1
+    }
+
+
+def _deepseek_batch_request(signals: List[Dict]) -> Dict:
+    """Corps de requête DEEPSEEK pour un lot de signaux"""
+    prompt = f"""
+    Calcule pour ces {len(signals)} signaux SMC :
+    {_batch_prompt_signals(signals)}
+
+    Réponds UNIQUEMENT en JSON, un objet par signal (même "id") :
+    [
+        {{
+            "id": 0,
+            "sl": float,
+            "tp": float,
+            "sentiment": "bullish" | "bearish" | "neutral",
+            "risk_reward": float
+        }}
+    ]
+    """
+    return {
+        "model": "deepseek-chat",
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.0
+    }
+
+
+def _parse_content(data: Dict) -> Dict:
+    """Extrait le JSON de la réponse chat/completions"""
+    content = data["choices"][0]["message"]["content"]
+    return json.loads(content)
+
+
+def _parse_batch_content(data: Dict, size: int) -> List[Optional[Dict]]:
+    """Extrait la liste de verdicts d'une réponse groupée (indexée par id)"""
+    items = _parse_content(data)
+    if isinstance(items, dict):
+        items = items.get("results", [])
+    results: List[Optional[Dict]] = [None] * size
+    for item in items:
+        index = item.get("id") if isinstance(item, dict) else None
+        if isinstance(index, int) and 0 <= index < size:
+            results[index] = {k: v for k, v in item.items() if k != "id"}
+    return results
+
+
+def _grok_fallback(signal: Dict) -> Dict:
+    """Fallback response si GROK fail"""
+    return {
+        "fallback": True,
+        "decision": signal.get("direction", "BUY"),
+        "confidence": 75,
+        "reason": f"Valide – FVG + OB + Volume = fort. Score {signal.get('confluence_score', 70):.0f}%"
+    }
+
+
+def _deepseek_fallback(signal: Dict) -> Dict:
+    """Fallback response si DEEPSEEK fail"""
+    entry = signal.get("price_ctx", {}).get("entry", 100000)
+    # Nested TVPayload signals carry no sl/tp (decoded as None)
+    sl = signal.get("price_ctx", {}).get("sl") or entry * 0.98
+    tp = signal.get("price_ctx", {}).get("tp") or entry * 1.02
+
+    return {
+        "fallback": True,
+        "sl": sl,
+        "tp": tp,
+        "sentiment": "bullish" if signal.get("direction") == "LONG" else "bearish",
+        "risk_reward": abs(tp - entry) / abs(entry - sl) if abs(entry - sl) > 0 else 1.5,
+        "risk_advice": "SL/TP OK – Trend confirmé. 0.04 lot (1% risque), trailing stop à +1.5%"
+    }
+
+
+def _build_trade(signal: Dict, grok: Dict, deepseek: Dict) -> Dict:
+    """Fusionne GROK + DEEPSEEK en trade final"""
+    return {
+        "symbol": signal["symbol"],
+        "direction": grok["decision"],
+        "entry": signal["price_ctx"]["entry"],
+        "sl": deepseek["sl"],
+        "tp": deepseek["tp"],
+        "risk_reward": deepseek["risk_reward"],
+        "confidence": grok["confidence"],
+        "sentiment": deepseek["sentiment"],
+        "grok_advice": grok["reason"],
+        "deepseek_advice": deepseek.get("risk_advice", f"SL/TP calculés - R:R {deepseek['risk_reward']:.1f}")
+    }
+
+
+def _cache_key(signal: Dict) -> Optional[str]:
+    """Empreinte du signal, ou None si le cache est désactivé"""
+    if not Config.AI_CACHE_ENABLED:
+        return None
+    return signal_fingerprint(signal, Config.AI_CACHE_ATR_BUCKET)
+
+
+def _store_verdict(key: Optional[str], signal: Dict, grok: Dict, deepseek: Optional[Dict]) -> None:
+    """
+    Met en cache un verdict IA réel (jamais un fallback)
+
+    SL/TP sont stockés relativement à l'entry pour être réappliqués à un
+    signal voisin du même bucket.
+    """
+    if key is None or grok.get("fallback") or (deepseek and deepseek.get("fallback")):
+        return
+    verdict = {"grok": grok, "deepseek": None}
+    if deepseek is not None:
+        entry = signal["price_ctx"]["entry"]
+        verdict["deepseek"] = dict(deepseek, sl=deepseek["sl"] - entry, tp=deepseek["tp"] - entry)
+    verdict_cache.put(key, verdict)
+
+
+def _trade_from_verdict(signal: Dict, verdict: Dict) -> Optional[Dict]:
+    """Reconstruit le trade à partir d'un verdict en cache"""
+    if verdict["deepseek"] is None:
+        return None
+    entry = signal["price_ctx"]["entry"]
+    deepseek = verdict["deepseek"]
+    deepseek = dict(deepseek, sl=entry + deepseek["sl"], tp=entry + deepseek["tp"])
+    trade = _build_trade(signal, verdict["grok"], deepseek)
+    trade["ai_cache"] = "hit"
+    return trade
+
+
+# === SYNC API ===
+
+def ask_grok(signal: Dict) -> Optional[Dict]:
+    """Demande à GROK si le signal est valide"""
+    if not grok_breaker.allow_request():
+        return _grok_fallback(signal)
+    try:
+        response = requests.post(
+            GROK_URL,
+            headers=HEADERS_GROK,
+            json=_grok_request(signal),
+            timeout=10
+        )
+        response.raise_for_status()
+        result = _parse_content(response.json())
+    except:
+        grok_breaker.record_failure()
+        return _grok_fallback(signal)
+    grok_breaker.record_success()
+    return result
+
+def ask_deepseek(signal: Dict) -> Optional[Dict]:
+    """Demande à DEEPSEEK : SL/TP + sentiment"""
+    if not deepseek_breaker.allow_request():
+        return _deepseek_fallback(signal)
     try:
         response = requests.post(
             DEEPSEEK_URL,
             headers=HEADERS_DEEPSEEK,
-            json={
-                "model": "deepseek-chat",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.0
-            },
+            json=_deepseek_request(signal),
             timeout=10
         )
-        content = response.json()["choices"][0]["message"]["content"]
-        # Parse JSON response
-        return json.loads(content)
+        response.raise_for_status()
+        result = _parse_content(response.json())
     except:
-        # Fallback response si DEEPSEEK fail
-        entry = signal.get("price_ctx", {}).get("entry", 100000)
-        sl = signal.get("price_ctx", {}).get("sl", entry * 0.98)
-        tp = signal.get("price_ctx", {}).get("tp", entry * 1.02)
-        
-        return {
-            "sl": sl,
-            "tp": tp,
-            "sentiment": "bullish" if signal.get("direction") == "LONG" else "bearish",
-            "risk_reward": abs(tp - entry) / abs(entry - sl) if abs(entry - sl) > 0 else 1.5,
-            "risk_advice": "SL/TP OK – Trend confirmé. 0.04 lot (1% risque), trailing stop à +1.5%"
-        }
+        deepseek_breaker.record_failure()
+        return _deepseek_fallback(signal)
+    deepseek_breaker.record_success()
+    return result
 
 def process_with_ai(signal: Dict) -> Optional[Dict]:
     """Pipeline GROK + DEEPSEEK"""
+    key = _cache_key(signal)
+    verdict = verdict_cache.get(key) if key else None
+    if verdict is not None:
+        return _trade_from_verdict(signal, verdict)
+
     # 1. GROK valide
     grok = ask_grok(signal)
     if not grok or grok.get("decision") == "REJECT":
+        if grok:
+            _store_verdict(key, signal, grok, None)
         return None
-    
+
     # 2. DEEPSEEK calcule
     deepseek = ask_deepseek(signal)
     if not deepseek:
         return None
-    
-    return {
-        "symbol": signal["symbol"],
-        "direction": grok["decision"],
-        "entry": signal["price_ctx"]["entry"],
-        "sl": deepseek["sl"],
-        "tp": deepseek["tp"],
-        "risk_reward": deepseek["risk_reward"],
-        "confidence": grok["confidence"],
-        "sentiment": deepseek["sentiment"],
-        "grok_advice": grok["reason"],
-        "deepseek_advice": deepseek.get("risk_advice", f"SL/TP calculés - R:R {deepseek['risk_reward']:.1f}")
-    }
\ No newline at end of file
+
+    _store_verdict(key, signal, grok, deepseek)
+    return _build_trade(signal, grok, deepseek)
+
+
+# === ASYNC API (appels concurrents, connexions poolées) ===
+
+async def ask_grok_async(signal: Dict) -> Optional[Dict]:
+    """Version async de ask_grok (fallback immédiat si le circuit est ouvert)"""
+    if not grok_breaker.allow_request():
+        return _grok_fallback(signal)
+    try:
+        response = await get_ai_client().post(GROK_URL, headers=HEADERS_GROK, json=_grok_request(signal))
+        response.raise_for_status()
+        result = _parse_content(response.json())
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        grok_breaker.record_failure()
+        return _grok_fallback(signal)
+    grok_breaker.record_success()
+    return result
+
+
+async def ask_deepseek_async(signal: Dict) -> Optional[Dict]:
+    """Version async de ask_deepseek (fallback immédiat si le circuit est ouvert)"""
+    if not deepseek_breaker.allow_request():
+        return _deepseek_fallback(signal)
+    try:
+        response = await get_ai_client().post(DEEPSEEK_URL, headers=HEADERS_DEEPSEEK, json=_deepseek_request(signal))
+        response.raise_for_status()
+        result = _parse_content(response.json())
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        deepseek_breaker.record_failure()
+        return _deepseek_fallback(signal)
+    deepseek_breaker.record_success()
+    return result
+
+
+async def _ask_batch_async(
+    signals: List[Dict],
+    url: str,
+    headers: Dict,
+    build_request: Callable[[List[Dict]], Dict],
+    fallback: Callable[[Dict], Dict],
+    breaker: CircuitBreaker
+) -> List[Dict]:
+    """Un appel provider pour tout le lot ; fallback par signal manquant"""
+    if not breaker.allow_request():
+        return [fallback(signal) for signal in signals]
+    try:
+        response = await get_ai_client().post(url, headers=headers, json=build_request(signals))
+        response.raise_for_status()
+        results = _parse_batch_content(response.json(), len(signals))
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        breaker.record_failure()
+        return [fallback(signal) for signal in signals]
+    breaker.record_success()
+    return [result if result is not None else fallback(signal) for signal, result in zip(signals, results)]
+
+
+async def ask_grok_batch_async(signals: List[Dict]) -> List[Dict]:
+    """GROK sur un lot de signaux (un seul aller-retour)"""
+    if len(signals) == 1:
+        return [await ask_grok_async(signals[0])]
+    return await _ask_batch_async(
+        signals, GROK_URL, HEADERS_GROK, _grok_batch_request, _grok_fallback, grok_breaker
+    )
+
+
+async def ask_deepseek_batch_async(signals: List[Dict]) -> List[Dict]:
+    """DEEPSEEK sur un lot de signaux (un seul aller-retour)"""
+    if len(signals) == 1:
+        return [await ask_deepseek_async(signals[0])]
+    return await _ask_batch_async(
+        signals, DEEPSEEK_URL, HEADERS_DEEPSEEK, _deepseek_batch_request, _deepseek_fallback, deepseek_breaker
+    )
+
+
+# === MICRO-BATCHING (optionnel) ===
+ai_batcher = AIBatcher(
+    grok_batch=ask_grok_batch_async,
+    deepseek_batch=ask_deepseek_batch_async,
+    window=Config.AI_BATCH_WINDOW_MS / 1000.0,
+    max_size=Config.AI_BATCH_MAX_SIZE
+)
+
+
+def get_ai_batch_stats() -> Dict:
+    """Compteurs du micro-batching pour /stats"""
+    return dict(ai_batcher.stats(), enabled=Config.AI_BATCH_ENABLED)
+
+
+async def _process_batched(signal: Dict, key: Optional[str], start: float, deadline: float) -> Optional[Dict]:
+    """Validation IA via le micro-batcher (GROK + DEEPSEEK d'un lot en parallèle)"""
+    try:
+        grok, deepseek, latency = await asyncio.wait_for(ai_batcher.submit(signal), timeout=deadline)
+    except asyncio.TimeoutError:
+        # Le lot attend les deux providers ensemble : on ne sait pas lequel
+        # bloque, les deux comptent un échec (comme le chemin non batché)
+        grok_breaker.record_failure()
+        deepseek_breaker.record_failure()
+        grok, deepseek = _grok_fallback(signal), _deepseek_fallback(signal)
+        latency = {"grok": "timeout", "deepseek": "timeout"}
+
+    if not grok or grok.get("decision") == "REJECT":
+        if grok:
+            _store_verdict(key, signal, grok, None)
+        return None
+    if not deepseek:
+        return None
+
+    _store_verdict(key, signal, grok, deepseek)
+    trade = _build_trade(signal, grok, deepseek)
+    trade["latency_ms"] = dict(latency, total=round((time.perf_counter() - start) * 1000, 1))
+    return trade
+
+
+async def _timed(coro) -> Tuple[Optional[Dict], float]:
+    """Exécute un appel provider et mesure sa latence (ms)"""
+    start = time.perf_counter()
+    result = await coro
+    return result, (time.perf_counter() - start) * 1000
+
+
+async def process_with_ai_async(signal: Dict, deadline: Optional[float] = None) -> Optional[Dict]:
+    """
+    Pipeline GROK + DEEPSEEK en parallèle
+
+    Les deux appels partent ensemble ; la durée de l'étape est bornée par
+    le provider le plus lent (et par `deadline`), pas par leur somme.
+    Si GROK rejette, l'appel DEEPSEEK est annulé. Un provider qui dépasse
+    la deadline est remplacé par son fallback, comme une erreur.
+    Un signal dont l'empreinte est déjà en cache ne fait aucun appel.
+    Avec AI_BATCH_ENABLED, les signaux d'une même rafale partagent un
+    seul appel par provider.
+
+    Args:
+        signal: Signal SMC
+        deadline: Durée max de l'étape IA en secondes (défaut: Config.AI_STAGE_TIMEOUT)
+
+    Returns:
+        Trade validé (avec "latency_ms" par provider) ou None si rejeté
+    """
+    deadline = Config.AI_STAGE_TIMEOUT if deadline is None else deadline
+    start = time.perf_counter()
+
+    key = _cache_key(signal)
+    verdict = verdict_cache.get(key) if key else None
+    if verdict is not None:
+        trade = _trade_from_verdict(signal, verdict)
+        if trade:
+            trade["latency_ms"] = {"total": round((time.perf_counter() - start) * 1000, 3)}
+        return trade
+
+    if Config.AI_BATCH_ENABLED:
+        return await _process_batched(signal, key, start, deadline)
+
+    grok_task = asyncio.create_task(_timed(ask_grok_async(signal)))
+    deepseek_task = asyncio.create_task(_timed(ask_deepseek_async(signal)))
+
+    def remaining() -> float:
+        return max(0.0, deadline - (time.perf_counter() - start))
+
+    # 1. GROK valide
+    try:
+        grok, grok_ms = await asyncio.wait_for(grok_task, timeout=remaining())
+    except asyncio.TimeoutError:
+        grok_breaker.record_failure()
+        grok, grok_ms = _grok_fallback(signal), None
+
+    if not grok or grok.get("decision") == "REJECT":
+        deepseek_task.cancel()
+        if grok:
+            _store_verdict(key, signal, grok, None)
+        return None
+
+    # 2. DEEPSEEK calcule (déjà en vol)
+    try:
+        deepseek, deepseek_ms = await asyncio.wait_for(deepseek_task, timeout=remaining())
+    except asyncio.TimeoutError:
+        deepseek_breaker.record_failure()
+        deepseek, deepseek_ms = _deepseek_fallback(signal), None
+    if not deepseek:
+        return None
+
+    _store_verdict(key, signal, grok, deepseek)
+    trade = _build_trade(signal, grok, deepseek)
+    trade["latency_ms"] = {
+        "grok": round(grok_ms, 1) if grok_ms is not None else "timeout",
+        "deepseek": round(deepseek_ms, 1) if deepseek_ms is not None else "timeout",
+        "total": round((time.perf_counter() - start) * 1000, 1)
+    }
+    return trade
@@ -0,0 +1,398 @@
+"""
+Vectorized SMC detection engine - smc_relaxed_40pct.pine on OHLCV arrays
+
+Reproduces the Pine flag set, trap filters and LONG/SHORT conditions over
+whole NumPy arrays (no per-bar Python loop) so signals can be computed on
+our own data. Pine semantics are kept: SMA-seeded EMA/RMA, `na` warm-up
+bars compare as false, crossovers need both bars defined.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.smc import FLAG_NAMES
+
+# Pine thresholds per asset class (crypto / other)
+_THRESHOLDS = {
+    True: {"fvg": 0.3, "ob_volume": 1.5, "imbalance": 0.8, "swing": 5},
+    False: {"fvg": 0.2, "ob_volume": 1.2, "imbalance": 0.5, "swing": 3}
+}
+
+SL_ATR_MULT = 2.5
+TP_ATR_MULT = 4.0
+TRAP_SCORE_MAX = 4  # fake breakout + round level + stop hunt + low volatility
+
+_BIT = {name: np.uint16(1 << bit) for bit, name in enumerate(FLAG_NAMES)}
+
+
+def pine_asset_type(symbol: str) -> str:
+    """
+    Asset type as smc_relaxed_40pct's get_symbol_data() decides it
+
+    Note: the Pine script defaults to "crypto" - only XAU symbols get
+    "gold", forex pairs are treated as crypto.
+    """
+    if "BTC" in symbol or "ETH" in symbol or "USDT" in symbol:
+        return "crypto"
+    if "XAU" in symbol:
+        return "gold"
+    return "crypto"
+
+
+# === INDICATORS (Pine ta.* equivalents) ===
+
+def shift(x: np.ndarray, n: int = 1) -> np.ndarray:
+    """x[n] in Pine terms: value n bars ago, NaN-padded"""
+    out = np.empty_like(x, dtype=np.float64)
+    out[:n] = np.nan
+    out[n:] = x[:-n]
+    return out
+
+
+def linear_recurrence(x: np.ndarray, c: float) -> np.ndarray:
+    """
+    y[t] = c * y[t-1] + x[t] (y[-1] = 0) without a per-bar loop
+
+    Log-depth doubling scan: after step k every y[t] holds the terms up to
+    2^k bars back. Coefficients only shrink (c^1, c^2, c^4...), so it is
+    numerically stable; it stops once c^(2^k) no longer affects a double.
+
+    Args:
+        x: Input array
+        c: Decay factor, 0 <= c < 1
+
+    Returns:
+        Filtered array
+    """
+    y = np.array(x, dtype=np.float64)
+    factor, step = c, 1
+    while step < len(y) and factor > 1e-18:
+        y[step:] += factor * y[:-step]
+        factor *= factor
+        step *= 2
+    return y
+
+
+def _seeded_filter(x: np.ndarray, length: int, alpha: float) -> np.ndarray:
+    """Pine EMA/RMA: SMA of the first `length` valid values, then alpha smoothing"""
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) == 0 or len(x) - valid[0] < length:
+        return out
+    seed_at = valid[0] + length - 1
+    drive = alpha * x[seed_at:]
+    drive[0] = x[valid[0]:seed_at + 1].mean()
+    out[seed_at:] = linear_recurrence(drive, 1.0 - alpha)
+    return out
+
+
+def ema(x: np.ndarray, length: int) -> np.ndarray:
+    """ta.ema"""
+    return _seeded_filter(x, length, 2.0 / (length + 1))
+
+
+def rma(x: np.ndarray, length: int) -> np.ndarray:
+    """ta.rma (Wilder)"""
+    return _seeded_filter(x, length, 1.0 / length)
+
+
+def sma(x: np.ndarray, length: int) -> np.ndarray:
+    """ta.sma"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= length:
+        csum = np.cumsum(np.concatenate(([0.0], x)))
+        out[length - 1:] = (csum[length:] - csum[:-length]) / length
+    return out
+
+
+def rolling_extreme(x: np.ndarray, length: int, op=np.maximum) -> np.ndarray:
+    """
+    op-reduction of every window x[i:i + length] (len(x) - length + 1 values)
+
+    Sparse-table doubling: windows of 1, 2, 4... bars are combined with
+    contiguous array ops, then two overlapping power-of-two windows cover
+    any length - O(n log length) instead of a strided per-window reduce.
+    """
+    span = 1
+    table = np.asarray(x, dtype=np.float64)
+    while span * 2 <= length:
+        table = op(table[:-span], table[span:])
+        span *= 2
+    count = len(x) - length + 1
+    return op(table[:count], table[length - span:length - span + count])
+
+
+def highest(x: np.ndarray, length: int) -> np.ndarray:
+    """ta.highest (current bar included)"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= length:
+        out[length - 1:] = rolling_extreme(x, length, np.maximum)
+    return out
+
+
+def lowest(x: np.ndarray, length: int) -> np.ndarray:
+    """ta.lowest (current bar included)"""
+    out = np.full(len(x), np.nan)
+    if len(x) >= length:
+        out[length - 1:] = rolling_extreme(x, length, np.minimum)
+    return out
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 14) -> np.ndarray:
+    """ta.atr: RMA of the true range (high - low on the first bar)"""
+    prev_close = shift(close)
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return rma(tr, length)
+
+
+def rsi(close: np.ndarray, length: int = 14) -> np.ndarray:
+    """ta.rsi"""
+    change = close - shift(close)
+    up = rma(np.where(np.isnan(change), np.nan, np.maximum(change, 0.0)), length)
+    down = rma(np.where(np.isnan(change), np.nan, np.maximum(-change, 0.0)), length)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - 100.0 / (1.0 + up / down)
+    out[down == 0] = 100.0
+    out[(up == 0) & (down != 0)] = 0.0
+    return out
+
+
+def crossover(a: np.ndarray, b) -> np.ndarray:
+    """ta.crossover: a > b now, a <= b on the previous bar"""
+    b = np.broadcast_to(b, a.shape)
+    return (a > b) & (shift(a) <= shift(b))
+
+
+def crossunder(a: np.ndarray, b) -> np.ndarray:
+    """ta.crossunder: a < b now, a >= b on the previous bar"""
+    b = np.broadcast_to(b, a.shape)
+    return (a < b) & (shift(a) >= shift(b))
+
+
+def pivot_confirmed(x: np.ndarray, length: int, high: bool = True) -> np.ndarray:
+    """
+    not na(ta.pivothigh / ta.pivotlow(x, length, length))
+
+    True on the bar that confirms a pivot `length` bars back: the center
+    is strictly above (below) the `length` bars on each side.
+    """
+    out = np.zeros(len(x), dtype=bool)
+    span = 2 * length + 1
+    if len(x) < span:
+        return out
+    count = len(x) - span + 1
+    center = x[length:length + count]
+    side = rolling_extreme(x, length, np.maximum if high else np.minimum)
+    left, right = side[:count], side[length + 1:length + 1 + count]
+    out[span - 1:] = (center > left) & (center > right) if high else (center < left) & (center < right)
+    return out
+
+
+# === INDICATOR SET ===
+
+class IndicatorSet:
+    """
+    ta.* series of one OHLCV window, computed on demand
+
+    detect() and the strategy variants (app.variants) read their
+    indicators through series(); a subclass can memoize it so that
+    variants sharing an EMA / ATR / RSI compute it once.
+    """
+
+    def __init__(self, open_, high, low, close, volume, times: Optional[np.ndarray] = None):
+        self.open, self.high, self.low, self.close, self.volume = (
+            np.asarray(a, dtype=np.float64) for a in (open_, high, low, close, volume)
+        )
+        self.times = times
+
+    def series(self, indicator: str, *params) -> np.ndarray:
+        """
+        One indicator series (params are hashable: source name, length...)
+
+        Args:
+            indicator: "ema", "rma", "sma", "highest", "lowest" (source, length),
+                "atr", "rsi" (length) or "pivot" (source, length, high)
+        """
+        if indicator == "atr":
+            return atr(self.high, self.low, self.close, *params)
+        if indicator == "rsi":
+            return rsi(self.close, *params)
+        if indicator == "pivot":
+            source, length, high = params
+            return pivot_confirmed(getattr(self, source), length, high)
+        source, length = params
+        return _SOURCE_INDICATORS[indicator](getattr(self, source), length)
+
+    def ema(self, source: str, length: int) -> np.ndarray:
+        return self.series("ema", source, length)
+
+    def sma(self, source: str, length: int) -> np.ndarray:
+        return self.series("sma", source, length)
+
+    def highest(self, source: str, length: int) -> np.ndarray:
+        return self.series("highest", source, length)
+
+    def lowest(self, source: str, length: int) -> np.ndarray:
+        return self.series("lowest", source, length)
+
+    def atr(self, length: int = 14) -> np.ndarray:
+        return self.series("atr", length)
+
+    def rsi(self, length: int = 14) -> np.ndarray:
+        return self.series("rsi", length)
+
+    def pivot(self, source: str, length: int, high: bool) -> np.ndarray:
+        return self.series("pivot", source, length, high)
+
+
+_SOURCE_INDICATORS = {"ema": ema, "rma": rma, "sma": sma, "highest": highest, "lowest": lowest}
+
+
+# === DETECTION ===
+
+def flag_mask(flags) -> np.ndarray:
+    """{flag name: bool array} -> uint16 bitmask (bit i = FLAG_NAMES[i]), missing flags are 0"""
+    mask = None
+    for name, value in flags.items():
+        bits = np.asarray(value) * _BIT[name]
+        mask = bits if mask is None else mask | bits
+    return np.asarray(mask, dtype=np.uint16)
+
+
+@dataclass(slots=True)
+class SMCResult:
+    """Per-bar output of detect() - every array has one entry per bar"""
+    flags: np.ndarray          # uint16 bitmask (bit i = FLAG_NAMES[i])
+    confluence: np.ndarray     # % of active flags
+    trap_score: np.ndarray     # 0-4 red flags
+    long: np.ndarray           # long_condition
+    short: np.ndarray          # short_condition
+    signal: np.ndarray         # +1 LONG / -1 SHORT / 0, after the confluence threshold
+    atr: np.ndarray            # final_atr (volume-weighted for crypto)
+    sl: np.ndarray             # NaN where no signal
+    tp: np.ndarray
+
+    def signal_indices(self) -> np.ndarray:
+        """Bars that would fire a webhook"""
+        return np.flatnonzero(self.signal)
+
+
+def detect(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    times: Optional[np.ndarray] = None,
+    asset_type: str = "crypto",
+    confluence_threshold: float = 70.0,
+    trap_cutoff: int = 2,
+    indicators: Optional[IndicatorSet] = None
+) -> SMCResult:
+    """
+    Run smc_relaxed_40pct over whole OHLCV arrays
+
+    Args:
+        open_, high, low, close, volume: Bar arrays (oldest first)
+        times: Bar open times in epoch ms (UTC), needed for the non-crypto
+            time filter (23h-1h excluded); ignored for crypto
+        asset_type: "crypto", "forex" or "gold"
+        confluence_threshold: Minimum confluence (%) to fire a signal
+        trap_cutoff: Trap score from which a bar is a likely trap (Pine: 2,
+            TRAP_SCORE_MAX + 1 disables the trap filter)
+        indicators: IndicatorSet over the same arrays (e.g. a cached one
+            shared with other variants), built from the arrays if None
+
+    Returns:
+        SMCResult
+    """
+    ind = indicators if indicators is not None else IndicatorSet(open_, high, low, close, volume, times)
+    open_, high, low, close, volume = ind.open, ind.high, ind.low, ind.close, ind.volume
+    n = len(close)
+    is_crypto = asset_type == "crypto"
+    th = _THRESHOLDS[is_crypto]
+
+    volume_sma = ind.sma("volume", 20)
+    high_volume = volume > volume_sma * 0.8
+    atr_value = ind.atr(14)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_weighted_atr = atr_value * (volume / volume_sma)
+
+    # POI - RSI 35/65 crosses
+    rsi_value = ind.rsi(14)
+    poi_valid = crossover(rsi_value, 35.0) | crossunder(rsi_value, 65.0)
+
+    # FVG
+    prev_high, prev_low = shift(high), shift(low)
+    fvg_gap = np.abs(prev_high - prev_low) > atr_value * th["fvg"]
+    fvg_open = fvg_gap & ((close > prev_high) | (close < prev_low))
+
+    # Order Block + mitigation
+    ob_volume = volume > volume_sma * th["ob_volume"]
+    ema20 = ind.ema("close", 20)
+    ob_valid = ob_volume & (crossover(close, ema20) | crossunder(close, ema20))
+    ob_mitigated = ob_valid & ((close > prev_high) | (close < prev_low))
+
+    # Trap filters
+    recent_high, recent_low = ind.highest("high", 20), ind.lowest("low", 20)
+    fake_breakout = (
+        ((close > recent_high) & (close < recent_high * 1.003))
+        | ((close < recent_low) & (close > recent_low * 0.997))
+    )
+    mod_1000, mod_500 = close % 1000, close % 500
+    near_round_level = (mod_1000 < 20) | (mod_1000 > 980) | (mod_500 < 10) | (mod_500 > 490)
+    body_size = np.abs(close - open_)
+    is_stop_hunt = (
+        (high - np.maximum(open_, close) > body_size * 2.5)
+        | (np.minimum(open_, close) - low > body_size * 2.5)
+    )
+    is_low_volatility = atr_value / close < 0.008
+    trap_score = (
+        fake_breakout.astype(np.int8) + near_round_level + is_stop_hunt + is_low_volatility
+    ).astype(np.int8)
+    is_likely_trap = trap_score >= trap_cutoff
+
+    # BOS - confirmed pivots
+    bos_confirm = ind.pivot("high", th["swing"], True) | ind.pivot("low", th["swing"], False)
+
+    # CHoCH - EMA21/50 trend flip
+    ema_fast, ema_slow = ind.ema("close", 21), ind.ema("close", 50)
+    trend_direction = np.where(ema_fast > ema_slow, 1, -1)
+    choch_confirm = np.zeros(n, dtype=bool)
+    choch_confirm[1:] = trend_direction[1:] != trend_direction[:-1]
+
+    liq_swept = volume > ind.sma("volume", 10) * 2.0
+    imbalance_filled = body_size > atr_value * th["imbalance"]
+    trend_aligned = (ema_fast != ema_slow) & ~np.isnan(ema_fast) & ~np.isnan(ema_slow)
+    volume_confirm = volume > volume_sma * 0.9
+
+    if is_crypto or times is None:
+        time_filter = np.ones(n, dtype=bool)
+    else:
+        hour = (np.asarray(times, dtype=np.int64) // 3_600_000) % 24
+        time_filter = ~((hour >= 23) | (hour <= 1))
+
+    flags = flag_mask({
+        "poi_valid": poi_valid, "fvg_open": fvg_open, "ob_valid": ob_valid,
+        "bos_confirm": bos_confirm, "choch_confirm": choch_confirm, "liq_swept": liq_swept,
+        "imbalance_filled": imbalance_filled, "trend_aligned": trend_aligned,
+        "volume_confirm": volume_confirm, "time_filter": time_filter
+    })
+    confluence = np.bitwise_count(flags) / 10.0 * 100
+
+    # Signal conditions
+    strength = (poi_valid | fvg_open | ob_valid) & volume_confirm
+    ob_protection = ~ob_valid | ob_mitigated
+    tradable = ob_protection & high_volume & ~is_likely_trap
+    long = strength & (close > ema_fast) & tradable
+    short = strength & (close < ema_fast) & tradable
+
+    show = confluence >= confluence_threshold
+    signal = np.where(long & show, 1, np.where(short & show, -1, 0)).astype(np.int8)
+
+    final_atr = vol_weighted_atr if is_crypto else atr_value
+    sl = np.where(signal != 0, close - signal * final_atr * SL_ATR_MULT, np.nan)
+    tp = np.where(signal != 0, close + signal * final_atr * TP_ATR_MULT, np.nan)
+
+    return SMCResult(flags, confluence, trap_score, long, short, signal, final_atr, sl, tp)
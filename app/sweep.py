@@ -0,0 +1,301 @@
+"""
+Parallel parameter sweep over app.backtest
+
+Tunes confluence threshold, trap cutoff, SL/TP ATR multiples (ASSET_CONFIG
+sl_mult / tp_mult), max hold... across a process pool:
+- candles and detect_all() arrays live in shared memory, workers map them
+  without any pickling (a task is just a small params dict)
+- detection runs once per asset type in the parent: none of the swept
+  trade parameters change the indicators, so every worker reuses them
+- results stream back as they complete and are ranked by a summary metric
+
+Search strategies: full grid, random sampling, successive halving.
+"""
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.backtest import detect_all, simulate
+from app.smc_engine import SMCResult, pine_asset_type
+
+# detect_all() fields read by simulate()
+_SHARED_FIELDS = ("flags", "trap_score", "long", "short", "atr")
+
+_TABLE_COLUMNS = ("trades", "win_rate", "expectancy_r", "profit_factor", "max_drawdown_pct")
+
+
+class SharedArrays:
+    """
+    Named NumPy arrays packed in one shared memory block
+
+    The parent creates the block from real arrays; workers rebuild
+    zero-copy views from `spec` (block name + dtype/shape/offset per array).
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        layout, size = [], 0
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            size = -(-size // 8) * 8  # 8-byte alignment
+            layout.append((key, array.dtype.str, array.shape, size))
+            size += array.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.spec = (self.shm.name, layout)
+        self.arrays = self._views(self.shm, layout)
+        for key, array in arrays.items():
+            self.arrays[key][...] = array
+
+    @staticmethod
+    def _views(shm: shared_memory.SharedMemory, layout) -> Dict[str, np.ndarray]:
+        return {
+            key: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for key, dtype, shape, offset in layout
+        }
+
+    @classmethod
+    def attach(cls, spec) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+        """Map an existing block (worker side)"""
+        name, layout = spec
+        shm = shared_memory.SharedMemory(name=name)
+        return shm, cls._views(shm, layout)
+
+    def release(self):
+        """Drop views, close and unlink the block (parent side)"""
+        self.arrays = {}
+        self.shm.close()
+        self.shm.unlink()
+
+
+# === CANDIDATE GENERATION ===
+
+def parameter_grid(space: Dict[str, Sequence]) -> List[Dict]:
+    """
+    Cartesian product of a parameter space
+
+    Args:
+        space: {param: [values]}
+
+    Returns:
+        List of params dicts
+    """
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_candidates(space: Dict[str, Sequence], n: int, seed: int = 0) -> List[Dict]:
+    """
+    Random sampling of a parameter space
+
+    Args:
+        space: {param: [values]} picks one value, {param: (low, high)} draws uniformly
+        n: Number of candidates
+        seed: RNG seed
+
+    Returns:
+        List of params dicts
+    """
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(n):
+        params = {}
+        for key, values in space.items():
+            if isinstance(values, tuple) and len(values) == 2:
+                params[key] = round(rng.uniform(*values), 4)
+            else:
+                params[key] = rng.choice(list(values))
+        candidates.append(params)
+    return candidates
+
+
+# === WORKER ===
+
+_worker: Dict = {}
+
+
+def _init_worker(spec, context: Dict):
+    shm, arrays = SharedArrays.attach(spec)
+    _worker.update(shm=shm, arrays=arrays, context=context)
+
+
+def _evaluate(params: Dict, limit: Optional[int] = None) -> Dict:
+    arrays, context = _worker["arrays"], _worker["context"]
+    params = dict(params)
+    asset_type = params.pop("asset_type", context["asset_type"])
+    # Only the fields simulate() reads are shared
+    bars = SMCResult(
+        flags=arrays[f"{asset_type}.flags"], confluence=None,
+        trap_score=arrays[f"{asset_type}.trap_score"],
+        long=arrays[f"{asset_type}.long"], short=arrays[f"{asset_type}.short"],
+        signal=None, atr=arrays[f"{asset_type}.atr"], sl=None, tp=None
+    )
+    result = simulate(
+        bars, arrays["high"], arrays["low"], arrays["close"], arrays.get("times"),
+        symbol=context["symbol"], timeframe=context["timeframe"], limit=limit, **params
+    )
+    return result.summary()
+
+
+# === SWEEP ===
+
+class Sweep:
+    """
+    Process pool sweeping backtest parameters on one symbol/timeframe
+
+    Usage:
+        with Sweep(o, h, l, c, v, t, symbol="BTCUSDT.P") as sweep:
+            ranked = sweep.run(parameter_grid({"confluence_thresh": [0.5, 0.6, 0.7]}))
+    """
+
+    def __init__(
+        self,
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        times: Optional[np.ndarray] = None,
+        symbol: str = "BTCUSDT.P",
+        timeframe: str = "1",
+        asset_types: Optional[Sequence[str]] = None,
+        workers: Optional[int] = None,
+        metric: str = "expectancy_r",
+        min_trades: int = 30
+    ):
+        """
+        Args:
+            open_, high, low, close, volume: Bar arrays (oldest first)
+            times: Bar open times in epoch ms (UTC)
+            symbol: Symbol (ASSET_CONFIG lookup and dedup key)
+            timeframe: TradingView timeframe
+            asset_types: Asset types a candidate may select with "asset_type"
+                (detection precomputed for each), Pine's guess for symbol if None
+            workers: Pool size, os.cpu_count() if None
+            metric: summary() key ranked in descending order
+            min_trades: Candidates with fewer trades are ranked last
+        """
+        asset_types = list(asset_types or [pine_asset_type(symbol)])
+        high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+        arrays = {"high": high, "low": low, "close": close}
+        if times is not None:
+            arrays["times"] = np.asarray(times, dtype=np.int64)
+        for asset_type in asset_types:
+            bars = detect_all(open_, high, low, close, volume, times, asset_type)
+            for field in _SHARED_FIELDS:
+                arrays[f"{asset_type}.{field}"] = getattr(bars, field)
+
+        self.bars = len(close)
+        self.metric = metric
+        self.min_trades = min_trades
+        self.workers = workers or os.cpu_count() or 1
+        self._shared = SharedArrays(arrays)
+        context = {"symbol": symbol, "timeframe": timeframe, "asset_type": asset_types[0]}
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self._shared.spec, context)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the pool and free the shared memory"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._shared.release()
+
+    def _rank_key(self, row: Dict):
+        value = row.get(self.metric)
+        enough = row["trades"] >= self.min_trades
+        return (not enough, -(value if value is not None else float("-inf")))
+
+    def _evaluate_all(self, candidates, limit, on_result) -> List[Tuple[Dict, Dict]]:
+        futures = {self._pool.submit(_evaluate, params, limit): params for params in candidates}
+        results = []
+        for future in as_completed(futures):
+            params, summary = futures[future], future.result()
+            results.append((params, summary))
+            if on_result:
+                on_result({**params, **summary})
+        results.sort(key=lambda item: self._rank_key(item[1]))
+        return results
+
+    def run(
+        self,
+        candidates: Iterable[Dict],
+        limit: Optional[int] = None,
+        on_result: Optional[Callable[[Dict], None]] = None
+    ) -> List[Dict]:
+        """
+        Evaluate candidates in parallel
+
+        Args:
+            candidates: Params dicts (simulate() keyword arguments, plus "asset_type")
+            limit: Only take entries on the first `limit` bars
+            on_result: Called with each row (params + summary) as soon as it completes
+
+        Returns:
+            Rows (params + summary) ranked best first
+        """
+        return [{**params, **summary} for params, summary in self._evaluate_all(candidates, limit, on_result)]
+
+    def halving(
+        self,
+        candidates: Iterable[Dict],
+        eta: int = 3,
+        min_fraction: float = 1 / 9,
+        on_result: Optional[Callable[[Dict], None]] = None
+    ) -> List[Dict]:
+        """
+        Successive halving: all candidates on a short history, the best
+        1/eta on eta x more bars, ... until the full history
+
+        Args:
+            candidates: Params dicts
+            eta: Reduction factor per round
+            min_fraction: Share of history used in the first round
+            on_result: Called with each row of each round
+
+        Returns:
+            Rows of the last round, ranked best first
+        """
+        survivors = list(candidates)
+        fraction = min_fraction
+        while True:
+            limit = None if fraction >= 1 - 1e-9 else max(int(self.bars * fraction), 1)
+            results = self._evaluate_all(survivors, limit, on_result)
+            if limit is None or len(results) <= 1:
+                return [{**params, **summary} for params, summary in results]
+            survivors = [params for params, _ in results[:max(len(results) // eta, 1)]]
+            fraction *= eta
+
+
+def format_table(rows: List[Dict], metric: str = "expectancy_r", top: int = 10) -> str:
+    """
+    Ranked table of the best rows
+
+    Args:
+        rows: Output of Sweep.run() / Sweep.halving()
+        metric: Ranked column
+        top: Rows shown
+
+    Returns:
+        Text table
+    """
+    if not rows:
+        return ""
+    # Rows are {**params, **summary}: params come before summary()'s first key
+    params = list(itertools.takewhile(lambda key: key != "detected", rows[0]))
+    columns = list(dict.fromkeys(params + list(_TABLE_COLUMNS) + [metric]))
+    widths = [max(len(column), 8) for column in columns]
+    lines = ["#    " + "  ".join(column.rjust(w) for column, w in zip(columns, widths))]
+    for rank, row in enumerate(rows[:top], 1):
+        lines.append(f"{rank:<4} " + "  ".join(str(row.get(column)).rjust(w) for column, w in zip(columns, widths)))
+    return "\n".join(lines)
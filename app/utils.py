@@ -1,65 +1,182 @@
 """
 Utility functions for anti-duplicate detection and caching
 """
+import logging
+import re
 import time
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 
-# In-memory cache for duplicate detection
-_cache: Dict[str, float] = {}
+from app.config import Config
+from app.dedup import (
+    DedupStore,
+    MemoryDedupStore,
+    SQLiteDedupStore,
+    BloomDedupStore,
+    SemanticDedupIndex,
+    SQLiteSemanticDedupIndex
+)
 
+logger = logging.getLogger(__name__)
 
-def is_duplicate(event_id: str, ttl_seconds: int = 300) -> bool:
+
+def create_dedup_store() -> DedupStore:
+    """
+    Build the dedup backend selected by Config.DEDUP_BACKEND
+    
+    Returns:
+        "memory" (default, optional snapshot file), "sqlite" (shared by workers)
+        or "bloom" (time-sliced Bloom filter, fixed memory)
+    """
+    if Config.DEDUP_BACKEND == "sqlite":
+        return SQLiteDedupStore(Config.DEDUP_SQLITE_PATH, max_entries=Config.ANTI_SPAM_MAX_ENTRIES)
+    if Config.DEDUP_BACKEND == "bloom":
+        return BloomDedupStore(
+            Config.ANTI_SPAM_TTL,
+            capacity=Config.ANTI_SPAM_MAX_ENTRIES,
+            fp_rate=Config.DEDUP_BLOOM_FP_RATE,
+            slices=Config.DEDUP_BLOOM_SLICES
+        )
+    if Config.DEDUP_BACKEND != "memory":
+        raise ValueError(f"Unknown DEDUP_BACKEND: {Config.DEDUP_BACKEND}")
+    return MemoryDedupStore(Config.ANTI_SPAM_MAX_ENTRIES, snapshot_path=Config.DEDUP_SNAPSHOT_PATH)
+
+
+# Active dedup backend
+_store: DedupStore = create_dedup_store()
+
+
+def create_semantic_index() -> SemanticDedupIndex:
+    """
+    Build the semantic dedup layer
+
+    Returns:
+        Shared SQLite index with DEDUP_BACKEND=sqlite, else an in-process one
+        (memory / bloom: each uvicorn worker has its own)
+    """
+    params = dict(
+        min_bars=Config.SEMANTIC_DEDUP_BARS,
+        atr_mult=Config.SEMANTIC_DEDUP_ATR_MULT,
+        lookback_bars=Config.SEMANTIC_DEDUP_LOOKBACK
+    )
+    if Config.DEDUP_BACKEND == "sqlite":
+        return SQLiteSemanticDedupIndex(Config.DEDUP_SQLITE_PATH, **params)
+    return SemanticDedupIndex(**params)
+
+
+# Second layer: same setup under a different event_id
+_semantic = create_semantic_index()
+
+_TIMEFRAME_UNITS = {"": 60, "m": 60, "min": 60, "h": 3600, "d": 86400, "w": 604800}
+_TIMEFRAME_RE = re.compile(r"^(\d*)\s*([a-z]*)$")
+_BAR_TIME_RE = re.compile(r"_(\d{12,13})(?:_|$)")
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    """
+    Convert a TradingView timeframe to seconds
+    
+    Args:
+        timeframe: "5", "15", "240", "1D", "15min", "1h"...
+        
+    Returns:
+        Bar duration in seconds (60 if unknown)
+    """
+    match = _TIMEFRAME_RE.match(str(timeframe).strip().lower())
+    if not match or match.group(2) not in _TIMEFRAME_UNITS:
+        return 60
+    count = int(match.group(1) or 1)
+    return max(1, count) * _TIMEFRAME_UNITS[match.group(2)]
+
+
+def bar_time_from_event_id(event_id: Optional[str]) -> Optional[float]:
+    """
+    Extract the bar open time (seconds) from a Pine event_id
+    
+    Args:
+        event_id: e.g. "BTCUSDT.P_1730736000000_LONG"
+        
+    Returns:
+        Epoch seconds, or None if the id carries no timestamp
+    """
+    match = _BAR_TIME_RE.search(event_id or "")
+    return int(match.group(1)) / 1000.0 if match else None
+
+
+def is_duplicate(event_id: str, ttl_seconds: int = 300, max_entries: Optional[int] = None) -> bool:
     """
     Check if event_id is a duplicate within TTL window
     
     Args:
         event_id: Unique event identifier
         ttl_seconds: Time-to-live in seconds
+        max_entries: Hard cap on live entries (default: Config.ANTI_SPAM_MAX_ENTRIES);
+            the oldest entries are evicted beyond it
         
     Returns:
         True if duplicate, False if new
     """
-    current_time = time.time()
-    
-    # Clean expired entries
-    _cleanup_cache(current_time, ttl_seconds)
-    
-    # Check if event exists
-    if event_id in _cache:
-        return True
-    
-    # Add new event
-    _cache[event_id] = current_time
-    return False
+    return _store.check_and_add(event_id, ttl_seconds, max_entries)
 
 
-def _cleanup_cache(current_time: float, ttl_seconds: int) -> None:
+def is_semantic_duplicate(
+    symbol: str,
+    direction: str,
+    timeframe: str,
+    entry: Optional[float],
+    atr: Optional[float],
+    event_id: Optional[str] = None
+) -> Optional[str]:
     """
-    Remove expired entries from cache
+    Check for the same setup fired under a different event_id
     
     Args:
-        current_time: Current timestamp
-        ttl_seconds: Time-to-live in seconds
+        symbol: Trading symbol
+        direction: LONG / SHORT
+        timeframe: Chart timeframe
+        entry: Entry price
+        atr: ATR of the signal
+        event_id: Pine event_id (bar time is read from it, else now)
+        
+    Returns:
+        None if new, else the matching rule ("same_window" / "near_entry")
     """
-    expired_keys = [
-        key for key, timestamp in _cache.items()
-        if current_time - timestamp > ttl_seconds
-    ]
-    
-    for key in expired_keys:
-        del _cache[key]
+    if not Config.SEMANTIC_DEDUP_ENABLED:
+        return None
+    bar_time = bar_time_from_event_id(event_id) or time.time()
+    bar_index = int(bar_time // timeframe_seconds(timeframe))
+    return _semantic.check_and_add(symbol, direction, timeframe, bar_index, entry, atr)
+
+
+def load_dedup_state() -> None:
+    """Restore dedup state on startup (snapshot-capable backends)"""
+    _store.load()
+    if Config.SEMANTIC_DEDUP_ENABLED and not isinstance(_semantic, SQLiteSemanticDedupIndex):
+        logger.info(f"Semantic dedup is per-process (DEDUP_BACKEND={Config.DEDUP_BACKEND}): with several "
+                    f"uvicorn workers each one only sees its own signals - use DEDUP_BACKEND=sqlite to share it")
+
+
+def save_dedup_state() -> None:
+    """Persist / release dedup state on shutdown"""
+    _store.close()
+    _semantic.close()
 
 
 def clear_cache() -> None:
     """Clear all entries from cache"""
-    _cache.clear()
+    _store.clear()
+    _semantic.clear()
 
 
 def get_cache_size() -> int:
     """Get current cache size"""
-    return len(_cache)
+    return _store.size()
 
 
 def get_cache_keys() -> Set[str]:
     """Get all cache keys"""
-    return set(_cache.keys())
\ No newline at end of file
+    return _store.keys()
+
+
+def get_cache_stats() -> Dict:
+    """Get dedup backend, size and expiry/eviction counters"""
+    return dict(_store.stats(), semantic=_semantic.stats())
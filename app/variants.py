@@ -0,0 +1,489 @@
+"""
+Strategy variants in shadow mode - A/B of the Pine scripts on one candle stream
+
+The four Pine scripts of the repo (smc_relaxed_40pct, smc_high_volume,
+smc_simple, smc_test_real_price) only differ by thresholds and filters:
+they all read the same EMAs, ATR, RSI and volume SMAs. Each variant is a
+vectorized function over an IndicatorSet; IndicatorCache memoizes the
+series by (symbol, timeframe, indicator, params) so that evaluating every
+registered variant on a window costs about as much as running one.
+
+Shadow signals are never sent: ShadowEvaluator counts them per variant
+and resolves their outcome (TP / SL / expired, in R) on the following
+bars with backtest.first_touch.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.backtest import OPEN, SL_HIT, TP_HIT, first_touch
+from app.candles import Candles
+from app.config import Config
+from app.smc import FLAG_NAMES
+from app.smc_engine import (
+    SL_ATR_MULT,
+    TP_ATR_MULT,
+    IndicatorSet,
+    crossover,
+    crossunder,
+    detect,
+    flag_mask,
+    pine_asset_type,
+    shift
+)
+from app.utils import timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+_ALL_FLAGS = np.uint16((1 << len(FLAG_NAMES)) - 1)
+
+
+# === INDICATOR CACHE ===
+
+class IndicatorCache:
+    """
+    Memoized indicator series keyed by (symbol, timeframe, indicator, params)
+
+    A stream's entries are valid for one candle window (length + first /
+    last bar time); binding a different window drops them.
+    """
+
+    def __init__(self):
+        self._streams: Dict[Tuple[str, str], Tuple[Tuple, Dict]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def bind(self, symbol: str, timeframe: str, candles: Candles) -> "CachedIndicators":
+        """
+        IndicatorSet over `candles` sharing this cache
+
+        Args:
+            symbol: Trading symbol
+            timeframe: TradingView timeframe
+            candles: Candle window (oldest first)
+        """
+        key = (symbol.upper(), str(timeframe))
+        stamp = (len(candles), int(candles.time[0]), int(candles.time[-1])) if len(candles) else (0, 0, 0)
+        entry = self._streams.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = self._streams[key] = (stamp, {})
+        return CachedIndicators(self, entry[1], candles)
+
+    def clear(self):
+        self._streams.clear()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "streams": len(self._streams),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None
+        }
+
+
+class CachedIndicators(IndicatorSet):
+    """IndicatorSet whose series() goes through an IndicatorCache"""
+
+    def __init__(self, cache: IndicatorCache, entries: Dict, candles: Candles):
+        super().__init__(candles.open, candles.high, candles.low, candles.close, candles.volume, candles.time)
+        self._cache = cache
+        self._entries = entries
+
+    def series(self, indicator: str, *params) -> np.ndarray:
+        key = (indicator, params)
+        values = self._entries.get(key)
+        if values is None:
+            self._cache.misses += 1
+            values = self._entries[key] = super().series(indicator, *params)
+        else:
+            self._cache.hits += 1
+        return values
+
+
+# === VARIANTS ===
+
+@dataclass(slots=True)
+class VariantSignals:
+    """Per-bar output of a variant"""
+    signal: np.ndarray  # +1 LONG / -1 SHORT / 0
+    atr: np.ndarray     # ATR used for SL / TP
+    flags: np.ndarray   # uint16 flag mask sent in the payload
+
+
+@dataclass(slots=True)
+class Variant:
+    """A strategy: fn(indicators, asset_type, timeframe, **params) -> VariantSignals"""
+    name: str
+    fn: Callable[..., VariantSignals]
+    params: Dict = field(default_factory=dict)
+    pine: Optional[str] = None
+
+    def run(self, indicators: IndicatorSet, asset_type: str, timeframe: str) -> VariantSignals:
+        return self.fn(indicators, asset_type, timeframe, **self.params)
+
+
+def _direction(long: np.ndarray, short: np.ndarray) -> np.ndarray:
+    return np.where(long, 1, np.where(short, -1, 0)).astype(np.int8)
+
+
+def relaxed_40pct(ind: IndicatorSet, asset_type: str, timeframe: str,
+                  confluence_threshold: float = 70.0, trap_cutoff: int = 2) -> VariantSignals:
+    """smc_relaxed_40pct.pine (production script) - smc_engine.detect"""
+    result = detect(ind.open, ind.high, ind.low, ind.close, ind.volume, ind.times, asset_type,
+                    confluence_threshold, trap_cutoff, indicators=ind)
+    return VariantSignals(result.signal, result.atr, result.flags)
+
+
+def high_volume(ind: IndicatorSet, asset_type: str, timeframe: str) -> VariantSignals:
+    """smc_high_volume.pine - stricter flags, EMA200 trend, alert without confluence gate"""
+    open_, high, low, close, volume = ind.open, ind.high, ind.low, ind.close, ind.volume
+    is_crypto = asset_type == "crypto"
+
+    volume_sma = ind.sma("volume", 20)
+    high_vol = volume > volume_sma * 1.0
+    atr_value = ind.atr(14)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_weighted_atr = atr_value * (volume / volume_sma)
+
+    rsi_value = ind.rsi(14)
+    poi_valid = crossover(rsi_value, 30.0) | crossunder(rsi_value, 70.0)
+    prev_high, prev_low = shift(high), shift(low)
+    fvg_gap = np.abs(prev_high - prev_low) > atr_value * (0.5 if is_crypto else 0.3)
+    fvg_open = fvg_gap & ((close > prev_high) | (close < prev_low))
+
+    ema20 = ind.ema("close", 20)
+    ob_volume = volume > volume_sma * (2.0 if is_crypto else 1.5)
+    ob_valid = ob_volume & (crossover(close, ema20) | crossunder(close, ema20))
+
+    swing = 7 if is_crypto else 5
+    bos_confirm = (ind.pivot("high", swing, True) | ind.pivot("low", swing, False)) & high_vol
+
+    ema_fast, ema_slow, ema_200 = ind.ema("close", 21), ind.ema("close", 50), ind.ema("close", 200)
+    trend_direction = np.where(ema_fast > ema_slow, 1, -1)
+    choch_confirm = np.zeros(len(close), dtype=bool)
+    choch_confirm[1:] = trend_direction[1:] != trend_direction[:-1]
+    choch_confirm &= high_vol
+
+    liq_swept = (volume > ind.sma("volume", 10) * 2.5) & high_vol
+    imbalance_filled = np.abs(close - open_) > atr_value * (1.2 if is_crypto else 0.8)
+    trend_aligned = (
+        ((close > ema_fast) & (ema_fast > ema_slow) & (ema_slow > ema_200))
+        | ((close < ema_fast) & (ema_fast < ema_slow) & (ema_slow < ema_200))
+    )
+    volume_confirm = volume > volume_sma * 1.3
+    if is_crypto or ind.times is None:
+        time_filter = high_vol
+    else:
+        hour = (np.asarray(ind.times, dtype=np.int64) // 3_600_000) % 24
+        time_filter = ~((hour >= 22) | (hour <= 2)) & high_vol
+
+    flags = flag_mask({
+        "poi_valid": poi_valid, "fvg_open": fvg_open, "ob_valid": ob_valid, "bos_confirm": bos_confirm,
+        "choch_confirm": choch_confirm, "liq_swept": liq_swept, "imbalance_filled": imbalance_filled,
+        "trend_aligned": trend_aligned, "volume_confirm": volume_confirm, "time_filter": time_filter
+    })
+    strength = (poi_valid | fvg_open) & trend_aligned & volume_confirm & high_vol
+    signal = _direction(strength & (close > ema_fast), strength & (close < ema_fast))
+    return VariantSignals(signal, vol_weighted_atr if is_crypto else atr_value, flags)
+
+
+# smc_simple.pine always sends these six flags as true
+_SIMPLE_FLAGS = flag_mask({
+    name: np.ones(1, dtype=bool)
+    for name in ("poi_valid", "fvg_open", "ob_valid", "bos_confirm", "choch_confirm", "trend_aligned")
+})[0]
+
+
+def simple(ind: IndicatorSet, asset_type: str, timeframe: str) -> VariantSignals:
+    """smc_simple.pine - RSI 30/70 cross + FVG + EMA21 side + 1.5x volume (ta.rsi(14) read as ta.rsi(close, 14))"""
+    close, volume = ind.close, ind.volume
+    atr_value = ind.atr(14)
+    rsi_value = ind.rsi(14)
+    high_vol = volume > ind.sma("volume", 20) * 1.5
+    poi_valid = crossover(rsi_value, 30.0) | crossunder(rsi_value, 70.0)
+    fvg_open = np.abs(shift(ind.high) - shift(ind.low)) > atr_value * 0.5
+    ema21 = ind.ema("close", 21)
+    base = poi_valid & fvg_open & high_vol
+    signal = _direction(base & (close > ema21), base & (close < ema21))
+    return VariantSignals(signal, atr_value, np.full(len(close), _SIMPLE_FLAGS, dtype=np.uint16))
+
+
+def test_real_price(ind: IndicatorSet, asset_type: str, timeframe: str) -> VariantSignals:
+    """
+    smc_test_real_price.pine - forced LONG every 5 bars (baseline)
+
+    bar_index is unknown on a window: the bar number since epoch is used.
+    """
+    n = len(ind.close)
+    if ind.times is None:
+        bar_number = np.arange(n)
+    else:
+        bar_number = np.asarray(ind.times, dtype=np.int64) // (timeframe_seconds(timeframe) * 1000)
+    signal = np.where(bar_number % 5 == 0, 1, 0).astype(np.int8)
+    return VariantSignals(signal, ind.atr(14), np.full(n, _ALL_FLAGS, dtype=np.uint16))
+
+
+class VariantRegistry:
+    """Named strategy variants, evaluated in registration order"""
+
+    def __init__(self):
+        self._variants: Dict[str, Variant] = {}
+
+    def register(self, name: str, fn: Callable[..., VariantSignals], pine: Optional[str] = None, **params) -> Variant:
+        """
+        Add (or replace) a variant
+
+        Args:
+            name: Unique name
+            fn: fn(indicators, asset_type, timeframe, **params) -> VariantSignals
+            pine: Pine script it mirrors
+            **params: Fixed parameters (e.g. confluence_threshold=60)
+        """
+        variant = self._variants[name] = Variant(name, fn, params, pine)
+        return variant
+
+    def unregister(self, name: str):
+        self._variants.pop(name, None)
+
+    def names(self) -> List[str]:
+        return list(self._variants)
+
+    def __iter__(self):
+        return iter(self._variants.values())
+
+    def __len__(self) -> int:
+        return len(self._variants)
+
+
+def default_registry() -> VariantRegistry:
+    """The four Pine scripts of the repo"""
+    registry = VariantRegistry()
+    registry.register("relaxed_40pct", relaxed_40pct, "smc_relaxed_40pct.pine",
+                      confluence_threshold=Config.CONFLUENCE_THRESH * 100)
+    registry.register("high_volume", high_volume, "smc_high_volume.pine")
+    registry.register("simple", simple, "smc_simple.pine")
+    registry.register("test_real_price", test_real_price, "smc_test_real_price.pine")
+    return registry
+
+
+# === SHADOW EVALUATION ===
+
+@dataclass(slots=True)
+class VariantStats:
+    """Shadow counters of one variant"""
+    signals: int = 0
+    longs: int = 0
+    shorts: int = 0
+    tp_hits: int = 0
+    sl_hits: int = 0
+    expired: int = 0
+    total_r: float = 0.0
+
+    def summary(self, pending: int = 0) -> Dict:
+        closed = self.tp_hits + self.sl_hits + self.expired
+        return {
+            "signals": self.signals,
+            "longs": self.longs,
+            "shorts": self.shorts,
+            "tp_hits": self.tp_hits,
+            "sl_hits": self.sl_hits,
+            "expired": self.expired,
+            "pending": pending,
+            "win_rate": round(self.tp_hits / closed, 4) if closed else None,
+            "expectancy_r": round(self.total_r / closed, 4) if closed else None
+        }
+
+
+class _Window:
+    """Rolling candle window of one live stream (amortized O(1) append)"""
+    __slots__ = ("data", "size", "capacity")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = {name: np.empty(2 * capacity, dtype=np.int64 if name == "time" else np.float64)
+                     for name in ("time", "open", "high", "low", "close", "volume")}
+        self.size = 0
+
+    def append(self, time_ms: int, o: float, h: float, l: float, c: float, v: float):
+        if self.size == 2 * self.capacity:
+            for column in self.data.values():
+                column[:self.capacity] = column[self.capacity:]
+            self.size = self.capacity
+        for name, value in zip(("time", "open", "high", "low", "close", "volume"), (time_ms, o, h, l, c, v)):
+            self.data[name][self.size] = value
+        self.size += 1
+
+    def candles(self) -> Candles:
+        start = max(0, self.size - self.capacity)
+        return Candles(**{name: column[start:self.size] for name, column in self.data.items()})
+
+
+class ShadowEvaluator:
+    """
+    Runs every registered variant on the same candles, without sending anything
+
+    Offline: evaluate() on stored ranges (A/B over history).
+    Live: update() / on_batch() with closed bars, each stream keeps a
+    rolling window of Config.SHADOW_WINDOW_BARS candles.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[VariantRegistry] = None,
+        cache: Optional[IndicatorCache] = None,
+        window: Optional[int] = None,
+        max_hold: Optional[int] = None
+    ):
+        """
+        Args:
+            registry: Variants (default_registry() if None)
+            cache: Indicator cache shared by the variants
+            window: Live window per stream (Config.SHADOW_WINDOW_BARS)
+            max_hold: Bars before an unresolved trade expires (Config.SHADOW_MAX_HOLD_BARS)
+        """
+        self.registry = registry if registry is not None else default_registry()
+        self.cache = cache if cache is not None else IndicatorCache()
+        self.window = window or Config.SHADOW_WINDOW_BARS
+        self.max_hold = max_hold or Config.SHADOW_MAX_HOLD_BARS
+        self._windows: Dict[Tuple[str, str], _Window] = {}
+        self._last_time: Dict[Tuple[str, str], int] = {}
+        # (variant, symbol, timeframe) -> [(entry time, direction, entry, sl, tp), ...]
+        self._pending: Dict[Tuple[str, str, str], List[Tuple[int, int, float, float, float]]] = {}
+        self._stats: Dict[str, VariantStats] = {}
+        self.evaluations = 0
+
+    def evaluate(self, symbol: str, timeframe: str, candles: Candles,
+                 asset_type: Optional[str] = None) -> Dict[str, VariantSignals]:
+        """
+        Run every variant on a candle window and record the new signals
+
+        Bars already seen for this stream (by time) are not counted twice,
+        so overlapping windows can be passed bar after bar.
+
+        Args:
+            symbol: Trading symbol
+            timeframe: TradingView timeframe
+            candles: Window (oldest first)
+            asset_type: Pine asset type (pine_asset_type(symbol) if None)
+
+        Returns:
+            {variant name: VariantSignals over the window}
+        """
+        if not len(candles):
+            return {}
+        stream = (symbol.upper(), str(timeframe))
+        asset_type = asset_type or pine_asset_type(symbol)
+        indicators = self.cache.bind(symbol, timeframe, candles)
+        last_seen = self._last_time.get(stream, -1)
+        first_new = int(np.searchsorted(candles.time, last_seen, side="right"))
+
+        outputs = {}
+        for variant in self.registry:
+            out = outputs[variant.name] = variant.run(indicators, asset_type, timeframe)
+            self._record(variant.name, stream, candles, out, first_new)
+        self._last_time[stream] = int(candles.time[-1])
+        self.evaluations += 1
+        return outputs
+
+    def _record(self, name: str, stream: Tuple[str, str], candles: Candles, out: VariantSignals, first_new: int):
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = VariantStats()
+        fired = first_new + np.flatnonzero(out.signal[first_new:])
+        direction = out.signal[fired].astype(np.int64)
+        stats.signals += len(fired)
+        stats.longs += int((direction > 0).sum())
+        stats.shorts += int((direction < 0).sum())
+
+        close = candles.close
+        entry = close[fired]
+        risk = out.atr[fired] * SL_ATR_MULT
+        trades = self._pending.pop((name,) + stream, [])
+        trades.extend(zip(candles.time[fired].tolist(), direction.tolist(), entry.tolist(),
+                          (entry - direction * risk).tolist(),
+                          (entry + direction * out.atr[fired] * TP_ATR_MULT).tolist()))
+        trades = [trade for trade in trades if np.isfinite(trade[3]) and trade[2] != trade[3]]
+        if not trades:
+            return
+
+        times, sides, entries, sls, tps = (np.array(column) for column in zip(*trades))
+        index = np.searchsorted(candles.time, times)
+        in_window = (index < len(candles)) & (candles.time[np.minimum(index, len(candles) - 1)] == times)
+        exit_index, outcome = first_touch(candles.high, candles.low, np.where(in_window, index, 0),
+                                          sides, sls, tps, self.max_hold)
+        expired = ~in_window | ((outcome == OPEN) & (exit_index - index >= self.max_hold))
+        outcome = np.where(in_window, outcome, OPEN)
+        exit_price = np.where(in_window, close[exit_index], close[-1])
+        risk = np.abs(entries - sls)
+        r = np.where(outcome == TP_HIT, np.abs(tps - entries) / risk,
+                     np.where(outcome == SL_HIT, -1.0, (exit_price - entries) * sides / risk))
+
+        done = outcome != OPEN
+        stats.tp_hits += int((outcome == TP_HIT).sum())
+        stats.sl_hits += int((outcome == SL_HIT).sum())
+        stats.expired += int((expired & ~done).sum())
+        stats.total_r += float(r[done | expired].sum())
+        keep = ~(done | expired)
+        if keep.any():
+            self._pending[(name,) + stream] = [trades[i] for i in np.flatnonzero(keep)]
+
+    def update(self, symbol: str, timeframe: str, o: float, h: float, l: float, c: float, v: float, time_ms: int):
+        """Feed one closed bar of a live stream and evaluate its window"""
+        stream = (symbol.upper(), str(timeframe))
+        window = self._windows.get(stream)
+        if window is None:
+            window = self._windows[stream] = _Window(self.window)
+        window.append(time_ms, o, h, l, c, v)
+        self.evaluate(symbol, timeframe, window.candles())
+
+    def on_batch(self, symbols: Sequence[str], batch):
+        """
+        Feed an aggregator BarBatch
+
+        Args:
+            symbols: BarAggregator.symbols (batch.symbol holds positions)
+            batch: app.aggregator.BarBatch
+        """
+        for i, t, o, h, l, c, v in zip(batch.symbol.tolist(), batch.time.tolist(), batch.open.tolist(),
+                                       batch.high.tolist(), batch.low.tolist(), batch.close.tolist(),
+                                       batch.volume.tolist()):
+            self.update(symbols[i], batch.timeframe, o, h, l, c, v, t)
+
+    def warm_from_store(self, store, symbols: Sequence[str], timeframes: Sequence[str]) -> int:
+        """
+        Fill the live windows from a CandleStore (history is not counted)
+
+        Returns:
+            Number of streams loaded
+        """
+        loaded = 0
+        for symbol in symbols:
+            for timeframe in timeframes:
+                candles = store.tail(symbol, timeframe, self.window)
+                if not len(candles):
+                    continue
+                stream = (symbol.upper(), str(timeframe))
+                window = self._windows[stream] = _Window(self.window)
+                for bar in zip(candles.time.tolist(), candles.open.tolist(), candles.high.tolist(),
+                               candles.low.tolist(), candles.close.tolist(), candles.volume.tolist()):
+                    window.append(*bar)
+                self._last_time[stream] = int(candles.time[-1])
+                loaded += 1
+        return loaded
+
+    def stats(self) -> Dict:
+        pending: Dict[str, int] = {}
+        for (name, *_), trades in self._pending.items():
+            pending[name] = pending.get(name, 0) + len(trades)
+        return {
+            "evaluations": self.evaluations,
+            "streams": len(self._last_time),
+            "indicator_cache": self.cache.stats(),
+            "variants": {
+                name: self._stats.get(name, VariantStats()).summary(pending.get(name, 0))
+                for name in self.registry.names()
+            }
+        }
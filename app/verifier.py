@@ -0,0 +1,262 @@
+"""
+Server-side payload verification - cheap checks before AI / Telegram
+
+Structure (payload alone, the checks of test_real_data.py / monitor_realtime.py):
+- SL < entry < TP (LONG) / TP < entry < SL (SHORT)
+- SL / TP at SL_ATR_MULT / TP_ATR_MULT x ATR (Pine 2.5 / 4.0) - report-only
+  unless VERIFY_LEVELS_STRICT (other multiples / AI-adjusted levels are legit)
+- Pine event_id (SYMBOL_bartime_DIRECTION) matches symbol and direction
+- bar time not older than VERIFY_MAX_AGE_BARS bars (nor in the future)
+
+Market (needs candles for the symbol/timeframe):
+- entry within VERIFY_PRICE_ATR_MULT x ATR of the last known close
+- payload ATR within a VERIFY_ATR_RATIO band of the server-side ATR(14);
+  for crypto / forex the Pine ATR is volume-weighted (atr * volume / SMA20),
+  so the payload ATR is first divided by the volume ratio of its bar
+
+Market state is one incremental ATR + volume SMA + last close per
+(symbol, timeframe), fed with closed bars (aggregator / scanner) or warmed
+from the CandleStore. Without fresh candles the market checks are skipped
+(fail open), as is the ATR check when the signal bar is not known yet.
+"""
+import logging
+import time
+from collections import deque
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.config import Config
+from app.decoder import Signal
+from app.indicators import ATR, SMA
+from app.smc_engine import SL_ATR_MULT, TP_ATR_MULT, pine_asset_type
+from app.utils import bar_time_from_event_id, timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class _Series:
+    """Last close, ATR(14) and recent volume ratios of one symbol/timeframe"""
+    __slots__ = ("atr", "volume_sma", "value", "close", "time", "ratios")
+
+    def __init__(self):
+        self.atr = ATR(14)
+        self.volume_sma = SMA(20)
+        self.value = float("nan")
+        self.close = float("nan")
+        self.time = 0
+        self.ratios = deque(maxlen=8)  # (bar open time ms, volume / SMA20) of the last bars
+
+
+class MarketState:
+    """
+    Incremental market reference per (symbol, timeframe)
+
+    O(1) per closed bar and per lookup.
+    """
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, int], _Series] = {}
+        self.bars = 0
+
+    @staticmethod
+    def _key(symbol: str, timeframe: str) -> Tuple[str, int]:
+        return symbol.upper(), timeframe_seconds(timeframe)
+
+    def update(
+        self,
+        symbol: str,
+        timeframe: str,
+        high: float,
+        low: float,
+        close: float,
+        time_ms: int,
+        volume: Optional[float] = None
+    ):
+        """
+        Feed one closed bar (oldest first)
+
+        Args:
+            symbol: Trading symbol
+            timeframe: TradingView timeframe
+            high, low, close: Bar values
+            time_ms: Bar open time (epoch ms)
+            volume: Bar volume (None: volume-weighted ATR of this bar unknown)
+        """
+        key = self._key(symbol, timeframe)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        if time_ms <= series.time:
+            return
+        series.value = series.atr.update(high, low, close)
+        if volume is not None:
+            volume_sma = series.volume_sma.update(volume)
+            if volume_sma > 0:
+                series.ratios.append((time_ms, volume / volume_sma))
+        series.close = close
+        series.time = time_ms
+        self.bars += 1
+
+    def update_batch(self, symbols: Sequence[str], batch):
+        """
+        Feed an aggregator BarBatch
+
+        Args:
+            symbols: BarAggregator.symbols (batch.symbol holds positions)
+            batch: app.aggregator.BarBatch
+        """
+        for i, h, l, c, v, t in zip(batch.symbol.tolist(), batch.high.tolist(), batch.low.tolist(),
+                                    batch.close.tolist(), batch.volume.tolist(), batch.time.tolist()):
+            self.update(symbols[i], batch.timeframe, h, l, c, t, v)
+
+    def warm_from_store(self, store, symbols: Sequence[str], timeframes: Sequence[str], bars: int = 200) -> int:
+        """
+        Replay the last candles of a CandleStore
+
+        Args:
+            store: app.candles.CandleStore
+            symbols: Symbols to load
+            timeframes: Timeframes to load
+            bars: Candles per series (ATR(14) / volume SMA20 converge after a few dozen)
+
+        Returns:
+            Number of series loaded
+        """
+        loaded = 0
+        for symbol in symbols:
+            for timeframe in timeframes:
+                candles = store.tail(symbol, timeframe, bars)
+                if not len(candles):
+                    continue
+                for h, l, c, v, t in zip(candles.high.tolist(), candles.low.tolist(), candles.close.tolist(),
+                                         candles.volume.tolist(), candles.time.tolist()):
+                    self.update(symbol, timeframe, h, l, c, t, v)
+                loaded += 1
+        return loaded
+
+    def reference(self, symbol: str, timeframe: str) -> Optional[Tuple[float, float, int]]:
+        """
+        (last close, ATR, last bar open time ms) or None if unknown / ATR warming up
+        """
+        series = self._series.get(self._key(symbol, timeframe))
+        if series is None or not series.value > 0:
+            return None
+        return series.close, series.value, series.time
+
+    def volume_ratio(self, symbol: str, timeframe: str, time_ms: int) -> Optional[float]:
+        """volume / SMA20(volume) of one recent bar, None if not seen"""
+        series = self._series.get(self._key(symbol, timeframe))
+        if series is None:
+            return None
+        for bar_time, ratio in reversed(series.ratios):
+            if bar_time == time_ms:
+                return ratio
+        return None
+
+    def stats(self) -> Dict:
+        return {"series": len(self._series), "bars": self.bars}
+
+
+# Shared by /tv, /tv/batch and the scanner
+market_state = MarketState()
+
+_stats = {"checked": 0, "rejected": 0, "market_checked": 0}
+_rejections: Dict[str, int] = {}
+_warnings: Dict[str, int] = {}  # failed report-only checks
+
+
+def _check_levels(signal: Signal) -> Optional[str]:
+    """SL / TP at the Pine ATR multiples"""
+    entry, sl, tp, atr = signal.entry, signal.sl, signal.tp, signal.atr
+    if sl is None or tp is None or not atr or atr <= 0:
+        return None
+    tolerance = Config.VERIFY_LEVEL_TOLERANCE
+    if (abs(abs(entry - sl) / (atr * SL_ATR_MULT) - 1) > tolerance
+            or abs(abs(tp - entry) / (atr * TP_ATR_MULT) - 1) > tolerance):
+        return "atr_levels_mismatch"
+    return None
+
+
+def _check_structure(signal: Signal, tf_seconds: int, now: float) -> Optional[str]:
+    entry, sl, tp = signal.entry, signal.sl, signal.tp
+    side = 1 if signal.direction == "LONG" else -1
+    if sl is not None and tp is not None and not (side * sl < side * entry < side * tp):
+        return "invalid_levels"
+    if Config.VERIFY_LEVELS_STRICT:
+        failed = _check_levels(signal)
+        if failed:
+            return failed
+
+    bar_time = bar_time_from_event_id(signal.event_id)
+    if bar_time is not None:
+        # Pine ids: SYMBOL_bartime_DIRECTION (other ids only carry a timestamp)
+        head, _, tail = signal.event_id.rpartition("_")
+        if tail in ("LONG", "SHORT"):
+            id_symbol = head.rpartition("_")[0].rpartition(":")[2]
+            if tail != signal.direction or id_symbol.upper() != signal.symbol.upper():
+                return "event_id_mismatch"
+        if Config.VERIFY_MAX_AGE_BARS > 0:
+            age = now - bar_time
+            if age > (Config.VERIFY_MAX_AGE_BARS + 1) * tf_seconds:
+                return "stale_signal"
+            if age < -tf_seconds:
+                return "future_signal"
+    return None
+
+
+def _check_market(signal: Signal, tf_seconds: int, now: float) -> Optional[str]:
+    reference = market_state.reference(signal.symbol, signal.timeframe)
+    if reference is None:
+        return None
+    close, atr, bar_time = reference
+    # Candles too old to say anything about the current price
+    if now - bar_time / 1000 > (Config.VERIFY_MAX_AGE_BARS + 2) * tf_seconds:
+        return None
+    _stats["market_checked"] += 1
+    if abs(signal.entry - close) > Config.VERIFY_PRICE_ATR_MULT * atr:
+        return "entry_off_market"
+    if signal.atr is None:
+        return None
+    payload_atr = signal.atr
+    if pine_asset_type(signal.symbol) == "crypto":
+        # Pine sends atr * volume / SMA20(volume) of the signal bar
+        signal_bar = bar_time_from_event_id(signal.event_id)
+        ratio = (market_state.volume_ratio(signal.symbol, signal.timeframe, round(signal_bar * 1000))
+                 if signal_bar is not None else None)
+        if not ratio:
+            return None
+        payload_atr /= ratio
+    if not (atr / Config.VERIFY_ATR_RATIO <= payload_atr <= atr * Config.VERIFY_ATR_RATIO):
+        return "atr_off_market"
+    return None
+
+
+def verify_signal(signal: Signal, now: Optional[float] = None) -> Optional[str]:
+    """
+    Run structure then market checks
+
+    Args:
+        signal: Decoded signal
+        now: Current epoch seconds (time.time() if None)
+
+    Returns:
+        None if the signal looks genuine, else the failed check
+    """
+    if not Config.VERIFY_ENABLED:
+        return None
+    now = time.time() if now is None else now
+    tf_seconds = timeframe_seconds(signal.timeframe)
+    _stats["checked"] += 1
+    failed = _check_structure(signal, tf_seconds, now) or _check_market(signal, tf_seconds, now)
+    if not Config.VERIFY_LEVELS_STRICT:
+        warning = _check_levels(signal)
+        if warning:
+            _warnings[warning] = _warnings.get(warning, 0) + 1
+    if failed:
+        _stats["rejected"] += 1
+        _rejections[failed] = _rejections.get(failed, 0) + 1
+    return failed
+
+
+def get_verifier_stats() -> Dict:
+    """Checked / rejected counters per check, report-only failures and market state size"""
+    return dict(_stats, rejections=dict(_rejections), warnings=dict(_warnings), market=market_state.stats())
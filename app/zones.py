@@ -0,0 +1,483 @@
+"""
+Interval index of active order-block and fair-value-gap zones
+
+Pine only knows ob_valid / fvg_open / ob_mitigated on the current bar.
+Here every zone is remembered until mitigated:
+- created on a bar with fvg_open or ob_valid: the previous bar range
+  [low[1], high[1]], bullish if the bar closed above it (FVG) / crossed
+  above EMA20 (OB), bearish otherwise
+- FVG mitigated once filled: a later low <= zone low (bullish), high >=
+  zone high (bearish)
+- OB mitigated once broken: a later close < zone low (bullish), close >
+  zone high (bearish)
+
+Each (timeframe, kind, direction) bucket keeps its zones sorted by low with two
+segment trees over the highs (max and min, dead leaves at -inf / +inf):
+- "zones containing or touching price": no zone is wider than the widest
+  of its bucket, so candidates are the lows in [p - tol - width, p + tol],
+  found by binary search and filtered in one vectorized pass; if an
+  outlier width makes that slice large, the max tree is descended
+  instead (high >= p - tol on the prefix low <= p + tol): O(log n + k)
+- every mitigation rule is a one-sided threshold (suffix of lows, or
+  prefix of lows with min high <= x): O(log n + k) per bar
+New zones wait in a small unsorted buffer merged by a rebuild once it
+holds more than sqrt(n) zones (amortized O(log n) insert).
+"""
+import logging
+import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import Config
+from app.smc import FLAG_NAMES
+from app.smc_engine import detect, ema, pine_asset_type
+
+logger = logging.getLogger(__name__)
+
+KIND_OB = "ob"
+KIND_FVG = "fvg"
+
+_FVG_BIT = 1 << FLAG_NAMES.index("fvg_open")
+_OB_BIT = 1 << FLAG_NAMES.index("ob_valid")
+_INF = float("inf")
+_ALIVE = -1e308  # max tree: any live leaf is above it
+# Stabbing: candidate slices up to _SLICE_LOOP are scanned in Python, up to
+# _SLICE_MAX in one vectorized pass, larger ones go down the max tree
+_SLICE_LOOP = 48
+_SLICE_MAX = 4096
+
+
+@dataclass(slots=True)
+class Zone:
+    """One order block / fair value gap"""
+    id: int
+    kind: str            # KIND_OB / KIND_FVG
+    direction: int       # +1 bullish (demand) / -1 bearish (supply)
+    low: float
+    high: float
+    timeframe: str
+    created: int         # bar open time (epoch ms)
+    mitigated: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "direction": "bullish" if self.direction > 0 else "bearish",
+            "low": self.low,
+            "high": self.high,
+            "timeframe": self.timeframe,
+            "created": self.created
+        }
+
+
+class _Bucket:
+    """
+    Live zones of one (timeframe, kind, direction)
+
+    Built part: zones sorted by low + max/min high segment trees (dead
+    leaves at -inf / +inf). New zones go to a small buffer, also sorted
+    by low, merged by a rebuild once it outgrows sqrt(n).
+    """
+    __slots__ = ("zones", "lows", "highs", "created", "alive", "keys", "width", "size",
+                 "max_high", "min_high", "buffer", "buffer_keys", "buffer_width", "dead")
+
+    def __init__(self):
+        empty = np.empty(0)
+        self.build(np.empty(0, dtype=object), empty, empty, np.empty(0, dtype=np.int64))
+
+    def build(self, zones: np.ndarray, lows: np.ndarray, highs: np.ndarray, created: np.ndarray):
+        """Sort by low and rebuild both trees - array passes only"""
+        order = np.argsort(lows, kind="stable")
+        self.lows, self.highs, self.created = lows[order], highs[order], created[order]
+        self.zones: List[Zone] = zones[order].tolist()
+        self.keys: List[float] = self.lows.tolist()  # bisect on a list beats np.searchsorted for one value
+        self.alive = np.ones(len(order), dtype=bool)
+        self.width = float((self.highs - self.lows).max()) if len(order) else 0.0
+        size = 1
+        while size < len(order):
+            size *= 2
+        self.size = size
+        leaves = np.full(size, -_INF)
+        leaves[:len(order)] = self.highs
+        self.max_high = self._tree(leaves, np.maximum, -_INF)
+        leaves[len(order):] = _INF
+        self.min_high = self._tree(leaves, np.minimum, _INF)
+        self.buffer: List[Zone] = []
+        self.buffer_keys: List[float] = []
+        self.buffer_width = 0.0
+        self.dead = 0
+
+    @staticmethod
+    def _tree(leaves: np.ndarray, op, fill: float) -> List[float]:
+        """Implicit segment tree (root 1, leaves size..2*size-1) built level by level"""
+        size = len(leaves)
+        tree = np.full(2 * size, fill)
+        tree[size:] = leaves
+        level = size
+        while level > 1:
+            tree[level // 2:level] = op(tree[level:2 * level:2], tree[level + 1:2 * level:2])
+            level //= 2
+        return tree.tolist()
+
+    def __len__(self) -> int:
+        return len(self.zones) - self.dead + len(self.buffer)
+
+    def insert(self, zone: Zone, min_created: int = 0):
+        """Buffer a new zone, rebuilding first if the buffer is full"""
+        if len(self.buffer) >= max(32, math.isqrt(len(self.zones))):
+            self.rebuild(min_created)
+        position = bisect_right(self.buffer_keys, zone.low)
+        self.buffer_keys.insert(position, zone.low)
+        self.buffer.insert(position, zone)
+        self.buffer_width = max(self.buffer_width, zone.high - zone.low)
+
+    def rebuild(self, min_created: int = 0):
+        """Merge the buffer, drop dead zones and zones created before min_created"""
+        keep = self.alive & (self.created >= min_created)
+        buffer = [zone for zone in self.buffer if zone.created >= min_created]
+        added = np.empty(len(buffer), dtype=object)
+        added[:] = buffer
+        self.build(
+            np.concatenate((np.array(self.zones, dtype=object)[keep], added)),
+            np.concatenate((self.lows[keep], [zone.low for zone in buffer])),
+            np.concatenate((self.highs[keep], [zone.high for zone in buffer])),
+            np.concatenate((self.created[keep], np.array([zone.created for zone in buffer], dtype=np.int64)))
+        )
+
+    def _kill(self, position: int):
+        node = position + self.size
+        max_high, min_high = self.max_high, self.min_high
+        max_high[node], min_high[node] = -_INF, _INF
+        self.alive[position] = False
+        node //= 2
+        while node:
+            left = 2 * node
+            max_high[node] = max(max_high[left], max_high[left + 1])
+            min_high[node] = min(min_high[left], min_high[left + 1])
+            node //= 2
+        self.dead += 1
+
+    def _canonical(self, start: int, stop: int) -> List[int]:
+        """O(log n) tree nodes exactly covering [start, stop)"""
+        nodes = []
+        start, stop = start + self.size, stop + self.size
+        while start < stop:
+            if start & 1:
+                nodes.append(start)
+                start += 1
+            if stop & 1:
+                stop -= 1
+                nodes.append(stop)
+            start //= 2
+            stop //= 2
+        return nodes
+
+    def _find_max(self, start: int, stop: int, threshold: float) -> List[int]:
+        """Positions in [start, stop) with high >= threshold"""
+        tree, size, found = self.max_high, self.size, []
+        stack = [node for node in self._canonical(start, stop) if tree[node] >= threshold]
+        while stack:
+            node = stack.pop()
+            if node >= size:
+                found.append(node - size)
+                continue
+            node *= 2
+            if tree[node] >= threshold:
+                stack.append(node)
+            if tree[node + 1] >= threshold:
+                stack.append(node + 1)
+        return found
+
+    def _find_min(self, start: int, stop: int, threshold: float) -> List[int]:
+        """Positions in [start, stop) with high <= threshold"""
+        tree, size, found = self.min_high, self.size, []
+        stack = [node for node in self._canonical(start, stop) if tree[node] <= threshold]
+        while stack:
+            node = stack.pop()
+            if node >= size:
+                found.append(node - size)
+                continue
+            node *= 2
+            if tree[node] <= threshold:
+                stack.append(node)
+            if tree[node + 1] <= threshold:
+                stack.append(node + 1)
+        return found
+
+    def touching(self, low: float, high: float) -> List[Zone]:
+        """Live zones intersecting [low, high]"""
+        zones = self.zones
+        stop = bisect_right(self.keys, high)
+        # No zone is wider than self.width: candidates have low >= low - width
+        start = bisect_left(self.keys, low - self.width)
+        count = stop - start
+        if count <= _SLICE_LOOP:
+            tree, base = self.max_high, self.size  # dead leaves are -inf
+            found = [zones[i] for i in range(start, stop) if tree[base + i] >= low]
+        elif count <= _SLICE_MAX:
+            positions = np.flatnonzero(self.alive[start:stop] & (self.highs[start:stop] >= low))
+            found = [zones[i] for i in (positions + start).tolist()]
+        else:
+            found = [zones[i] for i in self._find_max(0, stop, low)]
+        if self.buffer:
+            buffer = self.buffer
+            stop = bisect_right(self.buffer_keys, high)
+            start = bisect_left(self.buffer_keys, low - self.buffer_width)
+            found.extend(buffer[i] for i in range(start, stop) if buffer[i].high >= low)
+        return found
+
+    def _remove(self, positions: List[int], time_ms: int) -> List[Zone]:
+        removed = []
+        for position in positions:
+            zone = self.zones[position]
+            zone.mitigated = time_ms
+            self._kill(position)
+            removed.append(zone)
+        return removed
+
+    def _remove_buffered(self, positions: List[int], time_ms: int) -> List[Zone]:
+        removed = []
+        for position in reversed(positions):
+            zone = self.buffer.pop(position)
+            del self.buffer_keys[position]
+            zone.mitigated = time_ms
+            removed.append(zone)
+        return removed
+
+    def remove_low_at_least(self, threshold: float, time_ms: int) -> List[Zone]:
+        """Mitigate live zones with low >= threshold"""
+        removed = self._remove(self._find_max(bisect_left(self.keys, threshold), len(self.zones), _ALIVE), time_ms)
+        if self.buffer:
+            start = bisect_left(self.buffer_keys, threshold)
+            removed += self._remove_buffered(list(range(start, len(self.buffer))), time_ms)
+        return removed
+
+    def remove_high_at_most(self, threshold: float, time_ms: int) -> List[Zone]:
+        """Mitigate live zones with high <= threshold (their low is <= threshold too)"""
+        removed = self._remove(self._find_min(0, bisect_right(self.keys, threshold), threshold), time_ms)
+        if self.buffer:
+            stop = bisect_right(self.buffer_keys, threshold)
+            buffer = self.buffer
+            removed += self._remove_buffered([i for i in range(stop) if buffer[i].high <= threshold], time_ms)
+        return removed
+
+
+class _SymbolZones:
+    """
+    Buckets of one symbol per (timeframe, kind, direction)
+
+    A bar only mitigates the zones of its own timeframe: a 240m bar range
+    also covers prices from before the 1m zones created inside it.
+    """
+    __slots__ = ("buckets", "previous")
+
+    def __init__(self):
+        self.buckets: Dict[Tuple[str, str, int], _Bucket] = {}
+        self.previous: Dict[str, Tuple[float, float]] = {}  # last (high, low) per timeframe
+
+    def bucket(self, timeframe: str, kind: str, direction: int) -> _Bucket:
+        key = (timeframe, kind, direction)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = _Bucket()
+        return bucket
+
+
+class ZoneIndex:
+    """
+    Per-symbol index of unmitigated OB / FVG zones (all timeframes)
+
+    Fed bar by bar (scanner shards send the flags they compute) or warmed
+    from candles; queried by price from the pipeline.
+    """
+
+    def __init__(self, max_age_days: Optional[float] = None):
+        """
+        Args:
+            max_age_days: Zones older than this are dropped at rebuild, 0 keeps them
+                (Config.ZONE_MAX_AGE_DAYS)
+        """
+        self.max_age_ms = int((Config.ZONE_MAX_AGE_DAYS if max_age_days is None else max_age_days) * 86_400_000)
+        self._symbols: Dict[str, _SymbolZones] = {}
+        self._next_id = 0
+        self.created = 0
+        self.mitigated = 0
+        self.queries = 0
+
+    def _state(self, symbol: str) -> _SymbolZones:
+        state = self._symbols.get(symbol.upper())
+        if state is None:
+            state = self._symbols[symbol.upper()] = _SymbolZones()
+        return state
+
+    def add(self, symbol: str, kind: str, direction: int, low: float, high: float,
+            timeframe: str, created: int) -> Zone:
+        """Insert a zone (amortized O(log n))"""
+        self._next_id += 1
+        zone = Zone(self._next_id, kind, direction, min(low, high), max(low, high), str(timeframe), created)
+        bucket = self._state(symbol).bucket(zone.timeframe, kind, direction)
+        bucket.insert(zone, created - self.max_age_ms if self.max_age_ms > 0 else 0)
+        self.created += 1
+        return zone
+
+    def mitigate(self, symbol: str, timeframe: str, time_ms: int, high: float, low: float,
+                 close: float) -> List[Zone]:
+        """
+        Apply one closed bar to the live zones of its symbol/timeframe
+
+        Returns:
+            Zones mitigated by this bar
+        """
+        state = self._symbols.get(symbol.upper())
+        if state is None:
+            return []
+        timeframe = str(timeframe)
+        mitigated = state.bucket(timeframe, KIND_FVG, 1).remove_low_at_least(low, time_ms)
+        mitigated += state.bucket(timeframe, KIND_FVG, -1).remove_high_at_most(high, time_ms)
+        mitigated += state.bucket(timeframe, KIND_OB, 1).remove_low_at_least(math.nextafter(close, _INF), time_ms)
+        mitigated += state.bucket(timeframe, KIND_OB, -1).remove_high_at_most(math.nextafter(close, -_INF), time_ms)
+        self.mitigated += len(mitigated)
+        return mitigated
+
+    def on_bar(
+        self,
+        symbol: str,
+        timeframe: str,
+        time_ms: int,
+        high: float,
+        low: float,
+        close: float,
+        flags: int,
+        ob_direction: int
+    ) -> List[Zone]:
+        """
+        Feed one closed bar: mitigation first, then the zones it creates
+
+        Args:
+            symbol: Trading symbol
+            timeframe: Bar timeframe
+            time_ms: Bar open time (epoch ms)
+            high, low, close: Bar values
+            flags: SMC flags mask of the bar (fvg_open / ob_valid bits)
+            ob_direction: +1 if close is above EMA20 (bullish cross), -1 otherwise
+
+        Returns:
+            Zones mitigated by this bar
+        """
+        timeframe = str(timeframe)
+        mitigated = self.mitigate(symbol, timeframe, time_ms, high, low, close)
+        state = self._state(symbol)
+        previous = state.previous.get(timeframe)
+        state.previous[timeframe] = (high, low)
+        if previous is not None and flags & (_FVG_BIT | _OB_BIT):
+            prev_high, prev_low = previous
+            if flags & _FVG_BIT:
+                self.add(symbol, KIND_FVG, 1 if close > prev_high else -1, prev_low, prev_high, timeframe, time_ms)
+            if flags & _OB_BIT:
+                self.add(symbol, KIND_OB, ob_direction, prev_low, prev_high, timeframe, time_ms)
+        return mitigated
+
+    def query(
+        self,
+        symbol: str,
+        price: float,
+        tolerance: float = 0.0,
+        kind: Optional[str] = None,
+        direction: Optional[int] = None
+    ) -> List[Zone]:
+        """
+        Live zones containing or touching a price
+
+        Args:
+            symbol: Trading symbol
+            price: Price to test
+            tolerance: Zones within this distance count as touching
+            kind: KIND_OB / KIND_FVG filter
+            direction: +1 / -1 filter
+
+        Returns:
+            Matching zones, oldest first
+        """
+        state = self._symbols.get(symbol.upper())
+        if state is None:
+            return []
+        self.queries += 1
+        zones = []
+        for (_, bucket_kind, bucket_direction), bucket in state.buckets.items():
+            if (kind is None or kind == bucket_kind) and (direction is None or direction == bucket_direction):
+                zones.extend(bucket.touching(price - tolerance, price + tolerance))
+        zones.sort(key=lambda zone: zone.created)
+        return zones
+
+    def context(self, symbol: str, direction: str, entry: float, atr: Optional[float]) -> Dict:
+        """
+        POI context of a signal: zones at the entry on its side / against it
+
+        Args:
+            symbol: Trading symbol
+            direction: "LONG" / "SHORT"
+            entry: Entry price
+            atr: Signal ATR (touch tolerance = Config.ZONE_TOUCH_ATR x ATR)
+        """
+        side = 1 if direction == "LONG" else -1
+        zones = self.query(symbol, entry, Config.ZONE_TOUCH_ATR * (atr or 0.0))
+        return {
+            "supporting": sum(1 for zone in zones if zone.direction == side),
+            "opposing": sum(1 for zone in zones if zone.direction != side),
+            "zones": [zone.to_dict() for zone in zones[-5:]]
+        }
+
+    def warm(self, symbol: str, timeframe: str, candles, asset_type: Optional[str] = None) -> int:
+        """
+        Replay a candle range through the Pine flags (detect) and on_bar
+
+        Args:
+            symbol: Trading symbol
+            timeframe: TradingView timeframe
+            candles: app.candles.Candles, oldest first
+            asset_type: Pine asset type (pine_asset_type(symbol) if None)
+
+        Returns:
+            Zones still live for this symbol
+        """
+        if not len(candles):
+            return self.active(symbol)
+        o, h, l, c, v, t = candles.ohlcv()
+        flags = detect(o, h, l, c, v, t, asset_type or pine_asset_type(symbol), 0.0).flags
+        ob_direction = np.where(c > ema(np.asarray(c, dtype=np.float64), 20), 1, -1)
+        for bar in zip(t.tolist(), h.tolist(), l.tolist(), c.tolist(), flags.tolist(), ob_direction.tolist()):
+            time_ms, high, low, close, mask, side = bar
+            self.on_bar(symbol, timeframe, time_ms, high, low, close, mask, side)
+        return self.active(symbol)
+
+    def warm_from_store(self, store, symbols: Sequence[str], timeframes: Sequence[str], bars: int = 5000) -> int:
+        """
+        Warm every symbol/timeframe from the last candles of a CandleStore
+
+        Returns:
+            Live zones after warm-up
+        """
+        for symbol in symbols:
+            for timeframe in timeframes:
+                self.warm(symbol, timeframe, store.tail(symbol, timeframe, bars))
+        return sum(self.active(symbol) for symbol in self._symbols)
+
+    def active(self, symbol: str) -> int:
+        state = self._symbols.get(symbol.upper())
+        return sum(len(bucket) for bucket in state.buckets.values()) if state else 0
+
+    def stats(self) -> Dict:
+        return {
+            "symbols": len(self._symbols),
+            "active": sum(self.active(symbol) for symbol in self._symbols),
+            "created": self.created,
+            "mitigated": self.mitigated,
+            "queries": self.queries
+        }
+
+
+# Shared by the scanner feed and the pipeline
+zone_index = ZoneIndex()
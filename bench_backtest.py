@@ -0,0 +1,39 @@
+"""
+Benchmark - Backtest vectorisé (détection → confluence → dedup → SL/TP)
+
+Rejoue plusieurs années de bougies 1 minute synthétiques dans
+app.backtest.run_backtest et affiche le temps total et le résumé.
+
+Usage: python bench_backtest.py [ANNEES]
+"""
+import sys
+import time
+
+from app.backtest import run_backtest
+from bench_smc_engine import synthetic_ohlcv
+
+YEARS = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+BARS = int(YEARS * 365 * 24 * 60)
+
+
+def main():
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Backtest {YEARS:g} ans en 1m ({BARS:,} barres)")
+    print("=" * 60)
+
+    data = synthetic_ohlcv(BARS)
+    run_backtest(*(a[:5000] for a in data))  # échauffement
+
+    for thresh in (0.4, 0.7):
+        start = time.perf_counter()
+        result = run_backtest(*data, symbol="BTCUSDT.P", timeframe="1", confluence_thresh=thresh)
+        elapsed = time.perf_counter() - start
+        summary = result.summary()
+        print(f"\n   Seuil confluence {thresh:.0%} : {elapsed:.2f}s → {BARS / elapsed / 1e6:.2f} M barres/s")
+        for key, value in summary.items():
+            print(f"   {key:<20} {value}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark - Stockage de bougies memory-mapped (colonnes binaires)
+
+Écrit plusieurs années de bougies 1m par blocs mensuels, puis mesure
+l'ouverture, le découpage par plage de dates et la lecture complète,
+comparés au parsing d'un CSV équivalent.
+
+Usage: python bench_candles.py [ANNEES]
+"""
+import io
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.candles import CandleStore
+from bench_smc_engine import synthetic_ohlcv
+
+YEARS = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+BARS = int(YEARS * 365 * 24 * 60)
+MONTH = 30 * 24 * 60
+
+
+def main():
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - CandleStore ({YEARS:g} ans en 1m = {BARS:,} bougies)")
+    print("=" * 60)
+
+    open_, high, low, close, volume, times = synthetic_ohlcv(BARS)
+    root = tempfile.mkdtemp(prefix="candles_")
+    try:
+        store = CandleStore(root)
+        start = time.perf_counter()
+        for i in range(0, BARS, MONTH):
+            j = i + MONTH + 60  # chevauchement de 1h entre blocs, dédupliqué
+            store.append("BTCUSDT.P", "1", times[i:j], open_[i:j], high[i:j], low[i:j], close[i:j], volume[i:j])
+        elapsed = time.perf_counter() - start
+        print(f"   Append (blocs mensuels)  : {elapsed:6.2f}s → {BARS / elapsed / 1e6:.1f} M bougies/s")
+        assert store.rows("BTCUSDT.P", "1") == BARS
+
+        reader = CandleStore(root)
+        start = time.perf_counter()
+        candles = reader.read("BTCUSDT.P", "1")
+        print(f"   Ouverture (mmap)         : {(time.perf_counter() - start) * 1e6:8.0f} µs")
+
+        week = 7 * 24 * 60 * 60_000
+        starts = np.random.default_rng(1).integers(times[0], times[-1] - week, 1000)
+        start = time.perf_counter()
+        for t in starts:
+            reader.read("BTCUSDT.P", "1", int(t), int(t) + week)
+        print(f"   Plage d'une semaine      : {(time.perf_counter() - start) / len(starts) * 1e6:8.1f} µs (zéro copie)")
+
+        start = time.perf_counter()
+        total = float(candles.close.sum() + candles.volume.sum())
+        print(f"   Scan complet close+volume: {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+        # CSV équivalent sur 1 mois, extrapolé
+        buffer = io.StringIO()
+        np.savetxt(buffer, np.column_stack((times[:MONTH], open_[:MONTH], high[:MONTH], low[:MONTH],
+                                            close[:MONTH], volume[:MONTH])), delimiter=",", fmt="%.8f")
+        start = time.perf_counter()
+        np.loadtxt(io.StringIO(buffer.getvalue()), delimiter=",")
+        csv_full = (time.perf_counter() - start) * BARS / MONTH
+        print(f"   Parsing CSV (extrapolé)  : {csv_full:8.2f} s pour {YEARS:g} ans")
+        assert total > 0
+    finally:
+        shutil.rmtree(root)
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark - Coût de décodage d'un payload webhook (µs par payload)
+
+Compare l'ancien chemin de /tv (json.loads + ~20 data.get + replace + sum)
+au décodeur SignalDecoder, et à la validation pydantic TVPayload.
+
+Usage: python bench_decoder.py
+"""
+import json
+import time
+
+from app.decoder import SignalDecoder, DecodeError
+from app.models import TVPayload
+
+ROUNDS = 50_000
+
+FLAT = json.dumps({
+    "event_id": "BTCUSDT.P_1730736000000_LONG",
+    "symbol": "BINANCE:BTCUSDT.P",
+    "timeframe": "15",
+    "direction": "LONG",
+    "entry": 67012.5,
+    "sl": 66387.25,
+    "tp": 68012.5,
+    "atr": 250.1,
+    "asset_type": "crypto",
+    "poi_valid": True,
+    "fvg_open": True,
+    "ob_valid": False,
+    "bos_confirm": True,
+    "choch_confirm": False,
+    "liq_swept": True,
+    "imbalance_filled": True,
+    "trend_aligned": True,
+    "volume_confirm": True,
+    "time_filter": True
+}).encode()
+
+NESTED = json.dumps({
+    "event_id": "EURUSD_1730736000000_SHORT",
+    "symbol": "EURUSD",
+    "timeframe": "60",
+    "direction": "SHORT",
+    "price_ctx": {"entry": 1.0812, "ref_high": 1.0840, "ref_low": 1.0790},
+    "atr": 0.0012,
+    "flags": {
+        "poi_valid": True, "fvg_open": True, "ob_valid": True, "bos_confirm": False,
+        "choch_confirm": True, "liq_swept": False, "imbalance_filled": True,
+        "trend_aligned": True, "volume_confirm": True, "time_filter": True
+    }
+}).encode()
+
+
+# === ANCIEN CHEMIN (/tv avant le décodeur) ===
+def legacy_decode(body: bytes):
+    data = json.loads(body)
+    event_id = data.get("event_id")
+    raw_symbol = data.get("symbol")
+    symbol = raw_symbol.replace("BYBIT:", "").replace("BINANCE:", "")
+    timeframe = data.get("timeframe", "Unknown")
+    direction = data.get("direction")
+    entry = data.get("entry")
+    sl = data.get("sl")
+    tp = data.get("tp")
+    atr = data.get("atr")
+    poi_valid = data.get("poi_valid", False)
+    fvg_open = data.get("fvg_open", False)
+    ob_valid = data.get("ob_valid", False)
+    bos_confirm = data.get("bos_confirm", False)
+    choch_confirm = data.get("choch_confirm", False)
+    liq_swept = data.get("liq_swept", False)
+    imbalance_filled = data.get("imbalance_filled", False)
+    trend_aligned = data.get("trend_aligned", False)
+    volume_confirm = data.get("volume_confirm", False)
+    time_filter = data.get("time_filter", False)
+    flag_count = sum([poi_valid, fvg_open, ob_valid, bos_confirm, choch_confirm,
+                      liq_swept, imbalance_filled, trend_aligned, volume_confirm, time_filter])
+    return event_id, symbol, timeframe, direction, entry, sl, tp, atr, flag_count
+
+
+def per_payload_us(decode, body: bytes) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        decode(body)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def main():
+    decoder = SignalDecoder()
+
+    print("=" * 60)
+    print("⏱️  BENCHMARK - décodage payload /tv (µs par payload)")
+    print("=" * 60)
+
+    legacy = per_payload_us(legacy_decode, FLAT)
+    flat = per_payload_us(decoder.decode_bytes, FLAT)
+    nested = per_payload_us(decoder.decode_bytes, NESTED)
+    pydantic_nested = per_payload_us(TVPayload.model_validate_json, NESTED)
+
+    print(f"   Ancien chemin (plat, sans validation) : {legacy:6.2f} µs")
+    print(f"   SignalDecoder (plat, validé)          : {flat:6.2f} µs")
+    print(f"   SignalDecoder (imbriqué, validé)      : {nested:6.2f} µs")
+    print(f"   pydantic TVPayload (imbriqué)         : {pydantic_nested:6.2f} µs")
+
+    # Payloads invalides : l'ancien chemin plante, le décodeur renvoie un code
+    print("\n   Payloads invalides:")
+    for label, body in (
+        ("symbol manquant", b'{"event_id": "X", "direction": "LONG", "entry": 1.0}'),
+        ("entry texte", b'{"event_id": "X", "symbol": "EURUSD", "direction": "LONG", "entry": "1.0"}'),
+        ("JSON tronqué", FLAT[:40])
+    ):
+        try:
+            legacy_decode(body)
+            old = "accepté"
+        except Exception as e:
+            old = type(e).__name__
+        try:
+            decoder.decode_bytes(body)
+            new = "accepté"
+        except DecodeError as e:
+            new = e.code
+        print(f"   {label:<16} ancien: {old:<20} décodeur: {new}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark - Coût par appel de is_duplicate selon le nombre d'event_id vivants
+
+Compare l'ancien nettoyage (scan complet du dict à chaque appel) avec le
+cache ordonné actuel (on ne touche que les entrées expirées), et mesure
+le backend SQLite partagé entre workers et le filtre de Bloom.
+
+Usage: python bench_dedup.py
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from multiprocessing import Pool
+
+from app.dedup import MemoryDedupStore, SQLiteDedupStore, BloomDedupStore
+
+CALLS = 2000
+TTL = 3600
+
+
+# === ANCIENNE IMPLÉMENTATION (scan O(n)) ===
+_legacy_cache = {}
+
+
+def legacy_is_duplicate(event_id: str, ttl_seconds: int = 300) -> bool:
+    current_time = time.time()
+    expired_keys = [
+        key for key, timestamp in _legacy_cache.items()
+        if current_time - timestamp > ttl_seconds
+    ]
+    for key in expired_keys:
+        del _legacy_cache[key]
+    if event_id in _legacy_cache:
+        return True
+    _legacy_cache[event_id] = current_time
+    return False
+
+
+def event_id(i: int) -> str:
+    return f"BTCUSDT.P_{1730736000000 + i * 60000}_LONG"
+
+
+def per_call_us(check, live: int, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(live, live + calls):
+        check(event_id(i), TTL)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    print("=" * 60)
+    print("⏱️  BENCHMARK - is_duplicate (µs par appel)")
+    print("=" * 60)
+    print(f"   {'IDs vivants':>12} | {'ancien (scan)':>14} | {'actuel':>8}")
+
+    for live in (1_000, 10_000, 100_000, 250_000, 500_000):
+        store = MemoryDedupStore(max_entries=live * 2)
+        for i in range(live):
+            store.check_and_add(event_id(i), TTL)
+        current = per_call_us(store.check_and_add, live, CALLS)
+
+        if live <= 100_000:
+            _legacy_cache.clear()
+            now = time.time()
+            for i in range(live):
+                _legacy_cache[event_id(i)] = now
+            legacy = f"{per_call_us(legacy_is_duplicate, live, max(20, CALLS * 1000 // live)):>11.1f} µs"
+        else:
+            legacy = f"{'(trop lent)':>14}"
+
+        print(f"   {live:>12,} | {legacy} | {current:>5.2f} µs")
+
+    # Expiration : les entrées expirées sont retirées par la gauche uniquement
+    store = MemoryDedupStore()
+    past = time.time() - TTL - 1
+    for i in range(100_000):
+        store._cache[event_id(i)] = past
+    start = time.perf_counter()
+    store.check_and_add("NEW_EVENT", TTL)
+    print(f"\n   Purge de 100,000 entrées expirées en un appel: "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms (amorti sur leurs insertions)")
+    print(f"   Stats: {store.stats()}")
+
+    # Backend SQLite (WAL) partagé entre workers
+    path = os.path.join(tempfile.mkdtemp(), "dedup.db")
+    sqlite_store = SQLiteDedupStore(path)
+    for i in range(100_000):
+        sqlite_store.check_and_add(event_id(i), TTL)
+    print(f"\n   SQLite, 100,000 IDs vivants: {per_call_us(sqlite_store.check_and_add, 100_000, CALLS):.1f} µs par appel")
+
+    # 4 workers envoient les mêmes 2000 IDs : chacun doit être accepté une seule fois
+    with Pool(4) as pool:
+        accepted = sum(pool.starmap(race_worker, [(path, w) for w in range(4)]))
+    print(f"   4 workers x 2000 IDs identiques → {accepted} acceptés (attendu: 2000)")
+
+    # Filtre de Bloom : mémoire fixe, taux de faux positifs mesuré
+    live = 200_000
+    tracemalloc.start()
+    store = MemoryDedupStore(max_entries=live)
+    for i in range(live):
+        store.check_and_add(event_id(i), TTL)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+
+    bloom = BloomDedupStore(TTL, capacity=live, fp_rate=1e-4)
+    for i in range(live):
+        bloom.check_and_add(event_id(i), TTL)
+    probes = 100_000
+    start = time.perf_counter()
+    false_positives = sum(bloom.might_contain(f"NEW_{i}") for i in range(probes))
+    bloom_us = (time.perf_counter() - start) / probes * 1e6
+    stats = bloom.stats()
+    print(f"\n   Bloom, {live:,} IDs vivants: {bloom_us:.1f} µs par appel")
+    print(f"   Mémoire: dict {dict_bytes / 1e6:.1f} MB → Bloom {stats['memory_bytes'] / 1e6:.1f} MB")
+    print(f"   Faux positifs: {false_positives}/{probes:,} mesurés "
+          f"(estimé {stats['estimated_fp_rate']:.1e}, cible {stats['target_fp_rate']:.0e})")
+    print("=" * 60)
+
+
+def race_worker(path: str, worker: int) -> int:
+    store = SQLiteDedupStore(path)
+    ids = [f"RACE_{i}" for i in range(2000)]
+    if worker % 2:
+        ids.reverse()
+    return sum(1 for e in ids if not store.check_and_add(e, TTL))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark - Import de klines en masse (CSV Binance → CandleStore)
+
+Génère des dumps CSV au format data.binance.vision pour plusieurs symboles,
+les importe en parallèle par blocs, puis ré-exécute l'import (reprise via
+checkpoint : rien à réécrire). Affiche lignes/s et la mémoire max.
+
+Usage: python bench_importer.py [LIGNES_PAR_SYMBOLE] [SYMBOLES] [WORKERS]
+"""
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.candles import CandleStore
+from app.importer import discover, import_many
+from bench_smc_engine import synthetic_ohlcv
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+SYMBOLS = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+WORKERS = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count() or 1
+MONTH = 30 * 24 * 60
+
+
+def write_dumps(directory: str, symbol: str, seed: int):
+    open_, high, low, close, volume, times = synthetic_ohlcv(ROWS, seed=seed)
+    extra = np.zeros(ROWS)
+    table = np.column_stack((times, open_, high, low, close, volume, times + 59_999, extra, extra, extra, extra, extra))
+    for month, i in enumerate(range(0, ROWS, MONTH)):
+        # 1h de chevauchement entre fichiers mensuels
+        np.savetxt(os.path.join(directory, f"{symbol}-1m-{month:04d}.csv"), table[max(i - 60, 0):i + MONTH],
+                   delimiter=",", fmt=["%d", "%.2f", "%.2f", "%.2f", "%.2f", "%.4f", "%d", "%d", "%d", "%d", "%d", "%d"])
+
+
+def main():
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Import klines {SYMBOLS} symboles x {ROWS:,} lignes ({WORKERS} workers)")
+    print("=" * 60)
+
+    work = tempfile.mkdtemp(prefix="klines_")
+    dumps, root = os.path.join(work, "dumps"), os.path.join(work, "candles")
+    os.makedirs(dumps)
+    try:
+        for k in range(SYMBOLS):
+            write_dumps(dumps, f"SYM{k}USDT", seed=k)
+        size = sum(os.path.getsize(os.path.join(dumps, name)) for name in os.listdir(dumps))
+        jobs = discover(dumps)
+
+        start = time.perf_counter()
+        results = import_many(jobs, root=root, workers=WORKERS)
+        elapsed = time.perf_counter() - start
+        read = sum(stats.rows_read for stats in results)
+        written = sum(stats.rows_written for stats in results)
+        print(f"   Import     : {elapsed:6.2f}s → {read / elapsed:,.0f} lignes/s ({size / elapsed / 1e6:.0f} Mo/s)")
+        print(f"   Lignes     : {read:,} lues, {written:,} écrites ({read - written:,} doublons retirés)")
+
+        start = time.perf_counter()
+        again = import_many(jobs, root=root, workers=WORKERS)
+        print(f"   Reprise    : {time.perf_counter() - start:6.2f}s, "
+              f"{sum(stats.rows_read for stats in again):,} lignes relues (checkpoint)")
+
+        store = CandleStore(root)
+        assert all(store.rows(symbol, tf) == ROWS for symbol, tf in jobs)
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        print(f"   Mémoire max worker: {peak:.0f} Mo (blocs de 64 Mo, indépendant de la taille des fichiers)")
+    finally:
+        shutil.rmtree(work)
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
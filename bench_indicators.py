@@ -0,0 +1,75 @@
+"""
+Benchmark - Indicateurs incrémentaux vs recalcul complet à chaque bougie
+
+Pour chaque nouvelle bougie, l'ancien schéma recalcule tout l'historique
+(fenêtre glissante de WINDOW barres) ; StreamingSMC met son état à jour
+en O(1). Mesure aussi le coût d'un snapshot/restore.
+
+Usage: python bench_indicators.py [N_STREAMS]
+"""
+import json
+import sys
+import time
+
+import numpy as np
+
+from app.indicators import StreamingSMC
+from app.smc_engine import detect
+
+N_STREAMS = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+BARS = 2_000
+WINDOW = 500
+
+
+def synthetic_stream(seed: int, n: int):
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.0015, n)))
+    open_ = np.concatenate(([30000.0], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0007, n))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.lognormal(3.0, 0.7, n)
+    times = 1_700_000_000_000 + np.arange(n, dtype=np.int64) * 60_000
+    return [a.tolist() for a in (open_, high, low, close, volume, times)]
+
+
+def main():
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - {N_STREAMS} flux x {BARS} bougies")
+    print("=" * 60)
+
+    data = [synthetic_stream(seed, BARS) for seed in range(N_STREAMS)]
+    streams = [StreamingSMC() for _ in range(N_STREAMS)]
+
+    # Incrémental : chaque bougie de chaque flux, comme en live
+    start = time.perf_counter()
+    for i in range(BARS):
+        for stream, (o, h, l, c, v, t) in zip(streams, data):
+            stream.update(o[i], h[i], l[i], c[i], v[i], t[i])
+    incremental = (time.perf_counter() - start) / (BARS * N_STREAMS) * 1e6
+
+    # Recalcul complet sur les WINDOW dernières bougies, à chaque bougie
+    o, h, l, c, v, t = (np.asarray(a) for a in data[0])
+    samples = 200
+    start = time.perf_counter()
+    for i in range(BARS - samples, BARS):
+        detect(o[i - WINDOW:i + 1], h[i - WINDOW:i + 1], l[i - WINDOW:i + 1],
+               c[i - WINDOW:i + 1], v[i - WINDOW:i + 1], t[i - WINDOW:i + 1])
+    recompute = (time.perf_counter() - start) / samples * 1e6
+
+    start = time.perf_counter()
+    for stream in streams:
+        StreamingSMC.restore(json.loads(json.dumps(stream.snapshot())))
+    snapshot_us = (time.perf_counter() - start) / N_STREAMS * 1e6
+
+    print(f"   {f'Recalcul complet ({WINDOW} barres)':<30} : {recompute:8.1f} µs par bougie")
+    print(f"   {'StreamingSMC (incrémental)':<30} : {incremental:8.1f} µs par bougie")
+    print(f"   🚀 Speedup: x{recompute / incremental:.0f}")
+    print(f"   Capacité 1 cœur: {1e6 / incremental:,.0f} bougies/s "
+          f"(≈ {1e6 / incremental * 60:,.0f} flux en 1m)")
+    print(f"   Snapshot + restore JSON: {snapshot_us:.0f} µs par flux")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
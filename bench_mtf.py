@@ -0,0 +1,65 @@
+"""
+Benchmark - État multi-timeframe (ring buffers par symbole/TF)
+
+Mesure le coût d'une mise à jour (une bougie fermée, flux scanner) et
+d'un enrichissement (alignement des TF supérieures pour un signal),
+comparé au recalcul de la tendance EMA21/50 depuis les bougies à chaque
+requête.
+
+Usage: python bench_mtf.py [SIGNALS]
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.decoder import Signal
+from app.mtf import MTFState
+from app.smc import SUPPORTED_SYMBOLS
+from app.smc_engine import ema
+
+SIGNALS = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+TIMEFRAMES = ("1", "5", "15", "60", "240")
+
+
+def main():
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - État MTF, {len(SUPPORTED_SYMBOLS)} symboles x {len(TIMEFRAMES)} TF, {SIGNALS:,} signaux")
+    print("=" * 60)
+    rng = np.random.default_rng(3)
+    symbols = list(SUPPORTED_SYMBOLS)
+    state = MTFState(",".join(TIMEFRAMES))
+    now_ms = int(time.time() * 1000) // 14_400_000 * 14_400_000
+
+    updates = [(symbols[i % len(symbols)], TIMEFRAMES[i // len(symbols) % len(TIMEFRAMES)], now_ms,
+                int(rng.integers(0, 1024)), int(rng.choice((-1, 1))), 1.0) for i in range(SIGNALS)]
+    start = time.perf_counter()
+    for update in updates:
+        state.update(*update)
+    update_us = (time.perf_counter() - start) / SIGNALS * 1e6
+
+    signals = [Signal(f"{symbols[i % len(symbols)]}_{now_ms}_LONG", symbols[i % len(symbols)], "5",
+                      "LONG" if i % 2 else "SHORT", 100.0, 99.0, 102.0, 0.4, 1023) for i in range(SIGNALS)]
+    start = time.perf_counter()
+    aligned = sum(state.enrich(signal).aligned for signal in signals)
+    enrich_us = (time.perf_counter() - start) / SIGNALS * 1e6
+
+    # Référence : tendance de chaque TF supérieure recalculée depuis 200 bougies
+    closes = {tf: 100 * np.exp(np.cumsum(rng.normal(0, 0.002, 200))) for tf in TIMEFRAMES}
+    count = min(SIGNALS, 5_000)
+    start = time.perf_counter()
+    for _ in range(count):
+        for tf in TIMEFRAMES[2:]:
+            close = closes[tf]
+            _ = ema(close, 21)[-1] > ema(close, 50)[-1]
+    recompute_us = (time.perf_counter() - start) / count * 1e6
+
+    print(f"   Mise à jour (1 bougie)         : {update_us:6.2f} µs")
+    print(f"   Enrichissement (1 signal)      : {enrich_us:6.2f} µs  ({aligned:,} TF alignées au total)")
+    print(f"   Recalcul EMA depuis bougies    : {recompute_us:6.1f} µs par signal")
+    print(f"   🚀 Speedup: x{recompute_us / enrich_us:.0f}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
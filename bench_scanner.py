@@ -0,0 +1,101 @@
+"""
+Benchmark - Scanner multi-symboles (12 symboles x 5 timeframes)
+
+Simule les clôtures de bougies (1m toutes les minutes, 5/15/60/240m aux
+frontières) pour tous les SUPPORTED_SYMBOLS, envoie chaque rafale aux
+shards et attend la réponse : latence clôture → signal prêt (p50/p99)
+et débit maximal. Le pipeline est remplacé par un compteur.
+
+Usage: python bench_scanner.py [MINUTES] [SHARDS]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.scanner import Scanner, shard_of
+from app.smc import SUPPORTED_SYMBOLS
+
+MINUTES = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+SHARDS = int(sys.argv[2]) if len(sys.argv) > 2 else max(1, min(4, os.cpu_count() or 1))
+TIMEFRAMES = ("1", "5", "15", "60", "240")
+
+
+def synthetic_bars(symbols, minutes: int, seed: int = 5):
+    """Bougies 1m par symbole, agrégées en 5/15/60/240m comme le ferait BarAggregator"""
+    rng = np.random.default_rng(seed)
+    start = 1_700_000_000_000 // 14_400_000 * 14_400_000
+    series = {}
+    for k, symbol in enumerate(symbols):
+        close = (10 + k * 100) * np.exp(np.cumsum(rng.normal(0, 0.0015, minutes)))
+        open_ = np.concatenate(([close[0]], close[:-1]))
+        spread = np.abs(rng.normal(0, 0.0007, minutes))
+        series[symbol] = (open_, np.maximum(open_, close) * (1 + spread),
+                          np.minimum(open_, close) * (1 - spread), close, rng.lognormal(3, 0.7, minutes))
+    bursts = []
+    for m in range(minutes):
+        bars = []
+        for tf in TIMEFRAMES:
+            n = int(tf)
+            if (m + 1) % n:
+                continue
+            for symbol, (o, h, l, c, v) in series.items():
+                a = m + 1 - n
+                bars.append((symbol, tf, float(o[a]), float(h[a:m + 1].max()), float(l[a:m + 1].min()),
+                             float(c[m]), float(v[a:m + 1].sum()), start + a * 60_000))
+        bursts.append(bars)
+    return bursts
+
+
+async def main():
+    symbols = list(SUPPORTED_SYMBOLS)
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Scanner {len(symbols)} symboles x {len(TIMEFRAMES)} TF, {MINUTES:,} minutes, {SHARDS} shards")
+    print("=" * 60)
+    bursts = synthetic_bars(symbols, MINUTES)
+    received = []
+
+    async def count(signals, outbox, request_id):
+        received.extend(signals)
+
+    scanner = Scanner(None, symbols, TIMEFRAMES, shards=SHARDS, store_root=tempfile.mkdtemp(), dispatch=count)
+    start = time.perf_counter()
+    await scanner.start()
+    print(f"   Démarrage des shards : {time.perf_counter() - start:.2f}s")
+
+    # Cadence réelle : une rafale par clôture, on attend la réponse avant la suivante
+    latencies = []
+    for bars in bursts:
+        expected = scanner.batches + len({shard_of(b[0], scanner.shards) for b in bars})
+        sent = time.perf_counter()
+        scanner.submit(bars)
+        while scanner.batches < expected:
+            await asyncio.sleep(0)
+        latencies.append(time.perf_counter() - sent)
+    latencies = np.array(latencies) * 1000
+    total = sum(len(b) for b in bursts)
+    print(f"   Rafale clôture → signaux prêts : p50 {np.percentile(latencies, 50):.2f} ms, "
+          f"p99 {np.percentile(latencies, 99):.2f} ms, max {latencies.max():.2f} ms")
+    print(f"   Rafale 240m (60 bougies)       : {latencies[239::240].mean():.2f} ms")
+
+    # Débit : tout envoyer d'un coup
+    start = time.perf_counter()
+    target = scanner.batches
+    for bars in bursts:
+        target += len({shard_of(b[0], scanner.shards) for b in bars})
+        scanner.submit(bars)
+    while scanner.batches < target:
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.05)
+    print(f"   Débit max : {total / elapsed:,.0f} bougies/s ({total:,} bougies, {scanner.signals} signaux, "
+          f"{len(received)} transmis au pipeline)")
+    await scanner.stop()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Benchmark - Score de confluence : boucles Python vs tables par masque
+
+Compare les anciennes boucles (sum([...]), hasattr/getattr sur WEIGHTS,
+chaîne de if pour les libellés) aux tables précalculées de app.smc
+(une lecture d'index par masque de 10 bits).
+
+Usage: python bench_scoring.py
+"""
+import random
+import time
+
+from app.models import Flags
+from app.smc import (
+    FLAG_NAMES,
+    WEIGHTS,
+    flags_to_mask,
+    flag_count,
+    weighted_score,
+    active_flag_labels,
+    rebuild_tables
+)
+
+ROUNDS = 200_000
+
+
+# === ANCIENNES BOUCLES ===
+def legacy_score(flags: Flags):
+    flag_total = sum([flags.poi_valid, flags.fvg_open, flags.ob_valid, flags.bos_confirm,
+                      flags.choch_confirm, flags.liq_swept, flags.imbalance_filled,
+                      flags.trend_aligned, flags.volume_confirm, flags.time_filter])
+    total_score = 0.0
+    for flag_name, weight in WEIGHTS.items():
+        if hasattr(flags, flag_name) and getattr(flags, flag_name):
+            total_score += weight
+    active_flags = []
+    for flag_name in WEIGHTS.keys():
+        if hasattr(flags, flag_name) and getattr(flags, flag_name):
+            active_flags.append(f"✅ {flag_name.replace('_', ' ').title()}")
+    return flag_total, total_score, active_flags
+
+
+def table_score(mask: int):
+    return flag_count(mask), weighted_score(mask), active_flag_labels(mask, checked=True)
+
+
+def main():
+    rng = random.Random(42)
+    masks = [rng.randrange(1 << len(FLAG_NAMES)) for _ in range(1024)]
+    models = [Flags(**{name: bool(m >> bit & 1) for bit, name in enumerate(FLAG_NAMES)}) for m in masks]
+
+    # Les deux méthodes doivent donner exactement les mêmes résultats
+    for mask, model in zip(masks, models):
+        count, score, labels = legacy_score(model)
+        assert (count, score, tuple(labels)) == table_score(mask), mask
+        assert flags_to_mask(model.model_dump()) == mask
+
+    print("=" * 60)
+    print("⏱️  BENCHMARK - score de confluence (ns par signal)")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        legacy_score(models[i & 1023])
+    legacy = (time.perf_counter() - start) / ROUNDS * 1e9
+
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        table_score(masks[i & 1023])
+    tables = (time.perf_counter() - start) / ROUNDS * 1e9
+
+    start = time.perf_counter()
+    rebuild_tables()
+    rebuild_ms = (time.perf_counter() - start) * 1000
+
+    print(f"   Boucles (sum + hasattr + if) : {legacy:8.0f} ns")
+    print(f"   Tables 1024 entrées          : {tables:8.0f} ns")
+    print(f"   🚀 Speedup: x{legacy / tables:.1f}")
+    print(f"   Reconstruction des tables    : {rebuild_ms:8.1f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark - Sweep de paramètres parallèle (backtest)
+
+Grille confluence x trap cutoff x SL/TP sur des bougies 1 minute
+synthétiques, évaluée avec 1 worker puis N workers (mémoire partagée,
+indicateurs précalculés une seule fois). Affiche le speedup et le classement.
+
+Le speedup mesuré n'a de sens que si WORKERS <= cœurs disponibles. Le
+bench mesure aussi le calcul pur (simulate() en boucle, sans pool) : la
+différence avec le run 1 worker est le surcoût série du pool (soumission,
+retour des résultats), d'où une borne d'Amdahl pour N cœurs - une
+estimation, pas une mesure.
+
+Usage: python bench_sweep.py [ANNEES] [WORKERS]
+"""
+import os
+import sys
+import time
+
+from app.backtest import detect_all, simulate
+from app.smc_engine import pine_asset_type
+from app.sweep import Sweep, format_table, parameter_grid, random_candidates
+from bench_smc_engine import synthetic_ohlcv
+
+YEARS = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+WORKERS = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+BARS = int(YEARS * 365 * 24 * 60)
+CORES = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+SPACE = {
+    "confluence_thresh": [0.6, 0.7, 0.8],
+    "trap_cutoff": [1, 2, 3],
+    "sl_mult": [1.5, 2.5],
+    "tp_mult": [2.0, 4.0]
+}
+
+
+def timed_run(data, workers, candidates):
+    start = time.perf_counter()
+    with Sweep(*data, symbol="BTCUSDT.P", workers=workers) as sweep:
+        setup = time.perf_counter() - start
+        rows = sweep.run(candidates)
+    return rows, setup, time.perf_counter() - start - setup
+
+
+def compute_only(data, candidates) -> float:
+    """simulate() de chaque combinaison dans ce process (le travail parallélisable)"""
+    open_, high, low, close, volume, times = data
+    bars = detect_all(open_, high, low, close, volume, times, pine_asset_type("BTCUSDT.P"))
+    start = time.perf_counter()
+    for params in candidates:
+        simulate(bars, high, low, close, times, symbol="BTCUSDT.P", timeframe="1", **params)
+    return time.perf_counter() - start
+
+
+def main():
+    candidates = parameter_grid(SPACE)
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Sweep {len(candidates)} combinaisons sur {BARS:,} barres 1m")
+    print("=" * 60)
+
+    data = synthetic_ohlcv(BARS)
+    rows, setup, single = timed_run(data, 1, candidates)
+    print(f"   Détection partagée (1 fois)   : {setup:6.2f}s")
+    print(f"   1 worker                      : {single:6.2f}s ({single / len(candidates) * 1000:.0f} ms/combinaison)")
+    compute = compute_only(data, candidates)
+    overhead = max(single - compute, 0.0)
+    print(f"   Calcul pur (sans pool)        : {compute:6.2f}s → surcoût série du pool {overhead:.2f}s "
+          f"({overhead / single:.0%})")
+    if WORKERS > 1:
+        _, _, parallel = timed_run(data, WORKERS, candidates)
+        print(f"   {WORKERS} workers                     : {parallel:6.2f}s "
+              f"→ speedup x{single / parallel:.2f} (efficacité {single / parallel / WORKERS:.0%})")
+        if WORKERS > CORES:
+            print(f"   ⚠️ {WORKERS} workers sur {CORES} cœur(s) : speedup borné par les cœurs, non représentatif")
+    print(f"   Cœurs disponibles : {CORES} - estimation Amdahl (surcoût série mesuré, pas une mesure) : "
+          + ", ".join(f"{n} → x{single / (overhead + compute / n):.1f}" for n in (2, 4, 8, 16)))
+
+    print("\n🏆 Classement (expectancy en R):")
+    print(format_table(rows, top=5))
+
+    space = {"confluence_thresh": (0.5, 0.9), "trap_cutoff": [1, 2, 3], "sl_mult": (1.0, 3.0), "tp_mult": (1.5, 5.0)}
+    start = time.perf_counter()
+    with Sweep(*data, symbol="BTCUSDT.P", workers=WORKERS) as sweep:
+        rows = sweep.halving(random_candidates(space, 27), eta=3)
+    print(f"\n🎲 Successive halving (27 candidats aléatoires): {time.perf_counter() - start:.2f}s")
+    print(format_table(rows, top=3))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark - Débit du webhook /tv quand Telegram est lent
+
+Lance un faux serveur Telegram local qui répond avec un délai,
+puis envoie N webhooks en parallèle au bot :
+  - mode "blocking" : ancien envoi requests.post (bloque l'event loop)
+  - mode "outbox"   : /tv met en file, le worker envoie via httpx (pool keep-alive)
+
+Usage: python bench_telegram_async.py [nb_signaux] [delai_telegram_s]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+import app.main as bot
+import app.pipeline as pipeline
+from app.config import Config
+from app.notifier import send_telegram_message, close_async_client
+from app.outbox import TelegramOutbox
+
+N_SIGNALS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+TELEGRAM_DELAY = float(sys.argv[2]) if len(sys.argv) > 2 else 0.25
+FAKE_PORT = 8765
+
+# === FAUX TELEGRAM (lent) ===
+fake_telegram = FastAPI()
+
+
+@fake_telegram.post("/bot{token}/sendMessage")
+async def fake_send_message(token: str):
+    await asyncio.sleep(TELEGRAM_DELAY)
+    return {"ok": True, "result": {"message_id": 1}}
+
+
+def start_fake_telegram() -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(
+        fake_telegram, host="127.0.0.1", port=FAKE_PORT, log_level="warning"
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def fake_ai(signal):
+    """IA court-circuitée : on mesure uniquement l'envoi Telegram"""
+    entry = signal["price_ctx"]["entry"]
+    return {
+        "symbol": signal["symbol"],
+        "direction": signal["direction"],
+        "entry": entry,
+        "sl": signal["price_ctx"]["sl"],
+        "tp": signal["price_ctx"]["tp"],
+        "risk_reward": 1.6,
+        "confidence": 80,
+        "sentiment": "bullish",
+        "grok_advice": "bench",
+        "deepseek_advice": "bench"
+    }
+
+
+def blocking_enqueue(message, chat_id):
+    """Ancien comportement : requests.post directement dans la coroutine"""
+    send_telegram_message(message, Config.TELEGRAM_TOKEN, chat_id)
+    return 0
+
+
+def make_signal(i: int) -> dict:
+    return {
+        "event_id": f"BENCH_{time.time_ns()}_{i}",
+        "symbol": "BTCUSDT.P",
+        "timeframe": "15",
+        "direction": "LONG",
+        "entry": 69500.0,
+        "sl": 68875.0,
+        "tp": 70500.0,
+        "atr": 250.0,
+        "poi_valid": True, "fvg_open": True, "ob_valid": True, "bos_confirm": True,
+        "choch_confirm": True, "liq_swept": True, "imbalance_filled": True,
+        "trend_aligned": True, "volume_confirm": True, "time_filter": True
+    }
+
+
+async def run_burst(mode: str) -> float:
+    transport = httpx.ASGITransport(app=bot.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bot") as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/tv", json=make_signal(i)) for i in range(N_SIGNALS)
+        ])
+        elapsed = time.perf_counter() - start
+    sent = sum(1 for r in responses if r.json().get("sent"))
+    print(f"   [{mode:8s}] {sent}/{N_SIGNALS} acceptés en {elapsed:.2f}s "
+          f"→ {N_SIGNALS / elapsed:.1f} webhooks/s")
+    return elapsed
+
+
+async def main():
+    print("=" * 60)
+    print("⏱️  BENCHMARK - Webhook /tv avec Telegram lent")
+    print("=" * 60)
+    print(f"   Signaux: {N_SIGNALS} | Délai Telegram: {TELEGRAM_DELAY*1000:.0f} ms\n")
+
+    Config.TELEGRAM_API_URL = f"http://127.0.0.1:{FAKE_PORT}"
+    Config.TELEGRAM_TOKEN = "bench"
+    Config.TELEGRAM_CHAT_ID = "1"
+    pipeline.process_with_ai_async = fake_ai
+    pipeline.is_duplicate = lambda event_id, ttl: False
+    pipeline.is_semantic_duplicate = lambda *args: None
+
+    bot.outbox.enqueue = blocking_enqueue
+    t_blocking = await run_burst("blocking")
+
+    # Outbox temporaire, limites de débit désactivées pour le bench
+    spool = os.path.join(tempfile.mkdtemp(), "outbox.db")
+    bot.outbox = TelegramOutbox(spool, Config.TELEGRAM_TOKEN, global_rate=0, per_chat_interval=0,
+                                concurrency=N_SIGNALS)
+    await bot.outbox.start()
+    t_async = await run_burst("outbox")
+    start = time.perf_counter()
+    while bot.outbox.stats()["pending"]:
+        await asyncio.sleep(0.01)
+    print(f"   [outbox  ] file vidée {time.perf_counter() - start:.2f}s après la rafale "
+          f"({bot.outbox.stats()['sent']} livrés)")
+    await bot.outbox.stop()
+    await close_async_client()
+
+    print(f"\n   🚀 Speedup: x{t_blocking / t_async:.1f}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    fake = start_fake_telegram()
+    try:
+        asyncio.run(main())
+    finally:
+        fake.should_exit = True
@@ -0,0 +1,126 @@
+"""
+Benchmark - /tv (une requête par signal) vs /tv/batch (NDJSON)
+
+IA court-circuitée, outbox temporaire (sans worker) : on mesure le coût
+par signal du décodage, du score, de l'anti-doublon et de la mise en file.
+Vérifie aussi que les deux endpoints rendent exactement les mêmes décisions.
+
+Usage: python bench_tv_batch.py [N_SIGNALS]
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+import app.main as bot
+import app.pipeline as pipeline
+from app.config import Config
+from app.outbox import TelegramOutbox
+from app.utils import clear_cache
+
+N_SIGNALS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+
+async def fake_ai(signal):
+    """IA court-circuitée : rejette les signaux SHORT"""
+    if signal["direction"] == "SHORT":
+        return None
+    entry = signal["price_ctx"]["entry"]
+    return {
+        "symbol": signal["symbol"],
+        "direction": signal["direction"],
+        "entry": entry,
+        "sl": entry - 625.0,
+        "tp": entry + 1000.0,
+        "risk_reward": 1.6,
+        "confidence": 80,
+        "sentiment": "bullish",
+        "grok_advice": "bench",
+        "deepseek_advice": "bench"
+    }
+
+
+def make_signals(n: int) -> list:
+    """Mélange : acceptés, sous le seuil, doublons, invalides, rejet IA"""
+    signals = []
+    for i in range(n):
+        signal = {
+            "event_id": f"BENCH{i}_{1730736000000 + i * 900000}_LONG",
+            "symbol": "BINANCE:BTCUSDT.P",
+            "timeframe": "15",
+            "direction": "LONG",
+            "entry": 69500.0 + i * 400,
+            "sl": 68875.0,
+            "tp": 70500.0,
+            "atr": 250.0,
+            "poi_valid": True, "fvg_open": True, "ob_valid": True, "bos_confirm": True,
+            "choch_confirm": True, "liq_swept": True, "imbalance_filled": True,
+            "trend_aligned": True, "volume_confirm": i % 5 != 1, "time_filter": i % 5 != 1
+        }
+        if i % 10 == 3:
+            signal["event_id"] = signals[-1]["event_id"]
+        if i % 10 == 7:
+            del signal["symbol"]
+        if i % 10 == 9:
+            signal["direction"] = "SHORT"
+        signals.append(signal)
+    return signals
+
+
+def fresh_state() -> None:
+    clear_cache()
+    spool = os.path.join(tempfile.mkdtemp(), "outbox.db")
+    bot.outbox = TelegramOutbox(spool, Config.TELEGRAM_TOKEN)
+
+
+async def main():
+    logging.disable(logging.ERROR)
+    Config.TELEGRAM_TOKEN = "bench"
+    Config.TELEGRAM_CHAT_ID = "1"
+    Config.TV_BATCH_MAX_RECORDS = max(Config.TV_BATCH_MAX_RECORDS, N_SIGNALS)
+    Config.VERIFY_ENABLED = False  # payloads synthétiques : bougies de 2024, SL fixe
+    pipeline.process_with_ai_async = fake_ai
+    signals = make_signals(N_SIGNALS)
+
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - /tv vs /tv/batch ({N_SIGNALS} signaux)")
+    print("=" * 60)
+
+    transport = httpx.ASGITransport(app=bot.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        fresh_state()
+        start = time.perf_counter()
+        single = []
+        for signal in signals:
+            response = await client.post("/tv", json=signal)
+            body = response.json()
+            single.append(dict(body.get("detail", body), status=response.status_code))
+        t_single = time.perf_counter() - start
+
+        fresh_state()
+        ndjson = "\n".join(json.dumps(signal) for signal in signals).encode()
+        start = time.perf_counter()
+        response = await client.post("/tv/batch", content=ndjson,
+                                     headers={"Content-Type": "application/x-ndjson"})
+        t_batch = time.perf_counter() - start
+        batch = response.json()["results"]
+
+    def decision(result):
+        return result["status"], result.get("reason"), bool(result.get("sent")), result.get("outbox_id")
+
+    same = [decision(r) for r in single] == [decision(r) for r in batch]
+    print(f"   /tv       : {t_single / N_SIGNALS * 1e6:8.1f} µs par signal ({N_SIGNALS} requêtes)")
+    print(f"   /tv/batch : {t_batch / N_SIGNALS * 1e6:8.1f} µs par signal (1 requête)")
+    print(f"   🚀 Speedup: x{t_single / t_batch:.1f}")
+    print(f"   Décisions identiques: {'✅' if same else '❌'} "
+          f"({sum(1 for r in batch if r.get('sent'))} envoyés / {N_SIGNALS})")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Benchmark - Variantes Pine en mode shadow (cache d'indicateurs partagé)
+
+Compare sur les mêmes bougies :
+1. la variante de production seule (smc_relaxed_40pct)
+2. les 4 variantes, chacune recalculant ses indicateurs
+3. les 4 variantes avec IndicatorCache (EMA/ATR/RSI/SMA calculés une fois)
+
+Usage: python bench_variants.py [BARS] [REPEAT]
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.candles import Candles
+from app.smc_engine import IndicatorSet
+from app.variants import IndicatorCache, ShadowEvaluator, default_registry
+
+BARS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+REPEAT = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+
+def synthetic_candles(n: int, seed: int = 11) -> Candles:
+    rng = np.random.default_rng(seed)
+    close = 30_000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0015, n))
+    return Candles(
+        time=1_700_000_000_000 + np.arange(n, dtype=np.int64) * 60_000,
+        open=open_,
+        high=np.maximum(open_, close) * (1 + spread),
+        low=np.minimum(open_, close) * (1 - spread),
+        close=close,
+        volume=rng.lognormal(3, 0.8, n)
+    )
+
+
+def best_of(fn) -> float:
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Variantes shadow, {BARS:,} bougies, meilleur de {REPEAT}")
+    print("=" * 60)
+    candles = synthetic_candles(BARS)
+    registry = default_registry()
+    variants = list(registry)
+
+    def uncached(selected):
+        for variant in selected:
+            variant.run(IndicatorSet(candles.open, candles.high, candles.low, candles.close,
+                                     candles.volume, candles.time), "crypto", "1")
+
+    def cached():
+        cache = IndicatorCache()
+        indicators = cache.bind("BTCUSDT.P", "1", candles)
+        for variant in variants:
+            variant.run(indicators, "crypto", "1")
+        return cache
+
+    single = best_of(lambda: uncached(variants[:1]))
+    plain = best_of(lambda: uncached(variants))
+    shared = best_of(cached)
+    cache = cached().stats()
+    print(f"   Production seule        : {single * 1000:8.1f} ms")
+    print(f"   {len(variants)} variantes sans cache  : {plain * 1000:8.1f} ms  (x{plain / single:.2f})")
+    print(f"   {len(variants)} variantes avec cache  : {shared * 1000:8.1f} ms  (x{shared / single:.2f})")
+    print(f"   Séries calculées : {cache['misses']} au lieu de {cache['misses'] + cache['hits']}")
+
+    # Résultats shadow (signaux + TP/SL) sur tout l'historique
+    shadow = ShadowEvaluator(registry)
+    start = time.perf_counter()
+    shadow.evaluate("BTCUSDT.P", "1", candles)
+    elapsed = time.perf_counter() - start
+    print("-" * 60)
+    print(f"   Shadow complet (signaux + résultats) : {elapsed * 1000:.1f} ms")
+    print(f"   {'variante':<16}{'signaux':>9}{'TP':>7}{'SL':>7}{'win%':>8}{'E[R]':>8}")
+    for name, row in shadow.stats()["variants"].items():
+        win = f"{row['win_rate'] * 100:.1f}" if row["win_rate"] is not None else "-"
+        expectancy = f"{row['expectancy_r']:+.3f}" if row["expectancy_r"] is not None else "-"
+        print(f"   {name:<16}{row['signals']:>9,}{row['tp_hits']:>7,}{row['sl_hits']:>7,}{win:>8}{expectancy:>8}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
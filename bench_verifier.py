@@ -0,0 +1,70 @@
+"""
+Benchmark - Vérification serveur des payloads (structure + cache de bougies)
+
+Alimente l'état marché (ATR incrémental + dernier close) avec des bougies
+15m synthétiques, puis vérifie des signaux authentiques et falsifiés
+(SL incohérent, prix hors marché, ATR inventé, signal périmé).
+Objectif : < 100 µs par requête.
+
+Usage: python bench_verifier.py [N_SIGNAUX]
+"""
+import sys
+import time
+
+from app.decoder import SignalDecoder
+from app.verifier import market_state, verify_signal
+from bench_smc_engine import synthetic_ohlcv
+
+N_SIGNALS = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+TF_MS = 15 * 60_000
+
+
+def payload(event_time: int, entry: float, atr: float, **overrides) -> dict:
+    data = {
+        "event_id": f"BTCUSDT.P_{event_time}_LONG",
+        "symbol": "BINANCE:BTCUSDT.P", "timeframe": "15", "direction": "LONG",
+        "entry": entry, "sl": entry - atr * 2.5, "tp": entry + atr * 4.0, "atr": atr,
+        "poi_valid": True, "fvg_open": True, "ob_valid": True, "bos_confirm": True,
+        "choch_confirm": True, "liq_swept": True, "imbalance_filled": True,
+        "trend_aligned": True, "volume_confirm": True, "time_filter": True
+    }
+    data.update(overrides)
+    return data
+
+
+def main():
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Vérification de {N_SIGNALS:,} payloads")
+    print("=" * 60)
+
+    open_, high, low, close, volume, _ = synthetic_ohlcv(500)
+    now = time.time()
+    last_bar = int(now * 1000) // TF_MS * TF_MS - TF_MS
+    for i in range(500):
+        market_state.update("BTCUSDT.P", "15", high[i], low[i], close[i], last_bar - (499 - i) * TF_MS, volume[i])
+    _, atr, _ = market_state.reference("BTCUSDT.P", "15")
+    # Pine sends the volume-weighted ATR of the signal bar
+    atr *= market_state.volume_ratio("BTCUSDT.P", "15", last_bar)
+    entry = float(close[-1])
+
+    decoder = SignalDecoder()
+    cases = {
+        "authentique": payload(last_bar, entry, atr),
+        "SL incohérent": payload(last_bar, entry, atr, sl=entry + atr),
+        "prix hors marché": payload(last_bar, entry * 1.2, atr * 1.0),
+        "ATR inventé": payload(last_bar, entry, atr * 10),
+        "signal périmé": payload(last_bar - 20 * TF_MS, entry, atr),
+        "event_id falsifié": payload(last_bar, entry, atr, event_id=f"ETHUSDT.P_{last_bar}_LONG"),
+    }
+    for label, data in cases.items():
+        signal = decoder.decode(data)
+        start = time.perf_counter()
+        for _ in range(N_SIGNALS):
+            result = verify_signal(signal, now)
+        elapsed = (time.perf_counter() - start) / N_SIGNALS * 1e6
+        print(f"   {label:<18}: {elapsed:6.2f} µs → {result or '✅ accepté'}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
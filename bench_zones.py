@@ -0,0 +1,82 @@
+"""
+Benchmark - Index des zones OB / FVG actives
+
+1. Requête "quelles zones contiennent / touchent ce prix ?" sur N zones
+   actives : index (O(log n + k)) vs balayage NumPy vs boucle Python
+2. Flux de bougies : création + mitigation incrémentale par bougie
+
+Usage: python bench_zones.py [ZONES] [BARS]
+"""
+import sys
+import time
+
+import numpy as np
+
+from app.zones import KIND_FVG, KIND_OB, ZoneIndex
+
+ZONES = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+BARS = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+QUERIES = 2_000
+
+
+def main():
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK - Zones OB / FVG, {ZONES:,} zones actives, {BARS:,} bougies")
+    print("=" * 60)
+    rng = np.random.default_rng(8)
+
+    # 1. Requêtes sur un stock de zones (jamais mitigées ici)
+    index = ZoneIndex(max_age_days=0)
+    lows = rng.uniform(10_000, 100_000, ZONES)
+    highs = lows * (1 + rng.uniform(0.0005, 0.004, ZONES))
+    kinds = rng.choice((KIND_OB, KIND_FVG), ZONES)
+    sides = rng.choice((-1, 1), ZONES)
+    start = time.perf_counter()
+    for i in range(ZONES):
+        index.add("BTCUSDT.P", kinds[i], int(sides[i]), lows[i], highs[i], "15", i)
+    insert_us = (time.perf_counter() - start) / ZONES * 1e6
+
+    prices = rng.uniform(10_000, 100_000, QUERIES)
+    tolerance = 5.0
+    start = time.perf_counter()
+    found = sum(len(index.query("BTCUSDT.P", p, tolerance)) for p in prices)
+    index_us = (time.perf_counter() - start) / QUERIES * 1e6
+
+    active = np.ones(ZONES, dtype=bool)
+    start = time.perf_counter()
+    scanned = sum(int(np.count_nonzero(active & (lows <= p + tolerance) & (highs >= p - tolerance))) for p in prices)
+    numpy_us = (time.perf_counter() - start) / QUERIES * 1e6
+
+    zones = list(zip(lows.tolist(), highs.tolist()))
+    count = min(QUERIES, 50)
+    start = time.perf_counter()
+    for p in prices[:count]:
+        _ = [z for z in zones if z[0] <= p + tolerance and z[1] >= p - tolerance]
+    python_us = (time.perf_counter() - start) / count * 1e6
+
+    print(f"   Insertion                 : {insert_us:8.2f} µs / zone")
+    print(f"   Requête index             : {index_us:8.2f} µs  ({found / QUERIES:.1f} zones trouvées)")
+    print(f"   Balayage NumPy            : {numpy_us:8.2f} µs  (x{numpy_us / index_us:.1f}, {scanned / QUERIES:.1f} zones)")
+    print(f"   Boucle Python             : {python_us:8.2f} µs  (x{python_us / index_us:.0f})")
+
+    # 2. Flux de bougies : mitigation + création à chaque bougie
+    close = 30_000 * np.exp(np.cumsum(rng.normal(0, 0.002, BARS)))
+    spread = np.abs(rng.normal(0, 0.0015, BARS))
+    high, low = close * (1 + spread), close * (1 - spread)
+    flags = np.where(rng.random(BARS) < 0.15, 2, 0) | np.where(rng.random(BARS) < 0.05, 4, 0)
+    ob_side = rng.choice((-1, 1), BARS)
+    stream = ZoneIndex(max_age_days=0)
+    bars = list(zip(range(BARS), high.tolist(), low.tolist(), close.tolist(), flags.tolist(), ob_side.tolist()))
+    start = time.perf_counter()
+    for t, h, l, c, mask, side in bars:
+        stream.on_bar("ETHUSDT.P", "1", t, h, l, c, mask, side)
+    bar_us = (time.perf_counter() - start) / BARS * 1e6
+    stats = stream.stats()
+    print("-" * 60)
+    print(f"   Par bougie (mitigation + création) : {bar_us:.2f} µs")
+    print(f"   Zones créées {stats['created']:,}, mitigées {stats['mitigated']:,}, actives {stats['active']:,}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Test - Flux de trades Binance choisis d'après SUPPORTED_SYMBOLS
+
+Forex et or n'ont pas de flux Binance : seuls les perpétuels crypto de la
+liste actuelle doivent être abonnés, sur le flux futures uniquement.
+
+Usage: python -m pytest test_aggregator.py  (ou python test_aggregator.py)
+"""
+from app.aggregator import binance_stream_url
+from app.smc import SUPPORTED_SYMBOLS
+
+
+def test_supported_symbols_use_futures_stream_only():
+    urls = binance_stream_url(list(SUPPORTED_SYMBOLS))
+    assert set(urls) == {"futures"}
+    streams = urls["futures"].split("streams=")[1].split("/")
+    expected = [f"{s[:-2].lower()}@aggTrade" for s, market in SUPPORTED_SYMBOLS.items() if market == "crypto"]
+    assert streams == expected
+    for symbol, market in SUPPORTED_SYMBOLS.items():
+        if market != "crypto":
+            assert symbol.lower() not in urls["futures"]
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST - Flux Binance")
+    print("=" * 60)
+    test_supported_symbols_use_futures_stream_only()
+    print("   ✅ test_supported_symbols_use_futures_stream_only")
+    print("=" * 60)
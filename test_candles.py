@@ -0,0 +1,60 @@
+"""
+Test - Bougies live persistées dans le CandleStore
+
+Des trades passent par BarAggregator ; chaque BarBatch clôturé est ajouté
+au stockage par append_batch (comme scanner.run_live). Le stockage doit
+contenir exactement les bougies émises, relisibles par tail() au démarrage
+suivant.
+
+Usage: python -m pytest test_candles.py  (ou python test_candles.py)
+"""
+import tempfile
+
+import numpy as np
+
+from app.aggregator import BarAggregator
+from app.candles import CandleStore
+
+SYMBOLS = ["BTCUSDT.P", "ETHUSDT.P", "XAUUSD"]
+START = 1_704_067_200_000  # 2024-01-01
+
+
+def test_aggregated_bars_are_persisted():
+    rng = np.random.default_rng(3)
+    n = 20_000
+    times = START + np.sort(rng.integers(0, 6 * 3_600_000, n))  # 6h de trades
+    symbol = rng.integers(0, len(SYMBOLS), n)
+    prices = 100 + np.cumsum(rng.normal(0, 0.1, n))
+    quantities = rng.lognormal(0, 1, n)
+
+    with tempfile.TemporaryDirectory() as root:
+        store = CandleStore(root)
+        emitted, batches = {}, []
+
+        def on_batch(batch):
+            batches.append(batch)
+            store.append_batch(SYMBOLS, batch)
+            for i, t, c in zip(batch.symbol.tolist(), batch.time.tolist(), batch.close.tolist()):
+                emitted.setdefault((SYMBOLS[i], batch.timeframe), []).append((t, c))
+
+        aggregator = BarAggregator(SYMBOLS, ["1", "5", "60"])
+        for chunk in np.array_split(np.arange(n), 50):
+            for batch in aggregator.add_ticks(symbol[chunk], times[chunk], prices[chunk], quantities[chunk]):
+                on_batch(batch)
+
+        assert emitted
+        reader = CandleStore(root)
+        for (name, timeframe), bars in emitted.items():
+            candles = reader.tail(name, timeframe, len(bars) + 10)
+            assert list(zip(candles.time.tolist(), candles.close.tolist())) == bars
+        # Same bars appended again (restart replay) are dropped
+        assert sum(store.append_batch(SYMBOLS, batch) for batch in batches) == 0
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST - Bougies live → CandleStore")
+    print("=" * 60)
+    test_aggregated_bars_are_persisted()
+    print("   ✅ test_aggregated_bars_are_persisted")
+    print("=" * 60)
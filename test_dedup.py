@@ -0,0 +1,53 @@
+"""
+Test - Anti-doublon sémantique partagé entre workers (DEDUP_BACKEND=sqlite)
+
+Deux SQLiteSemanticDedupIndex sur le même fichier (deux workers uvicorn) :
+un setup accepté par l'un est un doublon pour l'autre, et les décisions
+sont celles de l'index en mémoire sur le même flux.
+
+Usage: python -m pytest test_dedup.py  (ou python test_dedup.py)
+"""
+import os
+import random
+import tempfile
+
+from app.dedup import SemanticDedupIndex, SQLiteSemanticDedupIndex
+
+
+def test_workers_share_semantic_buckets():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "dedup.db")
+        first, second = SQLiteSemanticDedupIndex(path), SQLiteSemanticDedupIndex(path)
+        assert first.check_and_add("BTCUSDT.P", "LONG", "15", 1000, 69500.0, 250.0) is None
+        # Same bar, other worker, other event_id
+        assert second.check_and_add("BTCUSDT.P", "LONG", "15", 1000, 69510.0, 250.0) == "same_window"
+        # 5 bars later, within 0.5 x ATR
+        assert second.check_and_add("BTCUSDT.P", "LONG", "15", 1005, 69550.0, 250.0) == "near_entry"
+        # Other direction is another setup
+        assert second.check_and_add("BTCUSDT.P", "SHORT", "15", 1000, 69500.0, 250.0) is None
+        first.close()
+        second.close()
+
+
+def test_sqlite_index_matches_memory_index():
+    rng = random.Random(5)
+    stream = [(rng.choice(["BTCUSDT.P", "ETHUSDT.P"]), rng.choice(["LONG", "SHORT"]), rng.choice(["5", "15"]),
+               bar, 100 + rng.uniform(-3, 3), rng.choice([None, 1.0, 2.0]))
+              for bar in sorted(rng.randrange(0, 400) for _ in range(1500))]
+    with tempfile.TemporaryDirectory() as root:
+        workers = [SQLiteSemanticDedupIndex(os.path.join(root, "dedup.db")) for _ in range(2)]
+        memory = SemanticDedupIndex()
+        for k, signal in enumerate(stream):
+            assert workers[k % 2].check_and_add(*signal) == memory.check_and_add(*signal), signal
+        for worker in workers:
+            worker.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST - Anti-doublon sémantique partagé")
+    print("=" * 60)
+    for test in (test_workers_share_semantic_buckets, test_sqlite_index_matches_memory_index):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
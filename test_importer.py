@@ -0,0 +1,59 @@
+"""
+Test - Import de dumps Binance lisible par le côté live
+
+Un dump BTCUSDT-1m-....zip doit finir sous BTCUSDT.P (clé de
+SUPPORTED_SYMBOLS), la série que le scanner, le vérificateur et l'index
+de zones relisent au démarrage.
+
+Usage: python -m pytest test_importer.py  (ou python test_importer.py)
+"""
+import os
+import tempfile
+import zipfile
+
+from app.candles import CandleStore
+from app.importer import discover, import_many, live_symbol
+
+ROWS = 500
+START = 1_704_067_200_000  # 2024-01-01
+
+
+def _write_zip(directory: str, name: str):
+    lines = [f"{START + i * 60_000},{100 + i},{101 + i},{99 + i},{100.5 + i},{10 + i},{START + i * 60_000 + 59_999},0,0,0,0,0"
+             for i in range(ROWS)]
+    with zipfile.ZipFile(os.path.join(directory, f"{name}.zip"), "w") as archive:
+        archive.writestr(f"{name}.csv", "\n".join(lines) + "\n")
+
+
+def test_live_symbol_mapping():
+    assert live_symbol("BTCUSDT") == "BTCUSDT.P"
+    assert live_symbol("EURUSD") == "EURUSD"
+    assert live_symbol("PEPEUSDT") == "PEPEUSDT"
+    assert live_symbol("BTCUSDT", suffix="") == "BTCUSDT"
+    assert live_symbol("BTCUSDT", suffix=".P") == "BTCUSDT.P"
+
+
+def test_imported_history_is_found_by_the_live_side():
+    with tempfile.TemporaryDirectory() as work:
+        dumps, root = os.path.join(work, "dumps"), os.path.join(work, "candles")
+        os.makedirs(dumps)
+        _write_zip(dumps, "BTCUSDT-1m-2024-01")
+        jobs = discover(dumps)
+        assert list(jobs) == [("BTCUSDT.P", "1")]
+        results = import_many(jobs, root=root, workers=1)
+        assert [stats.rows_written for stats in results] == [ROWS]
+
+        candles = CandleStore(root).tail("BTCUSDT.P", "1", 200)
+        assert len(candles) == 200
+        assert int(candles.time[-1]) == START + (ROWS - 1) * 60_000
+        assert float(candles.close[-1]) == 100.5 + ROWS - 1
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST - Import Binance → symboles live")
+    print("=" * 60)
+    for test in (test_live_symbol_mapping, test_imported_history_is_found_by_the_live_side):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
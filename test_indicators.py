@@ -0,0 +1,80 @@
+"""
+Test - StreamingSMC (bougie par bougie) == detect() (vectorisé)
+
+Le scanner tourne sur StreamingSMC, le backtest, le sweep et le mode
+shadow sur detect() / IndicatorSet : les deux moteurs doivent donner les
+mêmes flags, les mêmes signaux et le même ATR final sur chaque bougie.
+
+Usage: python -m pytest test_indicators.py  (ou python test_indicators.py)
+"""
+import numpy as np
+
+from app.candles import Candles
+from app.indicators import StreamingSMC
+from app.smc_engine import IndicatorSet, detect
+from app.variants import IndicatorCache
+
+BARS = 3000
+ASSET_TYPES = ("crypto", "forex", "gold")
+
+
+def synthetic_ohlcv(n: int, base: float = 30000.0, seed: int = 1):
+    """Marche aléatoire 1m (comme bench_smc_engine.py), volume à pics"""
+    rng = np.random.default_rng(seed)
+    close = base * np.exp(np.cumsum(rng.normal(0, 0.0012, n)))
+    open_ = np.concatenate(([base], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0006, n))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.lognormal(3.0, 1.0, n)
+    times = 1_577_836_800_000 + np.arange(n, dtype=np.int64) * 60_000
+    return open_, high, low, close, volume, times
+
+
+def _streamed(data, asset_type: str):
+    engine = StreamingSMC(asset_type)
+    rows = [engine.update(*bar) for bar in zip(*(a.tolist() for a in data))]
+    mask, signal, _, atr = (np.array(column) for column in zip(*rows))
+    return mask, signal, atr
+
+
+def _assert_same(result, mask, signal, atr, label: str):
+    assert np.array_equal(result.flags, mask), f"{label}: flags differ at {np.flatnonzero(result.flags != mask)[:5]}"
+    assert np.array_equal(result.signal, signal), f"{label}: signals differ at {np.flatnonzero(result.signal != signal)[:5]}"
+    warm = np.isfinite(result.atr)
+    np.testing.assert_allclose(atr[warm], result.atr[warm], rtol=1e-9, err_msg=f"{label}: final_atr differs")
+
+
+def test_streaming_matches_detect():
+    for seed, asset_type in enumerate(ASSET_TYPES, start=1):
+        data = synthetic_ohlcv(BARS, seed=seed)
+        result = detect(*data, asset_type=asset_type)
+        assert np.count_nonzero(result.signal) > 0, f"{asset_type}: aucun signal"
+        _assert_same(result, *_streamed(data, asset_type), asset_type)
+
+
+def test_shared_indicator_sets_match_detect():
+    cache = IndicatorCache()
+    for seed, asset_type in enumerate(ASSET_TYPES, start=1):
+        data = synthetic_ohlcv(BARS, seed=seed)
+        mask, signal, atr = _streamed(data, asset_type)
+        _assert_same(detect(*data, asset_type=asset_type, indicators=IndicatorSet(*data)),
+                     mask, signal, atr, f"{asset_type} IndicatorSet")
+        open_, high, low, close, volume, times = data
+        candles = Candles(time=times, open=open_, high=high, low=low, close=close, volume=volume)
+        # Second pass reads every series from the cache
+        for _ in range(2):
+            indicators = cache.bind(f"TEST{seed}", "1", candles)
+            _assert_same(detect(*data, asset_type=asset_type, indicators=indicators),
+                         mask, signal, atr, f"{asset_type} CachedIndicators")
+    assert cache.hits > 0
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST - StreamingSMC vs detect()")
+    print("=" * 60)
+    for test in (test_streaming_matches_detect, test_shared_indicator_sets_match_detect):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
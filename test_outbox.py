@@ -0,0 +1,92 @@
+"""
+Test - Outbox Telegram partagée entre plusieurs workers
+
+Deux TelegramOutbox (deux connexions SQLite, comme deux workers uvicorn)
+sur le même spool : chaque message est envoyé une seule fois, un worker
+qui démarre ne reprend pas les envois en cours d'un autre, et un message
+resté 'sending' (process mort) est repris après le bail.
+
+Usage: python -m pytest test_outbox.py  (ou python test_outbox.py)
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from app import outbox as outbox_module
+from app.outbox import TelegramOutbox
+
+
+def _outbox(path: str, **kwargs) -> TelegramOutbox:
+    return TelegramOutbox(path, token="test", global_rate=0, per_chat_interval=0, **kwargs)
+
+
+def test_claim_is_atomic():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "outbox.db")
+        first, second = _outbox(path), _outbox(path)
+        row_id = first.enqueue("hello", "1")
+        # Both workers see the same due row...
+        assert first._next_due()[0] == second._next_due()[0] == row_id
+        # ...only one of them gets it
+        assert first._claim(row_id)
+        assert not second._claim(row_id)
+        assert second._next_due() is None
+
+
+def test_startup_keeps_live_claims_and_reclaims_expired_ones():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "outbox.db")
+        first = _outbox(path, lease_timeout=60)
+        live, stale = first.enqueue("live", "1"), first.enqueue("stale", "1")
+        assert first._claim(live) and first._claim(stale)
+        first._conn().execute("UPDATE outbox SET claimed_at = ? WHERE id = ?", (time.time() - 120, stale))
+
+        restarted = _outbox(path, lease_timeout=60)
+        status = dict(restarted._conn().execute("SELECT id, status FROM outbox").fetchall())
+        assert status == {live: "sending", stale: "sending"}
+        assert restarted._next_due()[0] == stale
+        assert restarted._claim(stale)
+        assert restarted._next_due() is None
+
+
+def test_two_workers_send_each_message_once():
+    sent = []
+
+    async def fake_post(message, token, chat_id):
+        await asyncio.sleep(0.001)
+        sent.append(message)
+        return 200, None, None
+
+    async def scenario(path):
+        workers = [_outbox(path, concurrency=4) for _ in range(2)]
+        workers[0].enqueue_many([(f"msg {i}", str(i % 3)) for i in range(200)])
+        for worker in workers:
+            await worker.start()
+        deadline = time.time() + 10
+        while len(sent) < 200 and time.time() < deadline:
+            await asyncio.sleep(0.01)
+        for worker in workers:
+            await worker.stop()
+        return sum(worker.sent_count for worker in workers)
+
+    original = outbox_module.post_telegram_message
+    outbox_module.post_telegram_message = fake_post
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            total = asyncio.run(scenario(os.path.join(root, "outbox.db")))
+    finally:
+        outbox_module.post_telegram_message = original
+    assert sorted(sent) == sorted(f"msg {i}" for i in range(200))
+    assert total == 200
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST - Outbox partagée entre workers")
+    print("=" * 60)
+    for test in (test_claim_is_atomic, test_startup_keeps_live_claims_and_reclaims_expired_ones,
+                 test_two_workers_send_each_message_once):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
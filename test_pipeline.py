@@ -0,0 +1,85 @@
+"""
+Test - Pipeline de décision et contexte multi-timeframe
+
+- un doublon (même event_id) ou un doublon sémantique ne met pas à jour
+  l'état multi-timeframe
+- avec MTF_SCORE_ENABLED, le score envoyé à l'IA est celui qui a passé le
+  seuil, même si le contexte HTF change pendant l'appel IA
+
+L'IA est remplacée par une fonction locale, rien n'est envoyé.
+
+Usage: python -m pytest test_pipeline.py  (ou python test_pipeline.py)
+"""
+import asyncio
+import time
+
+from app import pipeline
+from app.config import Config
+from app.decoder import Signal
+from app.mtf import mtf_state
+from app.pipeline import screen_signal, validate_signal
+
+ALL_FLAGS = (1 << 10) - 1
+
+
+def _signal(symbol: str, bar_time: int, direction: str = "LONG", entry: float = 100.0) -> Signal:
+    side = 1 if direction == "LONG" else -1
+    return Signal(event_id=f"{symbol}_{bar_time}_{direction}", symbol=symbol, timeframe="15",
+                  direction=direction, entry=entry, sl=entry - side * 2.5, tp=entry + side * 4.0,
+                  atr=1.0, flags=ALL_FLAGS)
+
+
+def _bar_time(offset_bars: int = 0) -> int:
+    return (int(time.time()) // 900 - offset_bars) * 900_000
+
+
+def test_duplicates_do_not_update_mtf_state():
+    symbol = "TESTDUPUSDT"
+    first = _signal(symbol, _bar_time())
+    assert screen_signal(first, "t")[0] is None
+    updates = mtf_state.updates
+    history = mtf_state.history(symbol, "15")
+
+    # Exact replay
+    rejected, _, _ = screen_signal(first, "t")
+    assert rejected[1]["reason"] == "duplicate"
+    # Same setup under another event_id (next bar, same entry)
+    rejected, _, _ = screen_signal(_signal(symbol, _bar_time() + 900_000), "t")
+    assert rejected[1]["reason"] == "semantic_duplicate"
+
+    assert mtf_state.updates == updates
+    assert mtf_state.history(symbol, "15") == history
+
+
+def test_ai_gets_the_screened_score():
+    symbol = "TESTSCOREUSDT"
+    seen = []
+
+    async def fake_ai(signal_data):
+        seen.append(signal_data["confluence_score"])
+        # Higher timeframe flips while the AI call is in flight
+        mtf_state.update(symbol, "60", _bar_time(), 0, -1, 1.0)
+        return None
+
+    saved = Config.MTF_SCORE_ENABLED, pipeline.process_with_ai_async
+    Config.MTF_SCORE_ENABLED, pipeline.process_with_ai_async = True, fake_ai
+    try:
+        mtf_state.update(symbol, "60", _bar_time(), 0, 1, 1.0)
+        signal = _signal(symbol, _bar_time())
+        rejected, confluence_score, alignment = screen_signal(signal, "t")
+        assert rejected is None and alignment.aligned == 1
+        asyncio.run(validate_signal(signal, "t", confluence_score, alignment))
+        assert seen == [confluence_score]
+        assert pipeline.scored_confluence(signal)[0] != confluence_score
+    finally:
+        Config.MTF_SCORE_ENABLED, pipeline.process_with_ai_async = saved
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST - Pipeline / contexte multi-timeframe")
+    print("=" * 60)
+    for test in (test_duplicates_do_not_update_mtf_state, test_ai_gets_the_screened_score):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)
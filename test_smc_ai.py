@@ -0,0 +1,58 @@
+"""
+Test - Circuit breakers IA avec le micro-batching
+
+Un provider qui ne répond jamais doit ouvrir son circuit, que les appels
+passent par le micro-batcher (AI_BATCH_ENABLED) ou non. Aucun appel réseau :
+les appels provider sont remplacés par des coroutines locales.
+
+Usage: python -m pytest test_smc_ai.py  (ou python test_smc_ai.py)
+"""
+import asyncio
+
+from app import smc_ai
+from app.circuit import CircuitBreaker
+from app.config import Config
+
+SIGNAL = {
+    "symbol": "BTCUSDT.P",
+    "direction": "LONG",
+    "price_ctx": {"entry": 69500.0, "sl": 68875.0, "tp": 70500.0},
+    "atr": 250.0,
+    "confluence_score": 100.0,
+    "flags": {}
+}
+
+
+def test_batched_timeouts_open_the_breakers():
+    async def hang(signals):
+        await asyncio.sleep(3600)
+
+    saved = (Config.AI_BATCH_ENABLED, Config.AI_CACHE_ENABLED, smc_ai.grok_breaker, smc_ai.deepseek_breaker,
+             smc_ai.ai_batcher.grok_batch, smc_ai.ai_batcher.deepseek_batch)
+    Config.AI_BATCH_ENABLED, Config.AI_CACHE_ENABLED = True, False
+    smc_ai.grok_breaker = CircuitBreaker("grok", failure_threshold=3, recovery_timeout=60)
+    smc_ai.deepseek_breaker = CircuitBreaker("deepseek", failure_threshold=3, recovery_timeout=60)
+    smc_ai.ai_batcher.grok_batch = smc_ai.ai_batcher.deepseek_batch = hang
+
+    async def scenario():
+        for _ in range(3):
+            await smc_ai.process_with_ai_async(dict(SIGNAL), deadline=0.05)
+        for task in list(smc_ai.ai_batcher._running):
+            task.cancel()
+
+    try:
+        asyncio.run(scenario())
+        assert smc_ai.grok_breaker.state == CircuitBreaker.OPEN
+        assert smc_ai.deepseek_breaker.state == CircuitBreaker.OPEN
+    finally:
+        (Config.AI_BATCH_ENABLED, Config.AI_CACHE_ENABLED, smc_ai.grok_breaker, smc_ai.deepseek_breaker,
+         smc_ai.ai_batcher.grok_batch, smc_ai.ai_batcher.deepseek_batch) = saved
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST - Circuit breakers et micro-batching IA")
+    print("=" * 60)
+    test_batched_timeouts_open_the_breakers()
+    print("   ✅ test_batched_timeouts_open_the_breakers")
+    print("=" * 60)
@@ -0,0 +1,108 @@
+"""
+Test - Les signaux du moteur SMC passent la vérification serveur
+
+Rejoue des bougies 1m synthétiques (crypto et or) comme le scanner :
+état marché alimenté bougie par bougie, puis chaque signal de StreamingSMC
+et de detect() passe par verify_signal() à la clôture de sa bougie.
+Aucun signal authentique ne doit être rejeté.
+
+Usage: python -m pytest test_verifier.py  (ou python test_verifier.py)
+"""
+import numpy as np
+
+from app import verifier
+from app.decoder import Signal
+from app.indicators import StreamingSMC
+from app.scanner import build_signal
+from app.smc_engine import detect, pine_asset_type
+from app.verifier import MarketState, get_verifier_stats, verify_signal
+
+BARS = 3000
+SYMBOLS = {"BTCUSDT.P": 30000.0, "ETHUSDT.P": 3000.0, "XAUUSD": 2300.0}
+
+
+def synthetic_ohlcv(n: int, base: float, seed: int):
+    """
+    Marche aléatoire 1m (comme bench_smc_engine.py) avec des pics de volume
+
+    Volume lognormal sigma 1.0 : les bougies de signal ont souvent 2-5x la
+    SMA20 du volume, l'ATR Pine pondéré s'écarte donc fortement de l'ATR brut.
+    """
+    rng = np.random.default_rng(seed)
+    close = base * np.exp(np.cumsum(rng.normal(0, 0.0012, n)))
+    open_ = np.concatenate(([base], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0006, n))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.lognormal(3.0, 1.0, n)
+    times = 1_577_836_800_000 + np.arange(n, dtype=np.int64) * 60_000
+    return open_, high, low, close, volume, times
+
+
+def _replay(symbol: str, base: float, seed: int):
+    """(signals, rejections) of StreamingSMC and detect() on one synthetic series"""
+    data = synthetic_ohlcv(BARS, base=base, seed=seed)
+    open_, high, low, close, volume, times = (a.tolist() for a in data)
+    result = detect(*data, asset_type=pine_asset_type(symbol))
+    engine = StreamingSMC(pine_asset_type(symbol))
+    # Fresh market state, then back to the singleton scanner / main imported
+    saved, verifier.market_state = verifier.market_state, MarketState()
+
+    checked, rejected = 0, []
+    try:
+        for i in range(BARS):
+            bar = (symbol, "1", open_[i], high[i], low[i], close[i], volume[i], times[i])
+            verifier.market_state.update(symbol, "1", high[i], low[i], close[i], times[i], volume[i])
+            mask, signal, _, final_atr = engine.update(*bar[2:])
+            candidates = []
+            if signal:
+                candidates.append(build_signal(bar, mask, signal, final_atr))
+            if result.signal[i]:
+                candidates.append(build_signal(bar, int(result.flags[i]), int(result.signal[i]), float(result.atr[i])))
+            for candidate in candidates:
+                checked += 1
+                failed = verify_signal(candidate, now=times[i] / 1000 + 60)
+                if failed:
+                    rejected.append((i, failed))
+    finally:
+        verifier.market_state = saved
+    return checked, rejected
+
+
+def test_engine_signals_pass_verification():
+    for seed, (symbol, base) in enumerate(SYMBOLS.items(), start=1):
+        checked, rejected = _replay(symbol, base, seed)
+        assert checked > 0, f"{symbol}: aucun signal généré"
+        assert not rejected, f"{symbol}: {len(rejected)}/{checked} signaux rejetés {rejected[:5]}"
+
+
+def test_market_state_singleton_is_restored():
+    original = verifier.market_state
+    _replay("BTCUSDT.P", 30000.0, 1)
+    test_other_level_multiples_are_report_only()
+    assert verifier.market_state is original
+
+
+def test_other_level_multiples_are_report_only():
+    saved, verifier.market_state = verifier.market_state, MarketState()
+    try:
+        before = get_verifier_stats()["warnings"].get("atr_levels_mismatch", 0)
+        signal = Signal(event_id="BTCUSDT.P_1700000000000_LONG", symbol="BTCUSDT.P", timeframe="15",
+                        direction="LONG", entry=100.0, sl=98.5, tp=103.0, atr=1.0, flags=0)
+        assert verify_signal(signal, now=1_700_000_000 + 900) is None
+        assert get_verifier_stats()["warnings"]["atr_levels_mismatch"] == before + 1
+    finally:
+        verifier.market_state = saved
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST - Signaux du moteur vs vérification serveur")
+    print("=" * 60)
+    for seed, (symbol, base) in enumerate(SYMBOLS.items(), start=1):
+        checked, rejected = _replay(symbol, base, seed)
+        status = "✅" if checked and not rejected else "❌"
+        print(f"   {status} {symbol:<10}: {checked} signaux, {len(rejected)} rejetés {rejected[:3]}")
+    test_other_level_multiples_are_report_only()
+    print("   ✅ SL/TP hors multiples Pine : compté, pas rejeté")
+    print("=" * 60)
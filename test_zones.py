@@ -0,0 +1,106 @@
+"""
+Test - Index des zones OB / FVG contre une référence naïve
+
+Flux de 10 000 bougies sur deux timeframes avec des flags aléatoires :
+l'index (arbres de segments + tampon) doit créer, mitiger et retrouver
+exactement les mêmes zones qu'une liste parcourue entièrement à chaque
+bougie.
+
+Usage: python -m pytest test_zones.py  (ou python test_zones.py)
+"""
+import numpy as np
+
+from app import zones
+from app.zones import KIND_FVG, KIND_OB, ZoneIndex, _FVG_BIT, _OB_BIT
+
+BARS = 10_000
+
+
+class NaiveZones:
+    """Mêmes règles que app.zones, en O(n) par bougie"""
+
+    def __init__(self):
+        self.zones = []
+        self.live = []
+        self.previous = {}
+
+    def on_bar(self, timeframe, time_ms, high, low, close, flags, ob_direction):
+        for zone in self.live:
+            if zone["timeframe"] != timeframe:
+                continue
+            if zone["kind"] == KIND_FVG:
+                filled = low <= zone["low"] if zone["direction"] > 0 else high >= zone["high"]
+            else:
+                filled = close < zone["low"] if zone["direction"] > 0 else close > zone["high"]
+            zone["mitigated"] = filled
+        self.live = [zone for zone in self.live if not zone["mitigated"]]
+        previous = self.previous.get(timeframe)
+        if previous is not None:
+            prev_high, prev_low = previous
+            if flags & _FVG_BIT:
+                self._add(KIND_FVG, 1 if close > prev_high else -1, prev_low, prev_high, timeframe, time_ms)
+            if flags & _OB_BIT:
+                self._add(KIND_OB, ob_direction, prev_low, prev_high, timeframe, time_ms)
+        self.previous[timeframe] = (high, low)
+
+    def _add(self, kind, direction, low, high, timeframe, time_ms):
+        zone = dict(kind=kind, direction=direction, low=low, high=high, timeframe=timeframe,
+                    created=time_ms, mitigated=False)
+        self.zones.append(zone)
+        self.live.append(zone)
+
+    def query(self, price, tolerance):
+        return sorted((z["created"], z["kind"], z["direction"], z["low"], z["high"]) for z in self.live
+                      if z["low"] <= price + tolerance and z["high"] >= price - tolerance)
+
+    def active(self):
+        return len(self.live)
+
+
+def _replay():
+    rng = np.random.default_rng(4)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, BARS)))
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0, 0.002, BARS))
+    high, low = np.maximum(open_, close) * (1 + spread), np.minimum(open_, close) * (1 - spread)
+    flags = rng.integers(0, 1024, BARS)
+    ob_direction = rng.choice([-1, 1], BARS)
+
+    index, naive = ZoneIndex(max_age_days=0), NaiveZones()
+    queries = 0
+    for i in range(BARS):
+        bar = (("1", "5")[i % 2], i * 60_000, high[i], low[i], close[i], int(flags[i]), int(ob_direction[i]))
+        index.on_bar("BTCUSDT.P", *bar)
+        naive.on_bar(*bar)
+        if i % 200 == 0:
+            for price in rng.uniform(close[i] * 0.9, close[i] * 1.1, 5):
+                found = sorted((z.created, z.kind, z.direction, z.low, z.high)
+                               for z in index.query("BTCUSDT.P", price, 0.05))
+                assert found == naive.query(price, 0.05), f"bar {i}, price {price}"
+                queries += 1
+    assert queries and index.active("BTCUSDT.P") == naive.active()
+    assert index.stats()["created"] == len(naive.zones)
+
+
+def test_index_matches_naive_reference():
+    _replay()
+
+
+def test_tree_descent_matches_naive_reference():
+    # Every stabbing query goes down the max-high tree instead of the slice scans
+    saved = zones._SLICE_LOOP, zones._SLICE_MAX
+    zones._SLICE_LOOP = zones._SLICE_MAX = -1
+    try:
+        _replay()
+    finally:
+        zones._SLICE_LOOP, zones._SLICE_MAX = saved
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("🧪 TEST - Index des zones vs référence naïve")
+    print("=" * 60)
+    for test in (test_index_matches_naive_reference, test_tree_descent_matches_naive_reference):
+        test()
+        print(f"   ✅ {test.__name__}")
+    print("=" * 60)